@@ -1,4 +1,4 @@
-from billy.scrape.actions import Rule, BaseCategorizer
+from openstates.utils.actions import Rule, BillyCategorizer
 
 
 # These are regex patterns that map to action categories.
@@ -46,5 +46,5 @@ _categorizer_rules = (
 )
 
 
-class CACategorizer(BaseCategorizer):
+class CACategorizer(BillyCategorizer):
     rules = _categorizer_rules
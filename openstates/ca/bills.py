@@ -3,7 +3,6 @@ import os
 import operator
 import itertools
 
-from lxml import etree, html
 import pytz
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
@@ -11,7 +10,7 @@ from sqlalchemy import create_engine
 from billy.core import settings
 from billy.scrape.bills import BillScraper, Bill
 from billy.scrape.votes import Vote
-from .models import CABill
+from .models import CABill, iter_bills
 from .actions import CACategorizer
 
 
@@ -321,7 +320,7 @@ class CABillScraper(BillScraper):
             session_year=session).filter_by(
             measure_type=type_abbr)
 
-        for bill in bills:
+        for bill in iter_bills(bills):
             bill_session = session
             if bill.session_num != '0':
                 bill_session += ' Special Session %s' % bill.session_num
@@ -352,12 +351,8 @@ class CABillScraper(BillScraper):
             # Get digest test (aka "summary") from latest version.
             if bill.versions:
                 version = bill.versions[-1]
-                nsmap = version.xml.nsmap
-                xpath = '//caml:DigestText/xhtml:p'
-                els = version.xml.xpath(xpath, namespaces=nsmap)
                 chunks = []
-                for el in els:
-                    t = etree_text_content(el)
+                for t in version.digest:
                     t = re.sub(r'\s+', ' ', t)
                     t = re.sub(r'\)(\S)', lambda m: ') %s' % m.group(1), t)
                     chunks.append(t)
@@ -421,11 +416,18 @@ class CABillScraper(BillScraper):
                                        official_type=author.contribution)
 
             seen_actions = set()
-            for action in bill.actions:
-                if not action.action:
-                    # NULL action text seems to be an error on CA's part,
-                    # unless it has some meaning I'm missing
-                    continue
+
+            # NULL action text seems to be an error on CA's part,
+            # unless it has some meaning I'm missing
+            bill_actions = [action for action in bill.actions
+                            if action.action]
+
+            # Categorize the whole history in one call.
+            categorized = self.categorizer.categorize_many(
+                re.sub(r'\s+', ' ', action.action)
+                for action in bill_actions)
+
+            for action, attrs in zip(bill_actions, categorized):
                 actor = action.actor or chamber
                 actor = actor.strip()
                 match = re.match(r'(Assembly|Senate)($| \(Floor)', actor)
@@ -449,8 +451,6 @@ class CABillScraper(BillScraper):
                 act_str = action.action
                 act_str = re.sub(r'\s+', ' ', act_str)
 
-                attrs = self.categorizer.categorize(act_str)
-
                 # Add in the committee strings of the related committees, if
                 # any.
                 kwargs = attrs
@@ -595,8 +595,3 @@ class CABillScraper(BillScraper):
                 fsbill.add_vote(fsvote)
 
             self.save_bill(fsbill)
-
-
-def etree_text_content(el):
-    el = html.fromstring(etree.tostring(el))
-    return el.text_content()
@@ -2,7 +2,9 @@
 This file defines functions for importing the CA database dumps in mysql.
 
 The workflow is:
- - Drop & recreate the local capublic database.
+ - Drop & recreate the local capublic database (or, with --incremental,
+   reload only the current session or the daily files posted since the
+   last run, inside a transaction).
  - Inspect the FTP site with regex and determine which files have been updated, if any.
  - For each such file, unzip it & call import.
 '''
@@ -12,13 +14,20 @@ import re
 import glob
 import os.path
 import zipfile
-import subprocess
+import shutil
+import hashlib
 import logging
 import urllib
+import urllib2
+import json
+import argparse
+import tempfile
 from datetime import datetime
 from os.path import join, split
 from functools import partial
+from itertools import islice
 from collections import namedtuple
+from multiprocessing.pool import ThreadPool
 
 import MySQLdb
 import _mysql_exceptions
@@ -32,8 +41,66 @@ MYSQL_USER = os.environ.get('MYSQL_USER', MYSQL_USER)
 MYSQL_PASSWORD = getattr(settings, 'MYSQL_PASSWORD', '')
 MYSQL_PASSWORD = os.environ.get('MYSQL_PASSWORD', MYSQL_PASSWORD)
 
+# The most bytes of BILL_VERSION_TBL.dat rows (xml included) to insert
+# per statement/transaction, kept under mysql's default
+# max_allowed_packet; the most rows of it to read into memory at once;
+# and the number of threads reading the referenced xml files.
+BILL_VERSION_BATCH_BYTES = getattr(settings, 'CA_BILL_VERSION_BATCH_BYTES',
+                                   3 * 1024 * 1024)
+BILL_VERSION_BATCH_BYTES = int(os.environ.get('CA_BILL_VERSION_BATCH_BYTES',
+                                              BILL_VERSION_BATCH_BYTES))
+
+BILL_VERSION_BATCH_SIZE = getattr(settings, 'CA_BILL_VERSION_BATCH_SIZE', 200)
+BILL_VERSION_BATCH_SIZE = int(os.environ.get('CA_BILL_VERSION_BATCH_SIZE',
+                                             BILL_VERSION_BATCH_SIZE))
+
+BILL_VERSION_THREADS = getattr(settings, 'CA_BILL_VERSION_THREADS', 8)
+BILL_VERSION_THREADS = int(os.environ.get('CA_BILL_VERSION_THREADS',
+                                          BILL_VERSION_THREADS))
+
+# Where the incremental sync records what it last loaded.
+MANIFEST_FILENAME = getattr(settings, 'CA_MANIFEST_FILENAME',
+                            'capublic_manifest.json')
+MANIFEST_FILENAME = os.environ.get('CA_MANIFEST_FILENAME', MANIFEST_FILENAME)
+
+# How many zips to download at once.
+DOWNLOAD_THREADS = getattr(settings, 'CA_DOWNLOAD_THREADS', 4)
+DOWNLOAD_THREADS = int(os.environ.get('CA_DOWNLOAD_THREADS', DOWNLOAD_THREADS))
+
 BASE_URL = 'ftp://www.leginfo.ca.gov/pub/bill/'
 
+# Each extracted zip's directory gets one of these, recording the
+# FTP listing date and sha256 of the zip it came from.
+CACHE_MARKER = '.download.json'
+
+DAY_FILES = (
+    'pubinfo_Mon.zip', 'pubinfo_Tue.zip', 'pubinfo_Wed.zip', 'pubinfo_Thu.zip',
+    'pubinfo_Fri.zip', 'pubinfo_Sat.zip')
+
+# The tables holding session data, by the column that scopes them
+# to a session.
+SESSION_TABLES = {
+    'bill_id': [
+        'bill_detail_vote_tbl',
+        'bill_history_tbl',
+        'bill_summary_vote_tbl',
+        'bill_analysis_tbl',
+        'bill_tbl',
+        'committee_hearing_tbl',
+        'daily_file_tbl'
+    ],
+
+    'bill_version_id': [
+        'bill_version_authors_tbl',
+        'bill_version_tbl'
+    ],
+
+    'session_year': [
+        'legislator_tbl',
+        'location_code_tbl'
+    ]
+}
+
 
 # ----------------------------------------------------------------------------
 # Logging config
@@ -50,6 +117,11 @@ logger = logging.getLogger('billy.ca-update')
 # Miscellaneous db admin commands.
 
 
+def connect(**kwargs):
+    return MySQLdb.connect(user=MYSQL_USER, passwd=MYSQL_PASSWORD,
+                           db='capublic', **kwargs)
+
+
 def clean_text(s):
     # replace smart quote characters
     s = re.sub(ur'[\u2018\u2019]', "'", s)
@@ -81,35 +153,82 @@ def db_drop():
 
 # ---------------------------------------------------------------------------
 # Functions for updating the data.
-def load_bill_versions(connection):
+DatRow = namedtuple('DatRow', [
+    'bill_version_id', 'bill_id', 'version_num',
+    'bill_version_action_date', 'bill_version_action',
+    'request_num', 'subject', 'vote_required',
+    'appropriation', 'fiscal_committee', 'local_program',
+    'substantive_changes', 'urgency', 'taxlevy',
+    'bill_xml', 'active_flg', 'trans_uid', 'trans_update'])
+
+
+def dat_row_2_tuple(row):
+    '''Convert a row in the bill_version_tbl.dat file into a
+    namedtuple.
     '''
-    Given a data folder, read its BILL_VERSION_TBL.dat file in python,
-    construct individual REPLACE statements and execute them one at
-    a time. This method is slower that letting mysql do the import,
+    cells = row.split('\t')
+    res = []
+    for cell in cells:
+        if cell.startswith('`') and cell.endswith('`'):
+            res.append(cell[1:-1])
+        elif cell == 'NULL':
+            res.append(None)
+        else:
+            res.append(cell)
+    return DatRow(*res)
+
+
+def read_bill_version(row):
+    '''Convert a raw line of BILL_VERSION_TBL.dat into a tuple of
+    values for insertion, with the contents of the xml file it
+    references in place of the filename.
+    '''
+    # The files are supposedly already in utf-8, but with
+    # copious bogus characters.
+    row = clean_text(row.decode('utf-8')).encode('utf-8')
+    row = dat_row_2_tuple(row)
+    with open(row.bill_xml) as f:
+        text = f.read().decode('utf-8')
+        text = clean_text(text).encode('utf-8')
+    return tuple(row._replace(bill_xml=text))
+
+
+def byte_batches(values, max_bytes):
+    '''Split a list of row tuples into runs of consecutive rows whose
+    values add up to no more than `max_bytes` (a row bigger than that
+    gets a run of its own).
+    '''
+    batch = []
+    size = 0
+    for value in values:
+        value_size = sum(len(v) for v in value if v is not None)
+        if batch and size + value_size > max_bytes:
+            yield batch
+            batch = []
+            size = 0
+        batch.append(value)
+        size += value_size
+    if batch:
+        yield batch
+
+
+def load_bill_versions(connection, batch_size=None, threads=None,
+                       commit=True, batch_bytes=None):
+    '''
+    Given a data folder, read its BILL_VERSION_TBL.dat file in python
+    and insert the rows in batches of up to `batch_bytes` bytes, one
+    multi-row REPLACE statement and one transaction per batch. Rows
+    are read `batch_size` at a time, and the xml files each references
+    are read by a pool of `threads` threads.
+    This method is slower that letting mysql do the import,
     but doesn't fail mysteriously.
+
+    If `commit` is false, the caller owns the transaction and nothing
+    is committed or rolled back here.
     '''
-    DatRow = namedtuple('DatRow', [
-        'bill_version_id', 'bill_id', 'version_num',
-        'bill_version_action_date', 'bill_version_action',
-        'request_num', 'subject', 'vote_required',
-        'appropriation', 'fiscal_committee', 'local_program',
-        'substantive_changes', 'urgency', 'taxlevy',
-        'bill_xml', 'active_flg', 'trans_uid', 'trans_update'])
-
-    def dat_row_2_tuple(row):
-        '''Convert a row in the bill_version_tbl.dat file into a
-        namedtuple.
-        '''
-        cells = row.split('\t')
-        res = []
-        for cell in cells:
-            if cell.startswith('`') and cell.endswith('`'):
-                res.append(cell[1:-1])
-            elif cell == 'NULL':
-                res.append(None)
-            else:
-                res.append(cell)
-        return DatRow(*res)
+    batch_size = batch_size or BILL_VERSION_BATCH_SIZE
+    batch_bytes = batch_bytes or BILL_VERSION_BATCH_BYTES
+    threads = threads or BILL_VERSION_THREADS
 
     sql = '''
         REPLACE INTO capublic.bill_version_tbl (
@@ -136,23 +255,43 @@ def load_bill_versions(connection):
         '''
     sql = sql % ', '.join(['%s'] * 18)
 
+    pool = ThreadPool(threads)
+    if commit:
+        connection.autocommit(False)
     cursor = connection.cursor()
-    with open('BILL_VERSION_TBL.dat') as f:
-        for row in f:
-            # The files are supposedly already in utf-8, but with
-            # copious bogus characters.
-            row = clean_text(row.decode('utf-8')).encode('utf-8')
-            row = dat_row_2_tuple(row)
-            with open(row.bill_xml) as f:
-                text = f.read().decode('utf-8')
-                text = clean_text(text).encode('utf-8')
-                row = row._replace(bill_xml=text)
-                cursor.execute(sql, tuple(row))
-
-    cursor.close()
-
-
-def load(folder, sql_name=partial(re.compile(r'\.dat$').sub, '.sql')):
+    count = 0
+    try:
+        with open('BILL_VERSION_TBL.dat') as f:
+            while True:
+                # Only read one batch of xml files into memory at a time.
+                rows = list(islice(f, batch_size))
+                if not rows:
+                    break
+                for values in byte_batches(
+                        pool.map(read_bill_version, rows), batch_bytes):
+                    if not commit:
+                        cursor.executemany(sql, values)
+                    else:
+                        try:
+                            # MySQLdb turns this into one multi-row REPLACE.
+                            cursor.executemany(sql, values)
+                            connection.commit()
+                        except:
+                            connection.rollback()
+                            raise
+                    count += len(values)
+                    logger.debug('inserted %d bill versions' % count)
+    finally:
+        pool.close()
+        cursor.close()
+        if commit:
+            connection.autocommit(True)
+
+    logger.info('inserted %d bill versions' % count)
+
+
+def load(folder, connection=None,
+         sql_name=partial(re.compile(r'\.dat$').sub, '.sql')):
     '''
     Import into mysql any .dat files located in `folder`.
 
@@ -160,6 +299,9 @@ def load(folder, sql_name=partial(re.compile(r'\.dat$').sub, '.sql')):
     the corresponding .sql file after swapping out windows paths for
     `folder`.
 
+    If a `connection` is passed in, the import happens inside the
+    caller's transaction on it; otherwise each statement autocommits.
+
     This function doesn't bother to delete the imported data files
     afterwards; they'll be overwritten within a week, and leaving them
     around makes testing easier (they're huge).
@@ -168,9 +310,10 @@ def load(folder, sql_name=partial(re.compile(r'\.dat$').sub, '.sql')):
     logger.info('Loading data from %s...' % folder)
     os.chdir(folder)
 
-    connection = MySQLdb.connect(user=MYSQL_USER, passwd=MYSQL_PASSWORD,
-                                 db='capublic', local_infile=1)
-    connection.autocommit(True)
+    own_connection = connection is None
+    if own_connection:
+        connection = connect(local_infile=1)
+        connection.autocommit(True)
 
     filenames = glob.glob('*.dat')
 
@@ -188,55 +331,38 @@ def load(folder, sql_name=partial(re.compile(r'\.dat$').sub, '.sql')):
         logger.info('loading ' + sql_filename)
         if sql_filename == 'bill_version_tbl.sql':
             logger.info('inserting xml files (slow)')
-            load_bill_versions(connection)
+            load_bill_versions(connection, commit=own_connection)
         else:
             cursor = connection.cursor()
             cursor.execute(script)
             cursor.close()
 
-    connection.close()
+    if own_connection:
+        connection.close()
     os.chdir('..')
     logging.info('...Done loading from %s' % folder)
 
 
-def delete_session(session_year):
+def delete_session(session_year, connection=None):
     '''
     This is the python equivalent (or at least, is supposed to be)
     of the deleteSession.bat file included in the pubinfo_load.zip file.
 
     It deletes all the entries for the specified session.
     Used before the weekly import of the new database dump on Sunday.
-    '''
-    tables = {
-        'bill_id': [
-            'bill_detail_vote_tbl',
-            'bill_history_tbl',
-            'bill_summary_vote_tbl',
-            'bill_analysis_tbl',
-            'bill_tbl',
-            'committee_hearing_tbl',
-            'daily_file_tbl'
-        ],
-
-        'bill_version_id': [
-            'bill_version_authors_tbl',
-            'bill_version_tbl'
-        ],
-
-        'session_year': [
-            'legislator_tbl',
-            'location_code_tbl'
-        ]
-    }
 
+    If a `connection` is passed in, the deletes happen inside the
+    caller's transaction on it.
+    '''
     logger.info('Deleting all data for session year %s...' % session_year)
 
-    connection = MySQLdb.connect(user=MYSQL_USER, passwd=MYSQL_PASSWORD,
-                                 db='capublic')
-    connection.autocommit(True)
+    own_connection = connection is None
+    if own_connection:
+        connection = connect()
+        connection.autocommit(True)
     cursor = connection.cursor()
 
-    for token, names in tables.items():
+    for token, names in SESSION_TABLES.items():
         for table_name in names:
             sql = ("DELETE FROM capublic.{table_name} "
                    "where {token} like '{session_year}%';")
@@ -245,16 +371,18 @@ def delete_session(session_year):
             cursor.execute(sql)
 
     cursor.close()
-    connection.close()
+    if own_connection:
+        connection.close()
     logger.info('...done deleting session data.')
 
 
-def db_create():
+def db_create(contents=None):
     '''Create the database'''
+    contents = contents or {}
 
     logger.info('Creating capublic...')
 
-    dirname = get_zip('pubinfo_load.zip')
+    dirname = get_zip('pubinfo_load.zip', contents.get('pubinfo_load.zip'))
     os.chdir(dirname)
 
     with open('capublic.sql') as f:
@@ -294,48 +422,270 @@ def get_contents():
     return resp
 
 
-def _check_call(*args):
-    logging.info('calling ' + ' '.join(args))
-    subprocess.check_call(args)
+def _read_marker(dirname):
+    try:
+        with open(join(dirname, CACHE_MARKER)) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {}
 
 
-def get_zip(filename):
+def _write_marker(dirname, date, sha256):
+    with open(join(dirname, CACHE_MARKER), 'w') as f:
+        json.dump({'date': date, 'sha256': sha256}, f)
+
+
+class _HashingWriter(object):
+
+    '''A file to shutil.copyfileobj into that hashes what's written.'''
+
+    def __init__(self, f):
+        self.f = f
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.f.write(data)
+
+
+def get_zip(filename, date=None):
+    '''Download `filename` from the FTP site and extract it into a
+    directory of the same name (minus .zip), which is returned.
+
+    The zip is streamed to a temporary file, hashed on the way, and
+    extracted from there, so it's never held in memory. If the
+    directory already holds an extraction of the zip with the same
+    FTP listing `date`, nothing is downloaded; if a redownloaded zip
+    has the same sha256 as the extracted one, it isn't extracted again.
+    '''
     dirname = filename.replace('.zip', '')
-    _check_call('wget', BASE_URL + filename)
-    _check_call('rm', '-rf', dirname)
-    _check_call('unzip', filename, '-d', dirname)
-    _check_call('rm', '-rf', filename)
+    if date is not None:
+        date = date.isoformat()
+    marker = _read_marker(dirname)
+    if date is not None and marker.get('date') == date:
+        logger.info('%s unchanged since %s, not downloading' % (
+            filename, date))
+        return dirname
+
+    logger.info('downloading ' + BASE_URL + filename)
+    fd, tmp = tempfile.mkstemp(suffix='.zip', dir='.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            writer = _HashingWriter(f)
+            resp = urllib2.urlopen(BASE_URL + filename)
+            try:
+                shutil.copyfileobj(resp, writer, 1 << 20)
+            finally:
+                resp.close()
+        sha256 = writer.sha256.hexdigest()
+
+        if marker.get('sha256') != sha256:
+            logger.info('extracting %s into %s' % (filename, dirname))
+            shutil.rmtree(dirname, ignore_errors=True)
+            with zipfile.ZipFile(tmp) as zf:
+                zf.extractall(dirname)
+    finally:
+        os.remove(tmp)
+    _write_marker(dirname, date, sha256)
     return dirname
 
 
-def get_current_year(contents):
+def get_zips(filenames, contents=None, threads=None):
+    '''Download and extract several zips concurrently. Returns their
+    directories, in the same order as `filenames`.
+    '''
+    contents = contents or {}
+    filenames = list(filenames)
+    if not filenames:
+        return []
+    pool = ThreadPool(min(threads or DOWNLOAD_THREADS, len(filenames)))
+    try:
+        return pool.map(lambda filename: get_zip(
+            filename, contents.get(filename)), filenames)
+    finally:
+        pool.close()
+
+
+def get_newest_year(contents):
+    '''Get the filename and FTP date of the latest yearly zip.
+    '''
     newest_file = '2000'
     newest_file_date = datetime(2000, 1, 1)
-    files_to_get = []
-    dirnames = []
-
-    # get file for latest year
     for filename, date in contents.items():
         date_part = filename.replace('pubinfo_', '').replace('.zip', '')
         if date_part.startswith('20') and filename > newest_file:
             newest_file = filename
             newest_file_date = date
-    files_to_get.append(newest_file)
+    return newest_file, newest_file_date
+
+
+def get_current_year(contents):
+    newest_file, newest_file_date = get_newest_year(contents)
+    files_to_get = [newest_file]
 
     # get files for days since last update
-    days = (
-        'pubinfo_Mon.zip', 'pubinfo_Tue.zip', 'pubinfo_Wed.zip', 'pubinfo_Thu.zip',
-        'pubinfo_Fri.zip', 'pubinfo_Sat.zip')
-    for dayfile in days:
+    for dayfile in DAY_FILES:
         if contents[dayfile] > newest_file_date:
             files_to_get.append(dayfile)
 
-    for file in files_to_get:
-        dirname = get_zip(file)
+    for dirname in get_zips(files_to_get, contents):
         load(dirname)
 
+
+# ---------------------------------------------------------------------------
+# Incremental sync.
+def read_manifest(filename=MANIFEST_FILENAME):
+    '''The manifest records the FTP date of each zip last loaded, and
+    the row counts and checksums of the session tables right after
+    loading them.
+    '''
+    try:
+        with open(filename) as f:
+            manifest = json.load(f)
+    except IOError:
+        return {'files': {}, 'row_counts': {}, 'checksums': {}}
+    files = {}
+    for name, date in manifest['files'].items():
+        files[name] = datetime.strptime(date, '%Y-%m-%dT%H:%M:%S')
+    manifest['files'] = files
+    return manifest
+
+
+def write_manifest(manifest, filename=MANIFEST_FILENAME):
+    files = {}
+    for name, date in manifest['files'].items():
+        files[name] = date.strftime('%Y-%m-%dT%H:%M:%S')
+    with open(filename, 'w') as f:
+        json.dump(dict(manifest, files=files), f, indent=2, sort_keys=True)
+
+
+def session_table_names():
+    return sorted(t for names in SESSION_TABLES.values() for t in names)
+
+
+def table_row_counts(connection):
+    '''The number of rows in each session table. Much cheaper than
+    their checksums, which read every row (bill xml included), so this
+    is what's compared to tell whether the tables changed since the
+    last sync.
+    '''
+    cursor = connection.cursor()
+    cursor.execute(' UNION ALL '.join(
+        "SELECT '%s', COUNT(*) FROM %s" % (table, table)
+        for table in session_table_names()))
+    counts = dict((table, int(count)) for table, count in cursor.fetchall())
+    cursor.close()
+    return counts
+
+
+def table_checksums(connection):
+    tables = session_table_names()
+    cursor = connection.cursor()
+    cursor.execute('CHECKSUM TABLE %s;' % ', '.join(tables))
+    checksums = {}
+    for table, checksum in cursor.fetchall():
+        checksums[table.split('.')[-1]] = checksum
+    cursor.close()
+    return checksums
+
+
+def plan_sync(contents, manifest, row_counts):
+    '''Decide what needs loading. Returns a 2-tuple of the session
+    year to reload from scratch (or None) and the list of zips to load.
+    '''
+    newest_file, newest_file_date = get_newest_year(contents)
+    loaded = manifest['files']
+
+    reload_year = (
+        # A new yearly dump has been posted...
+        loaded.get(newest_file) != newest_file_date or
+        # ...or the tables changed under us since we last loaded them.
+        row_counts != manifest.get('row_counts'))
+
+    if reload_year:
+        files_to_get = [newest_file]
+        since = newest_file_date
+    else:
+        files_to_get = []
+        since = max(loaded.values())
+
+    # The daily files are reused week to week, so anything posted
+    # after the last file we loaded is new.
+    for dayfile in DAY_FILES:
+        if contents[dayfile] > since:
+            files_to_get.append(dayfile)
+
+    session_year = None
+    if reload_year:
+        session_year = newest_file.replace('pubinfo_', '').replace('.zip', '')
+    return session_year, files_to_get
+
+
+def sync(contents, dry_run=False):
+    '''Bring capublic up to date without dropping it: reload the
+    current session from scratch only if there's a new yearly dump,
+    otherwise just apply the daily files posted since the last run.
+    All the deletes and loads happen in one transaction.
+    '''
+    manifest = read_manifest()
+    connection = connect(local_infile=1)
+    row_counts = table_row_counts(connection)
+    session_year, files_to_get = plan_sync(contents, manifest, row_counts)
+
+    if session_year is not None:
+        logger.info('session %s will be reloaded' % session_year)
+    for filename in files_to_get:
+        logger.info('%s (%s) will be loaded' % (filename, contents[filename]))
+    if not files_to_get:
+        logger.info('capublic is up to date')
+
+    if dry_run or not files_to_get:
+        if dry_run:
+            if session_year is not None:
+                print 'would reload session %s' % session_year
+            for filename in files_to_get:
+                print 'would load %s (%s)' % (filename, contents[filename])
+        connection.close()
+        return
+
+    dirnames = get_zips(['pubinfo_load.zip'] + files_to_get, contents)[1:]
+
+    connection.autocommit(False)
+    try:
+        if session_year is not None:
+            delete_session(session_year, connection)
+        for dirname in dirnames:
+            load(dirname, connection)
+        connection.commit()
+    except:
+        connection.rollback()
+        raise
+
+    if session_year is not None:
+        manifest['files'] = {}
+    for filename in files_to_get:
+        manifest['files'][filename] = contents[filename]
+    # Checksummed just once per load, for the record.
+    manifest['row_counts'] = table_row_counts(connection)
+    manifest['checksums'] = table_checksums(connection)
+    connection.close()
+    write_manifest(manifest)
+
+
 if __name__ == '__main__':
-    db_drop()
-    db_create()
+    parser = argparse.ArgumentParser(
+        description='Load the CA capublic database dumps into mysql.')
+    parser.add_argument('--incremental', action='store_true',
+                        help=('only load what changed since the last '
+                              'incremental run, without dropping capublic'))
+    parser.add_argument('--dry-run', action='store_true',
+                        help="print what would be loaded, but don't")
+    args = parser.parse_args()
+
     contents = get_contents()
-    get_current_year(contents)
+    if args.incremental or args.dry_run:
+        sync(contents, dry_run=args.dry_run)
+    else:
+        db_drop()
+        db_create(contents)
+        get_current_year(contents)
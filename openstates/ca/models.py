@@ -1,9 +1,12 @@
 from sqlalchemy import (Table, Column, Integer, String, ForeignKey,
                         DateTime, Numeric, desc, UnicodeText)
 from sqlalchemy.sql import and_
-from sqlalchemy.orm import backref, relation
+from sqlalchemy.orm import backref, relation, joinedload, subqueryload
 from sqlalchemy.ext.declarative import declarative_base
 
+from io import BytesIO
+from itertools import islice
+
 from lxml import etree
 
 Base = declarative_base()
@@ -74,15 +77,67 @@ class CABillVersion(Base):
                                          etree.XMLParser(recover=True))
         return self._xml
 
+    @property
+    def xml_fields(self):
+        '''The few fields we read from bill_xml, pulled out without
+        parsing the (much bigger) bill text that follows them.
+        '''
+        if not '_xml_fields' in self.__dict__:
+            self._xml_fields = extract_version_fields(
+                self.bill_xml.encode('utf-8'))
+        return self._xml_fields
+
     @property
     def title(self):
-        text = self.xml.xpath("string(//*[local-name() = 'Title'])") or ''
-        return text.strip()
+        return self.xml_fields['title'].strip()
 
     @property
     def short_title(self):
-        text = self.xml.xpath("string(//*[local-name() = 'Subject'])") or ''
-        return text.strip()
+        return self.xml_fields['subject'].strip()
+
+    @property
+    def digest(self):
+        '''The text of each paragraph of the digest.
+        '''
+        return self.xml_fields['digest']
+
+
+def _localname(el):
+    return etree.QName(el).localname
+
+
+def extract_version_fields(bill_xml):
+    '''Get the title, subject and digest paragraphs out of a version's
+    xml with iterparse, stopping as soon as all three have been seen.
+    '''
+    fields = {'title': None, 'subject': None, 'digest': []}
+    digest_done = False
+    events = etree.iterparse(BytesIO(bill_xml), events=('end',),
+                             recover=True)
+    try:
+        for _, el in events:
+            tag = _localname(el)
+            if tag == 'Title' and fields['title'] is None:
+                fields['title'] = ''.join(el.itertext())
+            elif tag == 'Subject' and fields['subject'] is None:
+                fields['subject'] = ''.join(el.itertext())
+            elif tag == 'p':
+                parent = el.getparent()
+                if parent is not None and _localname(parent) == 'DigestText':
+                    fields['digest'].append(''.join(el.itertext()))
+            elif tag == 'DigestText':
+                digest_done = True
+
+            if digest_done and None not in (fields['title'],
+                                            fields['subject']):
+                break
+    except etree.XMLSyntaxError:
+        # Same as the recovering parser: keep whatever we got.
+        pass
+
+    fields['title'] = fields['title'] or ''
+    fields['subject'] = fields['subject'] or ''
+    return fields
 
 
 class CABillVersionAuthor(Base):
@@ -267,3 +322,33 @@ class CACommitteeHearing(Base):
     trans_update_date = Column(DateTime, primary_key=True)
 
     bill = relation(CABill, backref=backref('committee_hearings'))
+
+
+def iter_bills(query, batch_size=100):
+    '''Stream the bills matching `query`, loading each batch's actions,
+    versions (with authors) and votes (with motions, locations and
+    individual votes) in a handful of queries per batch instead of a
+    few per bill.
+    '''
+    session = query.session
+    bill_ids = (bill_id for (bill_id,) in
+                query.with_entities(CABill.bill_id).yield_per(batch_size))
+    while True:
+        batch = list(islice(bill_ids, batch_size))
+        if not batch:
+            break
+        bills = query.filter(CABill.bill_id.in_(batch)).options(
+            subqueryload('actions'),
+            subqueryload('versions'),
+            subqueryload('versions.authors'),
+            subqueryload('votes'),
+            joinedload('votes.motion'),
+            joinedload('votes.location'),
+            subqueryload('votes.votes'),
+        )
+        bills = dict((bill.bill_id, bill) for bill in bills)
+        for bill_id in batch:
+            yield bills[bill_id]
+
+        # Let the batch be garbage collected.
+        session.expunge_all()
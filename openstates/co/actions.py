@@ -2,7 +2,7 @@
 
 '''
 import re
-from billy.scrape.actions import Rule, BaseCategorizer
+from openstates.utils.actions import Rule, BillyCategorizer
 
 
 committees = [
@@ -78,13 +78,13 @@ committees_rgx = '(%s)' % '|'.join(
     sorted(committees, key=len, reverse=True))
 
 
-class Categorizer(BaseCategorizer):
+class Categorizer(BillyCategorizer):
     rules = rules
 
     def categorize(self, text):
         '''Wrap categorize and add boilerplate committees.
         '''
-        attrs = BaseCategorizer.categorize(self, text)
+        attrs = BillyCategorizer.categorize(self, text)
         if 'committees' in attrs:
             committees = attrs['committees']
             for committee in re.findall(committees_rgx, text, re.I):
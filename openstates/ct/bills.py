@@ -3,14 +3,25 @@ import datetime
 from operator import itemgetter
 from collections import defaultdict
 
+from billy.core import settings
 from billy.scrape import NoDataForPeriod
 from billy.scrape.bills import BillScraper, Bill
 from billy.scrape.votes import Vote
-from .utils import parse_directory_listing, open_csv
+from openstates.utils.prefetch import Prefetcher
+from openstates.utils.ratelimit import HostRateLimiter
+from .utils import parse_directory_listing, read_csv
 
 import lxml.html
 
 
+# How many bills' status and vote pages to fetch at once, how far ahead
+# of the bill being saved, and the most requests per second to send any
+# one host while doing so.
+BILL_WORKERS = getattr(settings, 'CT_BILL_WORKERS', 4)
+BILL_LOOKAHEAD = getattr(settings, 'CT_BILL_LOOKAHEAD', 20)
+REQUESTS_PER_SECOND = getattr(settings, 'CT_REQUESTS_PER_SECOND', 4)
+
+
 class SkipBill(Exception):
     pass
 
@@ -19,71 +30,108 @@ class CTBillScraper(BillScraper):
     jurisdiction = 'ct'
     latest_only = True
 
+    def __init__(self, *args, **kwargs):
+        super(CTBillScraper, self).__init__(*args, **kwargs)
+        self.rate_limiter = HostRateLimiter(REQUESTS_PER_SECOND)
+
     def scrape(self, session, chambers):
-        self.bills = {}
         self._committee_names = {}
         self._introducers = defaultdict(set)
         self._subjects = defaultdict(list)
+        self._versions = defaultdict(list)
+        self._action_rows = defaultdict(list)
 
         self.scrape_committee_names()
         self.scrape_subjects(session)
         self.scrape_introducers('upper')
         self.scrape_introducers('lower')
-        self.scrape_bill_info(session, chambers)
         for chamber in chambers:
             self.scrape_versions(chamber, session)
-        self.scrape_bill_history()
 
-        for bill in self.bills.itervalues():
-            self.save_bill(bill)
-
-    def scrape_bill_info(self, session, chambers):
         info_url = "ftp://ftp.cga.ct.gov/pub/data/bill_info.csv"
-        data = self.urlopen(info_url)
-        page = open_csv(data)
-
+        rows = self.bill_info_rows(info_url, session, chambers)
+        self.scrape_bill_history(set(row['bill_num'] for row in rows))
+        self.scrape_bill_info(info_url, session, rows)
+
+    def fetch(self, url):
+        self.rate_limiter.wait(url)
+        return self.urlopen(url)
+
+    def bill_info_rows(self, info_url, session, chambers):
+        """
+        The rows of bill_info.csv for the bills of ``chambers``.
+        """
         chamber_map = {'H': 'lower', 'S': 'upper'}
 
-        for row in page:
-            bill_id = row['bill_num']
-            chamber = chamber_map[bill_id[0]]
+        rows = []
+        for row in read_csv(self, info_url):
+            chamber = chamber_map[row['bill_num'][0]]
 
             if not chamber in chambers:
                 continue
 
-            # assert that the bill data is from this session, CT is tricky
+            # assert that the bill data is from this session, CT is
+            # tricky
             assert row['sess_year'] == session
+            rows.append(row)
+        return rows
+
+    def scrape_bill_info(self, info_url, session, rows):
+        """
+        Fetch the pages of up to BILL_WORKERS bills at once, and save each
+        bill, in the order bill_info.csv lists them, once the versions
+        and history already read for it are added.
+        """
+        def scrape_bill(row):
+            try:
+                return self.scrape_bill(info_url, session, row)
+            except SkipBill:
+                return False
+
+        prefetcher = Prefetcher(scrape_bill, lookahead=BILL_LOOKAHEAD,
+                                workers=BILL_WORKERS, logger=self.logger)
+        for row, bill in prefetcher.iter(rows):
+            if bill is None:
+                # Fetching it failed; try again here, to get the error.
+                bill = scrape_bill(row)
+            if bill is False:
+                self.warning('no such bill: ' + row['bill_num'])
+                continue
 
-            if re.match(r'^(S|H)J', bill_id):
-                bill_type = 'joint resolution'
-            elif re.match(r'^(S|H)R', bill_id):
-                bill_type = 'resolution'
-            else:
-                bill_type = 'bill'
+            bill_id = bill['bill_id']
+            bill['subjects'] = self._subjects[bill_id]
+            for name, url in self._versions.pop(bill_id, []):
+                bill.add_version(name, url, mimetype='text/html')
+            self.add_actions(bill, self._action_rows.pop(bill_id, []))
+            self.save_bill(bill)
 
-            bill = Bill(session, chamber, bill_id,
-                        row['bill_title'],
-                        type=bill_type)
-            bill.add_source(info_url)
+    def scrape_bill(self, info_url, session, row):
+        bill_id = row['bill_num']
+        chamber = {'H': 'lower', 'S': 'upper'}[bill_id[0]]
 
-            for introducer in self._introducers[bill_id]:
-                bill.add_sponsor('primary', introducer,
-                                 official_type='introducer')
+        if re.match(r'^(S|H)J', bill_id):
+            bill_type = 'joint resolution'
+        elif re.match(r'^(S|H)R', bill_id):
+            bill_type = 'resolution'
+        else:
+            bill_type = 'bill'
 
-            try:
-                self.scrape_bill_page(bill)
+        bill = Bill(session, chamber, bill_id,
+                    row['bill_title'],
+                    type=bill_type)
+        bill.add_source(info_url)
 
-                bill['subjects'] = self._subjects[bill_id]
+        for introducer in self._introducers[bill_id]:
+            bill.add_sponsor('primary', introducer,
+                             official_type='introducer')
 
-                self.bills[bill_id] = bill
-            except SkipBill:
-                self.warning('no such bill: ' + bill_id)
-                pass
+        self.scrape_bill_page(bill)
+        return bill
 
     def scrape_bill_page(self, bill):
         url = ("http://www.cga.ct.gov/asp/cgabillstatus/cgabillstatus.asp?selBillType=Bill"
                "&bill_num=%s&which_year=%s" % (bill['bill_id'], bill['session']))
-        page = self.urlopen(url)
+        page = self.fetch(url)
         if 'not found in Database' in page:
             raise SkipBill()
         page = lxml.html.fromstring(page)
@@ -125,7 +173,7 @@ class CTBillScraper(BillScraper):
             yes_offset = 1
             no_offset = 2
 
-        page = self.urlopen(url)
+        page = self.fetch(url)
         if 'BUDGET ADDRESS' in page:
             return
 
@@ -193,76 +241,73 @@ class CTBillScraper(BillScraper):
                 for bill_id in doc.xpath('//a[contains(@href, "CGABillStatus")]/text()'):
                     self._subjects[bill_id].append(subj.text)
 
-    def scrape_bill_history(self):
+    def scrape_bill_history(self, bill_ids):
+        """
+        Keep the rows of bill_history.csv for ``bill_ids``, the bills
+        that will be scraped; the file has every bill's history.
+        """
         history_url = "ftp://ftp.cga.ct.gov/pub/data/bill_history.csv"
-        page = self.urlopen(history_url)
-        page = open_csv(page)
-
-        action_rows = defaultdict(list)
+        page = read_csv(self, history_url)
 
         for row in page:
-            bill_id = row['bill_num']
-
-            if bill_id in self.bills:
-                action_rows[bill_id].append(row)
-
-        for (bill_id, actions) in action_rows.iteritems():
-            bill = self.bills[bill_id]
-
-            actions.sort(key=itemgetter('act_date'))
-            act_chamber = bill['chamber']
-
-            for row in actions:
-                date = row['act_date']
-                date = datetime.datetime.strptime(
-                    date, "%Y-%m-%d %H:%M:%S").date()
-
-                action = row['act_desc'].strip()
-                act_type = []
-
-                match = re.search('COMM(ITTEE|\.) ON$', action)
-                if match:
-                    comm_code = row['qual1']
-                    comm_name = self._committee_names.get(comm_code,
-                                                          comm_code)
-                    action = "%s %s" % (action, comm_name)
-                    act_type.append('committee:referred')
-                elif row['qual1']:
-                    if bill['session'] in row['qual1']:
-                        action += ' (%s' % row['qual1']
-                        if row['qual2']:
-                            action += ' %s)' % row['qual2']
-                    else:
-                        action += ' %s' % row['qual1']
-
-                match = re.search(r'REFERRED TO OLR, OFA (.*)',
-                                  action)
-                if match:
-                    action = ('REFERRED TO Office of Legislative Research'
-                              ' AND Office of Fiscal Analysis %s' % (
-                                  match.group(1)))
-
-                if (re.match(r'^ADOPTED, (HOUSE|SENATE)', action) or
-                        re.match(r'^(HOUSE|SENATE) PASSED', action)):
-                    act_type.append('bill:passed')
-
-                match = re.match(r'^Joint ((Un)?[Ff]avorable)', action)
-                if match:
-                    act_type.append('committee:passed:%s' %
-                                    match.group(1).lower())
-
-                if not act_type:
-                    act_type = ['other']
-
-                bill.add_action(act_chamber, action, date,
-                                type=act_type)
-
-                if 'TRANS.TO HOUSE' in action or action == 'SENATE PASSED':
-                    act_chamber = 'lower'
-
-                if ('TRANSMITTED TO SENATE' in action or
-                        action == 'HOUSE PASSED'):
-                    act_chamber = 'upper'
+            if row['bill_num'] in bill_ids:
+                self._action_rows[row['bill_num']].append(row)
+
+    def add_actions(self, bill, actions):
+        actions.sort(key=itemgetter('act_date'))
+        act_chamber = bill['chamber']
+
+        for row in actions:
+            date = row['act_date']
+            date = datetime.datetime.strptime(
+                date, "%Y-%m-%d %H:%M:%S").date()
+
+            action = row['act_desc'].strip()
+            act_type = []
+
+            match = re.search('COMM(ITTEE|\.) ON$', action)
+            if match:
+                comm_code = row['qual1']
+                comm_name = self._committee_names.get(comm_code,
+                                                      comm_code)
+                action = "%s %s" % (action, comm_name)
+                act_type.append('committee:referred')
+            elif row['qual1']:
+                if bill['session'] in row['qual1']:
+                    action += ' (%s' % row['qual1']
+                    if row['qual2']:
+                        action += ' %s)' % row['qual2']
+                else:
+                    action += ' %s' % row['qual1']
+
+            match = re.search(r'REFERRED TO OLR, OFA (.*)',
+                              action)
+            if match:
+                action = ('REFERRED TO Office of Legislative Research'
+                          ' AND Office of Fiscal Analysis %s' % (
+                              match.group(1)))
+
+            if (re.match(r'^ADOPTED, (HOUSE|SENATE)', action) or
+                    re.match(r'^(HOUSE|SENATE) PASSED', action)):
+                act_type.append('bill:passed')
+
+            match = re.match(r'^Joint ((Un)?[Ff]avorable)', action)
+            if match:
+                act_type.append('committee:passed:%s' %
+                                match.group(1).lower())
+
+            if not act_type:
+                act_type = ['other']
+
+            bill.add_action(act_chamber, action, date,
+                            type=act_type)
+
+            if 'TRANS.TO HOUSE' in action or action == 'SENATE PASSED':
+                act_chamber = 'lower'
+
+            if ('TRANSMITTED TO SENATE' in action or
+                    action == 'HOUSE PASSED'):
+                act_chamber = 'upper'
 
     def scrape_versions(self, chamber, session):
         chamber_letter = {'upper': 's', 'lower': 'h'}[chamber]
@@ -277,18 +322,12 @@ class CTBillScraper(BillScraper):
                              f.filename)
             bill_id = match.group(1).replace('-', '')
 
-            try:
-                bill = self.bills[bill_id]
-            except KeyError:
-                continue
-
             url = versions_url + f.filename
-            bill.add_version(match.group(2), url, mimetype='text/html')
+            self._versions[bill_id].append((match.group(2), url))
 
     def scrape_committee_names(self):
         comm_url = "ftp://ftp.cga.ct.gov/pub/data/committee.csv"
-        page = self.urlopen(comm_url)
-        page = open_csv(page)
+        page = read_csv(self, comm_url)
 
         for row in page:
             comm_code = row['comm_code'].strip()
@@ -1,5 +1,8 @@
+import os
 import re
+import json
 import datetime
+import threading
 import collections
 import chardet
 import unicodecsv
@@ -8,13 +11,79 @@ try:
 except ImportError:
     import StringIO
 
+from billy.core import settings
+
+
+# How many bytes of a csv file chardet looks at; it's pure python, and
+# slow enough on the whole of bill_history.csv to matter.
+CSV_SAMPLE_SIZE = 64 * 1024
+# What a file whose sample is all ascii is read as, since chardet can't
+# tell from the sample what the rest of it is.
+CSV_ASCII_ENCODING = 'windows-1252'
+
+_encodings_lock = threading.Lock()
+
+
+def detect_encoding(sample):
+    encoding = chardet.detect(sample)['encoding']
+    if encoding is None or encoding.lower() == 'ascii':
+        return CSV_ASCII_ENCODING
+    return encoding
+
 
 def open_csv(data):
-    char_encoding = chardet.detect(data.bytes)['encoding']
+    char_encoding = detect_encoding(data.bytes[:CSV_SAMPLE_SIZE])
     return unicodecsv.DictReader(StringIO.StringIO(data.bytes),
                                  encoding=char_encoding)
 
 
+def iter_lines(data):
+    '''Yield the lines of a file's contents one at a time, with their
+    line endings, as csv readers want them, without splitting the whole
+    file into a list of lines first.
+    '''
+    start = 0
+    while start < len(data):
+        end = data.find('\n', start)
+        if end == -1:
+            yield data[start:]
+            return
+        yield data[start:end + 1]
+        start = end + 1
+
+
+def read_csv(scraper, url):
+    '''A DictReader over the csv file at ``url``, decoding rows as
+    they're read rather than copying the whole file into a StringIO.
+    The encoding is detected from the first CSV_SAMPLE_SIZE bytes, and
+    remembered (in BILLY_CACHE_DIR) for the next time the same url is
+    read.
+    '''
+    path = os.path.join(settings.BILLY_CACHE_DIR, 'ct-csv-encodings.json')
+    with _encodings_lock:
+        try:
+            with open(path) as f:
+                encodings = json.load(f)
+        except (IOError, ValueError):
+            encodings = {}
+
+    # The whole body, whether it comes from billy's response cache or
+    # scrapelib's ftp adapter, which both read it all anyway.
+    data = scraper.urlopen(url).bytes
+
+    encoding = encodings.get(url)
+    if encoding is None:
+        encoding = detect_encoding(data[:CSV_SAMPLE_SIZE])
+        with _encodings_lock:
+            encodings[url] = encoding
+            if not os.path.isdir(settings.BILLY_CACHE_DIR):
+                os.makedirs(settings.BILLY_CACHE_DIR)
+            with open(path, 'w') as f:
+                json.dump(encodings, f, indent=2, sort_keys=True)
+
+    return unicodecsv.DictReader(iter_lines(data), encoding=encoding)
+
+
 Listing = collections.namedtuple('Listing', 'mtime size filename')
 
 
@@ -1,5 +1,5 @@
 import re
-from billy.scrape.actions import Rule, BaseCategorizer
+from openstates.utils.actions import Rule, BillyCategorizer
 
 
 rules = (
@@ -37,7 +37,7 @@ rules = (
 )
 
 
-class Categorizer(BaseCategorizer):
+class Categorizer(BillyCategorizer):
     rules = rules
 
     def post_categorize(self, attrs):
@@ -14,6 +14,7 @@ from billy.scrape.bills import BillScraper, Bill
 from billy.scrape.votes import Vote
 import scrapelib
 
+from openstates.utils.probe import URLProbe, get_cache
 import actions
 
 
@@ -119,6 +120,12 @@ class DEBillScraper(BillScraper):
 
     categorizer = actions.Categorizer()
 
+    @property
+    def probe(self):
+        if not hasattr(self, '_probe'):
+            self._probe = URLProbe(self, get_cache())
+        return self._probe
+
     legislation_types = {
         'House Bill': 'bill',
         'House Concurrent Resolution': 'concurrent resolution',
@@ -250,11 +257,14 @@ class DEBillScraper(BillScraper):
     def scrape(self, chamber, session):
 
         scrape_bill = self.scrape_bill
-        for url, kw in self._get_urls(chamber, session):
-            try:
-                scrape_bill(url, kw)
-            except WeirdDataError as exc:
-                continue
+        try:
+            for url, kw in self._get_urls(chamber, session):
+                try:
+                    scrape_bill(url, kw)
+                except WeirdDataError as exc:
+                    continue
+        finally:
+            self.probe.close()
 
     def scrape_bill(self, url, kw,
                     re_amendment=re.compile(r'(^[A-Z]A \d{1,3}) to'),
@@ -668,6 +678,7 @@ class DEBillScraper(BillScraper):
             '.docx': 'application/msword'
         }
 
+        candidates = []
         for format_ in formats:
 
             el = _doc.xpath('//font[contains(., "%s%s")]' %
@@ -686,10 +697,13 @@ class DEBillScraper(BillScraper):
                 _kwargs['filename'] = _kwargs['filename'].lower()
 
             url = tmp.format(**_kwargs).replace(' ', '+')
+            candidates.append((format_, url))
 
-            try:
-                self.urlopen(url)
-            except scrapelib.HTTPError:
+        # Only check that each format exists, all at once, rather than
+        # downloading them one after another.
+        found = self.probe.exists_many([url for format_, url in candidates])
+        for (format_, url), exists in zip(candidates, found):
+            if not exists:
                 msg = 'Could\'t fetch %s version at url: "%s".'
                 self.warning(msg % (format_, url))
             else:
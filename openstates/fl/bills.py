@@ -4,7 +4,7 @@ import datetime
 
 from billy.scrape.bills import BillScraper, Bill
 from billy.scrape.votes import Vote
-from billy.scrape.utils import convert_pdf
+from openstates.utils.pdf import convert_pdf
 
 import lxml.html
 
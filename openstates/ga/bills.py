@@ -1,7 +1,8 @@
 from billy.scrape.bills import BillScraper, Bill
 from billy.scrape.votes import Vote
 from collections import defaultdict
-from .util import get_client, get_url, backoff
+from openstates.utils.prefetch import Prefetcher
+from .util import get_client, get_service, get_url, backoff, MAX_CONCURRENCY
 
 #         Methods (7):
 #            GetLegislationDetail(xs:int LegislationId, )
@@ -43,15 +44,34 @@ class GABillScraper(BillScraper):
         member_cache[member_id] = mem
         return mem
 
+    def fetch_legislation(self, lid):
+        '''The detail of a piece of legislation and its votes, by VoteId.
+        Runs on the prefetcher's threads, so uses their own clients.
+        '''
+        instrument = backoff(get_service("Legislation").GetLegislationDetail,
+                             lid)
+        votes = {}
+        for _, vote_ in instrument['Votes'] or []:
+            vote_id = vote_[0]['VoteId']
+            votes[vote_id] = backoff(get_service("Votes").GetVote, vote_id)
+        return instrument, votes
+
     def scrape(self, session, chambers):
         sid = self.metadata['session_details'][session]['_guid']
         legislation = backoff(
             self.lservice.GetLegislationForSession,
             sid
         )['LegislationIndex']
-        for leg in legislation:
-            lid = leg['Id']
-            instrument = backoff(self.lservice.GetLegislationDetail, lid)
+        # The throttle in backoff decides how many of these calls
+        # actually run at once.
+        prefetcher = Prefetcher(self.fetch_legislation,
+                                lookahead=MAX_CONCURRENCY * 2,
+                                workers=MAX_CONCURRENCY, logger=self.logger)
+        lids = [leg['Id'] for leg in legislation]
+        for lid, fetched in prefetcher.iter(lids):
+            if fetched is None:
+                fetched = self.fetch_legislation(lid)
+            instrument, fetched_votes = fetched
             history = [x for x in instrument['StatusHistory'][0]]
             actions = [{
                 "code": x['Code'],
@@ -94,7 +114,7 @@ class GABillScraper(BillScraper):
             if instrument['Votes']:
                 for vote_ in instrument['Votes']:
                     _, vote_ = vote_
-                    vote_ = backoff(self.vservice.GetVote, vote_[0]['VoteId'])
+                    vote_ = fetched_votes[vote_[0]['VoteId']]
 
                     vote = Vote(
                         {"House": "lower", "Senate": "upper"}[vote_['Branch']],
@@ -1,20 +1,135 @@
+'''
+Calling the GA SOAP services.
+
+Each service's suds client is made once per process and shared by every
+scraper, with its parsed wsdl cached on disk under BILLY_CACHE_DIR, so
+it's only fetched again after GA_WSDL_CACHE_DAYS. Threads each get a
+clone of it, since suds clients aren't thread-safe.
+
+Calls go through backoff(), which throttles them AIMD-style rather than
+sleeping a fixed time. Every quick call raises the number allowed at
+once by about one per round, up to GA_MAX_CONCURRENCY. A slow call
+trims that number, and a fault halves it and spaces out the calls that
+follow. Throughput and latency are logged when the process exits.
+'''
 from suds.client import Client
+from suds.cache import ObjectCache
+import os
+import atexit
 import logging
 import socket
+import threading
 import urllib2
 import time
 import suds
 
+from billy.core import settings
+
 logging.getLogger('suds').setLevel(logging.WARNING)
 log = logging.getLogger('billy')
 
 
 url = 'http://webservices.legis.ga.gov/GGAServices/%s/Service.svc?wsdl'
 
+WSDL_CACHE_DAYS = getattr(settings, 'GA_WSDL_CACHE_DAYS', 7)
+MAX_CONCURRENCY = getattr(settings, 'GA_MAX_CONCURRENCY', 8)
+# Calls slower than this many seconds count as a sign of load.
+SLOW_CALL_SECONDS = getattr(settings, 'GA_SLOW_CALL_SECONDS', 5)
+# The longest the gap between starting calls can grow after faults.
+MAX_DELAY = 60
+
+_clients = {}
+_clients_lock = threading.Lock()
+_local = threading.local()
+
+
+class AdaptiveThrottle(object):
+
+    '''Call ``acquire()`` before each call and ``release(latency, fault)``
+    after it. ``limit`` is how many calls may run at once, and ``delay``
+    the least time between starting two of them.
+    '''
+    def __init__(self, max_concurrency=MAX_CONCURRENCY,
+                 slow=SLOW_CALL_SECONDS):
+        self.max_concurrency = max_concurrency
+        self.slow = slow
+        self.limit = 1.0
+        self.delay = 0.0
+        self.in_flight = 0
+        self._next_start = 0
+        self._cond = threading.Condition()
+        self.calls = 0
+        self.faults = 0
+        self.seconds = 0.0
+        self.started = None
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+            now = time.time()
+            if self.started is None:
+                self.started = now
+            start = max(now, self._next_start)
+            self._next_start = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+    def release(self, latency, fault=False):
+        with self._cond:
+            self.in_flight -= 1
+            self.calls += 1
+            self.seconds += latency
+            if fault:
+                self.faults += 1
+                self.limit = max(1.0, self.limit / 2)
+                self.delay = min(MAX_DELAY, max(1.0, self.delay * 2))
+            elif latency > self.slow:
+                self.limit = max(1.0, self.limit * 0.75)
+            else:
+                self.limit = min(self.max_concurrency,
+                                 self.limit + 1 / self.limit)
+                self.delay = self.delay / 2 if self.delay > 0.1 else 0
+            self._cond.notify_all()
+
+    def stats(self):
+        elapsed = time.time() - (self.started or time.time())
+        return dict(calls=self.calls, faults=self.faults,
+                    calls_per_second=self.calls / max(elapsed, 1e-9),
+                    mean_latency=self.seconds / max(self.calls, 1),
+                    limit=self.limit)
+
+    def report(self):
+        if self.calls:
+            log.info('GA services: %(calls)d calls, %(faults)d faults, '
+                     '%(calls_per_second).1f calls/sec, mean latency '
+                     '%(mean_latency).2fs, concurrency %(limit).1f'
+                     % self.stats())
+
+
+throttle = AdaptiveThrottle()
+atexit.register(throttle.report)
+
 
 def get_client(service):
-    client = backoff(Client, get_url(service))
-    return client
+    '''The process's suds client for ``service``.'''
+    with _clients_lock:
+        if service not in _clients:
+            cache = ObjectCache(
+                location=os.path.join(settings.BILLY_CACHE_DIR, 'ga-wsdl'),
+                days=WSDL_CACHE_DAYS)
+            _clients[service] = backoff(Client, get_url(service),
+                                        cache=cache)
+        return _clients[service]
+
+
+def get_service(service):
+    '''The service of this thread's clone of get_client(service).'''
+    clones = _local.__dict__.setdefault('clones', {})
+    if service not in clones:
+        clones[service] = get_client(service).clone()
+    return clones[service].service
 
 
 def get_url(service):
@@ -23,28 +138,30 @@ def get_url(service):
 
 def backoff(function, *args, **kwargs):
     retries = 5
-    nice = 0
-
-    def _():
-        time.sleep(1)  # Seems like their server can't handle the load.
-        return function(*args, **kwargs)
 
     for attempt in range(retries):
+        throttle.acquire()
+        start = time.time()
         try:
-            return _()
+            result = function(*args, **kwargs)
         except (socket.timeout, urllib2.URLError, suds.WebFault) as e:
-            if "This Roll Call Vote is not published." in e.message:
+            unpublished = "This Roll Call Vote is not published." in e.message
+            throttle.release(time.time() - start, fault=not unpublished)
+            if unpublished:
                 raise ValueError("Roll Call Vote isn't published")
 
-            backoff = ((attempt + 1) * 15)
             log.warning(
-                "[attempt %s]: Connection broke. Backing off for %s seconds." % (
+                "[attempt %s]: Connection broke. Backing off to %d calls "
+                "at a time, %.1f seconds apart." % (
                     attempt,
-                    backoff
+                    throttle.limit,
+                    throttle.delay
                 )
             )
             log.info(str(e))
-            time.sleep(backoff)
+            continue
+        throttle.release(time.time() - start)
+        return result
 
     raise ValueError(
         "The server's not playing nice. We can't keep slamming it."
@@ -5,7 +5,7 @@ import collections
 
 import lxml.etree
 
-from billy.scrape.utils import convert_pdf
+from openstates.utils.pdf import iter_xml_pages
 from billy.scrape.votes import VoteScraper, Vote
 from .scraper import InvalidHTTPSScraper
 
@@ -47,25 +47,23 @@ class IAVoteScraper(InvalidHTTPSScraper, VoteScraper):
                 self.logger.info(msg % filename)
             self.scrape_journal(url, 'upper', session, date)
 
-    def _journal_lines(self, etree):
-        '''A generator of text lines. Skip crap.
+    def _journal_lines(self, filename):
+        '''A generator of text lines, converted a page at a time.
+        Skip crap.
         '''
-        for page in etree:
-            for text in page.xpath('text')[3:]:
-                yield text
+        try:
+            for page in iter_xml_pages(filename):
+                for text in page.xpath('text')[3:]:
+                    yield text
+        except lxml.etree.XMLSyntaxError:
+            self.logger.warning('Skipping rest of invalid pdf: %r' % filename)
 
     def scrape_journal(self, url, chamber, session, date):
 
         filename, response = self.urlretrieve(url)
         self.logger.info('Saved journal to %r' % filename)
-        xml = convert_pdf(filename)
-        try:
-            et = lxml.etree.fromstring(xml)
-        except lxml.etree.XMLSyntaxError:
-            self.logger.warning('Skipping invalid pdf: %r' % filename)
-            return
 
-        lines = self._journal_lines(et)
+        lines = self._journal_lines(filename)
         while True:
             try:
                 line = next(lines)
@@ -8,7 +8,8 @@ from urllib import urlencode
 
 from billy.scrape.bills import BillScraper, Bill
 from billy.scrape.votes import Vote
-from billy.scrape.utils import convert_pdf
+from openstates.utils import rollcall
+from openstates.utils.pdf import convert_pdf
 
 
 def group(lst, n):
@@ -419,47 +420,16 @@ class ILBillScraper(BillScraper):
                        (bill_id, action))
 
 
+# A long name can leave just one space before the next column.
+VOTE_COLUMN_GAP = 1
+
+
 def find_columns_and_parse(vote_lines):
-    columns = find_columns(vote_lines)
-    votes = {}
-    for line in vote_lines:
-        for idx in reversed(columns):
-            bit = line[idx:]
-            line = line[:idx]
-            if bit:
-                vote, name = bit.split(' ', 1)
-                votes[name.strip()] = vote
-    return votes
-
-
-def _is_potential_column(line, i):
-    for val in VOTE_VALUES:
-        test_val = val + ' '
-        if line[i:i + len(test_val)] == test_val:
-            return True
-    return False
+    return dict(rollcall.parse(vote_lines, VOTE_VALUES, VOTE_COLUMN_GAP))
 
 
 def find_columns(vote_lines):
-    potential_columns = []
-
-    for line in vote_lines:
-        pcols = set()
-        for i, x in enumerate(line):
-            if _is_potential_column(line, i):
-                pcols.add(i)
-        potential_columns.append(pcols)
-
-    starter = potential_columns[0]
-    for pc in potential_columns[1:-1]:
-        starter.intersection_update(pc)
-    last_row_cols = potential_columns[-1]
-    if not last_row_cols.issubset(starter):
-        raise Exception(
-            "Last row columns [%s] don't align with candidate final columns [%s]" %
-            (last_row_cols, starter))
-    # we should now only have values that appeared in every line
-    return sorted(starter)
+    return rollcall.find_columns(vote_lines, VOTE_VALUES, VOTE_COLUMN_GAP)
 
 
 def build_sponsor_list(sponsor_atags):
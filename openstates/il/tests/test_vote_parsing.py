@@ -52,9 +52,17 @@ TEST_LINES3 = [
     'NV   Garrett       Y    Lauzen        Y    Radogno',
 ]
 
+# Columns only one space apart after the longest names.
+TEST_LINES4 = [
+    'Y  Althoff   NV Dillard   N  Lauzen',
+    'NV Bivins    Y  Forby, J. Y  Lightford',
+    'Y  Clayborne Y  Frerichs  P  Mr. President',
+]
+
 TEST_LINES1 = map(lambda x: x.decode('utf-8'), TEST_LINES1)
 TEST_LINES2 = map(lambda x: x.decode('utf-8'), TEST_LINES2)
 TEST_LINES3 = map(lambda x: x.decode('utf-8'), TEST_LINES3)
+TEST_LINES4 = map(lambda x: x.decode('utf-8'), TEST_LINES4)
 
 
 class TestVoteParsing(object):
@@ -84,6 +92,15 @@ class TestVoteParsing(object):
         eq_('Y', d['Syverson'])
         eq_('NV', d['Link'])
 
+    def test_find_and_parse_single_space(self):
+        d = find_columns_and_parse(TEST_LINES4)
+        eq_('Y', d['Clayborne'])
+        eq_('NV', d['Dillard'])
+        eq_('Y', d['Forby, J.'])
+        eq_('N', d['Lauzen'])
+        eq_('P', d['Mr. President'])
+        eq_(9, len(d))
+
     def test_find_columns1(self):
         columns = find_columns(TEST_LINES1)
         eq_(4, len(columns))
@@ -111,6 +128,9 @@ class TestVoteParsing(object):
         eq_(38, c)
         eq_(57, d)
 
+    def test_find_columns_single_space(self):
+        eq_([0, 13, 26], find_columns(TEST_LINES4))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,8 +1,54 @@
 import os
 import time
-import requests
+import json
 import urlparse
-import functools
+import threading
+from multiprocessing.pool import ThreadPool
+
+import requests
+from billy.core import settings
+
+from openstates.utils.cache import DirectoryCache
+from openstates.utils.ratelimit import TokenBucket
+
+
+# Requests per second, and the most sent in a burst, by every ApiClient
+# in the process; and how many requests a client runs at once.
+API_REQUESTS_PER_SECOND = getattr(
+    settings, 'INDIANA_API_REQUESTS_PER_SECOND', 5)
+API_BURST = getattr(settings, 'INDIANA_API_BURST', 10)
+API_WORKERS = getattr(settings, 'INDIANA_API_WORKERS', 4)
+
+# Set to a directory to cache api responses there, for this many seconds.
+API_CACHE_DIR = getattr(settings, 'INDIANA_API_CACHE_DIR', None)
+API_CACHE_TTL = getattr(settings, 'INDIANA_API_CACHE_TTL', 60 * 60 * 24)
+
+# Seconds to wait on the api before giving up on a request, and how
+# long to wait before retrying one that failed to connect or got a 5xx
+# (doubled on each retry).
+API_TIMEOUT = getattr(settings, 'INDIANA_API_TIMEOUT', 30)
+API_RETRY_WAIT = getattr(settings, 'INDIANA_API_RETRY_WAIT', 2)
+
+# How many times to retry a request that got a 429, a 5xx or no response.
+API_MAX_RETRIES = 5
+
+_bucket = TokenBucket(API_REQUESTS_PER_SECOND, API_BURST)
+_session = None
+_session_lock = threading.Lock()
+
+
+def shared_session():
+    '''The requests session every ApiClient uses by default, so they all
+    share one pool of (keep-alive) connections to the api.
+    '''
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=API_WORKERS)
+            _session.mount('https://', adapter)
+        return _session
 
 
 class BadApiResponse(Exception):
@@ -16,29 +62,18 @@ class BadApiResponse(Exception):
         self.resp = resp
 
 
-def check_response(method):
-    '''Decorated functions will run, and if they come back
-    with a 429 and retry-after header, will wait and try again.
-    '''
-    @functools.wraps(method)
-    def wrapped(self, *args, **kwargs):
-        resp = method(self, *args, **kwargs)
-        status = resp.status_code
-        if 400 < status:
-            if resp.status_code == 429:
-                self.handle_429(resp, *args, **kwargs)
-                return method(self, *args, **kwargs).json()
-            msg_args = (resp, resp.text, resp.headers)
-            msg = 'Bad api response: %r %r %r' % msg_args
-            raise BadApiResponse(resp, msg)
-        return resp.json()
-    return wrapped
-
-
 class ApiClient(object):
 
     '''
     docs: http://docs.api.iga.in.gov/
+
+    Requests are spaced out by a token bucket shared by every client in
+    the process, and a 429 pauses all of them for its Retry-After.
+    get_many and bill_details run up to ``workers`` requests at once,
+    and unpaginate fetches each next page while the current one is
+    being read. If given a cache (or INDIANA_API_CACHE_DIR is set),
+    responses are cached there by url. Call close() when done, to stop
+    the worker threads.
     '''
     root = "https://api.iga.in.gov/"
     resources = dict(
@@ -55,26 +90,94 @@ class ApiClient(object):
         chamber_legislators='/{session}/chambers/{chamber}/legislators',
     )
 
-    def __init__(self, scraper):
+    def __init__(self, scraper, session=None, bucket=None, cache=None,
+                 workers=API_WORKERS):
         self.scraper = scraper
         self.apikey = os.environ['INDIANA_API_KEY']
+        self.session = session or shared_session()
+        self.bucket = bucket or _bucket
+        if cache is None and API_CACHE_DIR:
+            cache = DirectoryCache(API_CACHE_DIR, API_CACHE_TTL)
+        self.cache = cache
+        self.workers = workers
+        self._pool = None
+        self._page_pool = None
 
-    @check_response
-    def geturl(self, url):
-        headers = {}
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ThreadPool(self.workers)
+        return self._pool
+
+    def close(self):
+        '''Stop the worker threads, if any were started. The client can
+        still be used afterwards; it starts new ones when it needs them.
+        '''
+        pools = (self._pool, self._page_pool)
+        self._pool = self._page_pool = None
+        for pool in pools:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    def request(self, url, *requests_args, **requests_kwargs):
+        '''GET ``url`` and return its decoded json. Retries after a 429,
+        a 5xx or a connection error or timeout, and raises BadApiResponse
+        for any other error.
+        '''
+        params = requests_kwargs.pop('params', None)
+        if params:
+            url = requests.Request('GET', url, params=params).prepare().url
+
+        if self.cache is not None:
+            cached = self.cache.get(url)
+            if cached is not None and self.cache.is_fresh(cached[0]):
+                self.cache.hits += 1
+                return json.loads(cached[1])
+
+        headers = dict(requests_kwargs.pop('headers', None) or {})
         headers['Authorization'] = self.apikey
         headers['Accept'] = "application/json"
-        self.scraper.info('Api GET next page: %r, %r' % (url, headers))
-        return self.scraper.get(url, headers=headers, verify=False)
+        requests_kwargs.update(headers=headers, verify=False)
+        requests_kwargs.setdefault('timeout', API_TIMEOUT)
+
+        for attempt in range(API_MAX_RETRIES + 1):
+            last_attempt = attempt == API_MAX_RETRIES
+            self.bucket.take()
+            self.scraper.info('Api GET: %r' % url)
+            try:
+                resp = self.session.get(url, *requests_args,
+                                        **requests_kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if last_attempt:
+                    raise
+                self.handle_failure(url, exc, attempt)
+                continue
+            if last_attempt:
+                break
+            if resp.status_code == 429:
+                self.handle_429(resp)
+            elif 500 <= resp.status_code:
+                self.handle_failure(url, resp.status_code, attempt)
+            else:
+                break
+
+        if 400 < resp.status_code:
+            msg_args = (resp, resp.text, resp.headers)
+            msg = 'Bad api response: %r %r %r' % msg_args
+            raise BadApiResponse(resp, msg)
+
+        if self.cache is not None:
+            self.cache.misses += 1
+            self.cache.set(url, {'url': url, 'fetched': time.time()},
+                           resp.content)
+        return resp.json()
+
+    def geturl(self, url):
+        return self.request(url)
 
-    @check_response
     def get_relurl(self, url):
-        headers = {}
-        headers['Authorization'] = self.apikey
-        headers['Accept'] = "application/json"
-        url = urlparse.urljoin(self.root, url)
-        self.scraper.info('Api GET: %r, %r' % (url, headers))
-        return self.scraper.get(url, headers=headers, verify=False)
+        return self.request(urlparse.urljoin(self.root, url))
 
     def make_url(self, resource_name, **url_format_args):
         # Build up the url.
@@ -83,39 +186,54 @@ class ApiClient(object):
         url = urlparse.urljoin(self.root, url)
         return url
 
-    @check_response
     def get(self, resource_name, requests_args=None,
             requests_kwargs=None, **url_format_args):
         '''Resource is a self.resources dict key.
         '''
         url = self.make_url(resource_name, **url_format_args)
-
-        # Add in the api key.
         requests_args = requests_args or ()
-        requests_kwargs = requests_kwargs or {}
-        requests_kwargs.update(verify=False)
-        headers = requests_kwargs.get('headers', {})
-        headers['Authorization'] = self.apikey
-        headers['Accept'] = "application/json"
-        requests_kwargs['headers'] = headers
+        requests_kwargs = dict(requests_kwargs or {})
+        return self.request(url, *requests_args, **requests_kwargs)
 
-        args = (url, requests_args, requests_kwargs)
-        self.scraper.info('Api GET: %r, %r, %r' % args)
-        return self.scraper.get(url, *requests_args, **requests_kwargs)
+    def get_many(self, resource_name, url_format_args):
+        '''Get a resource for each dict of url format args, up to
+        ``workers`` at a time. Yields the results in the same order.
+        '''
+        def get(kwargs):
+            return self.get(resource_name, **kwargs)
+        return self.pool.imap(get, url_format_args)
+
+    def bill_details(self, session, bill_ids):
+        '''Yield (bill, rollcalls) for each of ``bill_ids``, in order,
+        fetching up to ``workers`` bills at a time.
+        '''
+        def fetch(bill_id):
+            bill = self.get('bills', session=session, bill_id=bill_id)
+            rollcalls = self.get('bill_rollcalls', session=session,
+                                 bill_id=bill_id)
+            return bill, rollcalls
+        return self.pool.imap(fetch, bill_ids)
 
     def unpaginate(self, result):
-        for data in result['items']:
-            yield data
+        '''Yield the items of a paginated result, following nextLink.
+        Each next page is requested as soon as its link is known, so it
+        downloads while the current page's items are being used.
+        '''
+        # Pages get their own thread, so that unpaginating inside a
+        # get_many worker can't wait on a pool that's all busy.
+        if self._page_pool is None:
+            self._page_pool = ThreadPool(1)
         while True:
+            next_page = None
             if 'nextLink' in result:
-                url = result['nextLink']
-                self.scraper.info('Api GET next page: %r' % url)
-                result = self.get_relurl(url)
-                if not result['items']:
-                    return
-                for data in result['items']:
-                    yield data
-            else:
+                next_page = self._page_pool.apply_async(
+                    self.get_relurl, (result['nextLink'],))
+            for data in result['items']:
+                yield data
+            if next_page is None:
+                return
+            result = next_page.get()
+            if not result['items']:
                 return
 
     def handle_429(self, resp, *args, **kwargs):
@@ -127,8 +245,19 @@ class ApiClient(object):
         header that tells you for how many seconds to sleep before retrying.
         You should anticipate this in your API client for the smoothest user
         experience."
+
+        Every client sharing this one's token bucket waits it out.
         '''
         seconds = int(resp.headers['retry-after'])
         self.scraper.info(
             'Got a 429: Sleeping %s seconds per retry-after header.' % seconds)
+        self.bucket.pause(seconds)
+
+    def handle_failure(self, url, reason, attempt):
+        '''Wait before retrying a request that got a 5xx or no response,
+        longer after each failure.
+        '''
+        seconds = API_RETRY_WAIT * 2 ** attempt
+        self.scraper.warning('Api GET %r failed (%s): retrying in %s seconds'
+                             % (url, reason, seconds))
         time.sleep(seconds)
@@ -12,7 +12,7 @@ import scrapelib
 import requests
 from billy.scrape.bills import BillScraper, Bill
 from billy.scrape.votes import Vote
-from billy.scrape.utils import convert_pdf
+from openstates.utils.pdf import convert_pdf
 from billy.importers.bills import fix_bill_id
 
 import pytz
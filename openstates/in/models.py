@@ -5,7 +5,8 @@ import collections
 from StringIO import StringIO
 
 import scrapelib
-from billy.scrape.utils import convert_pdf, PlaintextColumns
+from billy.scrape.utils import PlaintextColumns
+from openstates.utils.pdf import convert_pdf
 from billy.scrape.votes import Vote
 
 
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+import os
+import json
+import shutil
+import tempfile
+import importlib
+
+import requests
+from nose.tools import *
+from openstates.utils.cache import DirectoryCache
+from openstates.utils.tests.fakes import FakeResponse, FakeScraper
+
+# "in" is a keyword, so the package can't be named in an import statement.
+apiclient = importlib.import_module('openstates.in.apiclient')
+
+
+def ok(url, data):
+    return FakeResponse(url, 200, json.dumps(data))
+
+
+class FakeSession(object):
+
+    def __init__(self, responses):
+        # Each GET returns (or raises) the next of ``responses``.
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append((url, kwargs))
+        resp = self.responses.pop(0)
+        if isinstance(resp, Exception):
+            raise resp
+        return resp
+
+
+class FakeBucket(object):
+
+    def __init__(self):
+        self.pauses = []
+
+    def take(self):
+        pass
+
+    def pause(self, seconds):
+        self.pauses.append(seconds)
+
+
+class TestApiClient(object):
+
+    url = 'https://api.iga.in.gov/2015/bills/hb1001'
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+        os.environ.setdefault('INDIANA_API_KEY', 'key')
+        self.retry_wait = apiclient.API_RETRY_WAIT
+        apiclient.API_RETRY_WAIT = 0
+
+    def teardown(self):
+        apiclient.API_RETRY_WAIT = self.retry_wait
+        shutil.rmtree(self.dir)
+
+    def client(self, responses, cache=None):
+        return apiclient.ApiClient(FakeScraper({}), FakeSession(responses),
+                                   bucket=FakeBucket(), cache=cache)
+
+    def test_retries_after_429(self):
+        client = self.client([
+            FakeResponse(self.url, 429, headers={'retry-after': '7'}),
+            ok(self.url, {'billName': 'HB1001'})])
+        eq_(client.request(self.url), {'billName': 'HB1001'})
+        eq_(client.bucket.pauses, [7])
+        eq_(len(client.session.requests), 2)
+
+    def test_retries_failures(self):
+        client = self.client([
+            requests.ConnectionError('connection reset'),
+            FakeResponse(self.url, 503),
+            ok(self.url, {'billName': 'HB1001'})])
+        eq_(client.request(self.url), {'billName': 'HB1001'})
+        eq_(len(client.session.requests), 3)
+        url, kwargs = client.session.requests[0]
+        eq_(kwargs['timeout'], apiclient.API_TIMEOUT)
+
+    def test_bad_response(self):
+        client = self.client([FakeResponse(self.url, 404)])
+        assert_raises(apiclient.BadApiResponse, client.request, self.url)
+
+    def test_reuses_cache(self):
+        cache = DirectoryCache(self.dir, ttl=60)
+        resp = ok(self.url, {'billName': 'HB1001'})
+        client = self.client([resp], cache=cache)
+        eq_(client.request(self.url), {'billName': 'HB1001'})
+        eq_(client.request(self.url), {'billName': 'HB1001'})
+        eq_(len(client.session.requests), 1)
+        eq_((cache.hits, cache.misses), (1, 1))
+
+    def test_close(self):
+        client = self.client([ok(self.url, {'n': 1})])
+        args = [dict(session='2015', bill_id='hb1001')]
+        eq_(list(client.get_many('bills', args)), [{'n': 1}])
+        client.close()
+        eq_(client._pool, None)
+        client.close()
@@ -1,5 +1,6 @@
 import datetime
-from billy.utils.fulltext import pdfdata_to_text, text_after_line_numbers
+from billy.utils.fulltext import text_after_line_numbers
+from openstates.utils.pdf import pdfdata_to_text
 from .bills import LABillScraper
 from .legislators import LALegislatorScraper
 from .committees import LACommitteeScraper
@@ -1,5 +1,5 @@
 import re
-from billy.scrape.actions import Rule, BaseCategorizer
+from openstates.utils.actions import Rule, BillyCategorizer
 
 # These are regex patterns that map to action categories.
 _categorizer_rules = (
@@ -79,5 +79,5 @@ _categorizer_rules = (
 )
 
 
-class Categorizer(BaseCategorizer):
+class Categorizer(BillyCategorizer):
     rules = _categorizer_rules
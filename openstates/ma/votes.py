@@ -10,7 +10,7 @@ import sh
 import tesseract
 
 import scrapelib
-from billy.scrape.utils import convert_pdf
+from openstates.utils.pdf import convert_pdf
 from billy.scrape.votes import VoteScraper, Vote as BillyVote
 
 from .lexers import with_image
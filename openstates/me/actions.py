@@ -1,5 +1,5 @@
 import re
-from billy.scrape.actions import Rule, BaseCategorizer
+from openstates.utils.actions import Rule, BillyCategorizer
 
 
 rules = (
@@ -31,13 +31,13 @@ rules = (
 )
 
 
-class Categorizer(BaseCategorizer):
+class Categorizer(BillyCategorizer):
     rules = rules
 
     def categorize(self, text):
         '''Wrap categorize and add boilerplate committees.
         '''
-        attrs = BaseCategorizer.categorize(self, text)
+        attrs = BillyCategorizer.categorize(self, text)
         committees = attrs['committees']
         for committee in re.findall(committees_rgx, text):
             if committee not in committees:
@@ -1,5 +1,5 @@
 from billy.scrape.votes import VoteScraper, Vote
-from billy.scrape.utils import convert_pdf
+from openstates.utils.pdf import convert_pdf
 
 import datetime as dt
 import lxml
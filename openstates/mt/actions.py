@@ -1,4 +1,5 @@
 import re
+from collections import Counter
 
 
 # ----------------------------------------------------------------------------
@@ -412,10 +413,11 @@ ac = set([u'2nd Reading Concur Motion Failed',
           u'Vetoed by Governor'])
 
 
-def categorize(action, funcs=_funcs):
-    '''
-    '''
-    action = action.strip('" ')
+def _normalize(action):
+    return action.strip('" ')
+
+
+def _categorize(action, funcs=_funcs):
     res = set()
     for category, f in funcs:
         if f(action):
@@ -425,3 +427,50 @@ def categorize(action, funcs=_funcs):
         return ('other',)
 
     return tuple(res)
+
+
+# Montana's action vocabulary is small and fixed, so precompute the
+# categories of every known action string once at import time.
+_index = dict((_normalize(action), _categorize(_normalize(action)))
+              for action in ac)
+
+# Index hits vs. fallbacks to the regexes, and the fallback strings
+# themselves, so we can tell when Montana's vocabulary drifts. They
+# count up across calls; reset_stats() at the start of each scrape.
+stats = {'hits': 0, 'fallbacks': 0}
+unknown_actions = Counter()
+
+
+def reset_stats():
+    stats.update(hits=0, fallbacks=0)
+    unknown_actions.clear()
+
+
+def categorize(action, funcs=_funcs):
+    '''Look the action up in the index of known action strings,
+    falling back to the regexes for anything unknown.
+    '''
+    action = _normalize(action)
+    if funcs is _funcs:
+        try:
+            res = _index[action]
+        except KeyError:
+            pass
+        else:
+            stats['hits'] += 1
+            return res
+
+    stats['fallbacks'] += 1
+    unknown_actions[action] += 1
+    return _categorize(action, funcs)
+
+
+def categorize_many(actions, funcs=_funcs):
+    '''Categorize a bill's whole history at once, running each
+    distinct action string through the regexes only once.
+    '''
+    actions = list(actions)
+    cache = {}
+    for action in set(actions):
+        cache[action] = categorize(action, funcs)
+    return [cache[action] for action in actions]
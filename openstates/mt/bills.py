@@ -9,7 +9,7 @@ from collections import defaultdict
 
 from billy.scrape.bills import BillScraper, Bill
 from billy.scrape.votes import Vote
-from billy.scrape.utils import convert_pdf
+from openstates.utils.pdf import convert_pdf
 from scrapelib import urlopen, HTTPError
 
 import lxml.html
@@ -73,6 +73,9 @@ class MTBillScraper(BillScraper):
             'P_ENTY_ID_SEQ=')
 
     def scrape(self, chamber, session):
+        # Only summarize the categorizing done for this chamber's bills.
+        actions.reset_stats()
+
         for term in self.metadata['terms']:
             if session in term['sessions']:
                 year = term['start_year']
@@ -101,6 +104,13 @@ class MTBillScraper(BillScraper):
             if bill:
                 self.save_bill(bill)
 
+        msg = 'Categorized actions: %d known strings, %d regex fallbacks'
+        self.logger.info(msg % (actions.stats['hits'],
+                                actions.stats['fallbacks']))
+        for action, count in actions.unknown_actions.most_common(10):
+            self.logger.info('Unknown action %r seen %d times' % (
+                action, count))
+
     def parse_bill(self, bill_url, session, chamber):
 
         # Temporarily skip the differently-formatted house budget bill.
@@ -267,6 +277,7 @@ class MTBillScraper(BillScraper):
 
     def add_actions(self, bill, status_page):
 
+        bill_actions = []
         for action in reversed(status_page.xpath('//div/form[3]/table[1]/tr')[1:]):
             try:
                 actor = actor_map[
@@ -280,10 +291,15 @@ class MTBillScraper(BillScraper):
             action_name = action_name.replace("&nbsp", "")
             action_date = datetime.strptime(
                 action.xpath("td[2]")[0].text, '%m/%d/%Y')
-            action_type = actions.categorize(action_name)
 
             if 'by senate' in action_name.lower():
                 actor = 'upper`'
+            bill_actions.append((actor, action_name, action_date))
+
+        action_types = actions.categorize_many(
+            action_name for _, action_name, _ in bill_actions)
+        for (actor, action_name, action_date), action_type in zip(
+                bill_actions, action_types):
             bill.add_action(actor, action_name, action_date, action_type)
 
     def _versions_dict(self, year):
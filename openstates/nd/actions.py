@@ -1,4 +1,4 @@
-from billy.scrape.actions import Rule, BaseCategorizer
+from openstates.utils.actions import Rule, BillyCategorizer
 
 # These are regex patterns that map to action categories.
 _categorizer_rules = (
@@ -18,5 +18,5 @@ _categorizer_rules = (
 )
 
 
-class NDCategorizer(BaseCategorizer):
+class NDCategorizer(BillyCategorizer):
     rules = _categorizer_rules
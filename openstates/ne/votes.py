@@ -1,9 +1,12 @@
 import os
 import re
+import pickle
+import hashlib
 import datetime
 
+from billy.core import settings
 from billy.scrape.votes import VoteScraper, Vote
-from billy.scrape.utils import convert_pdf
+from openstates.utils.pdf import iter_text_pages
 
 BILL_RE = re.compile('^LEGISLATIVE (BILL|RESOLUTION) (\d+C?A?).')
 VETO_BILL_RE = re.compile('MOTION - Override (?:Line-Item )?Veto on (\w+)')
@@ -15,6 +18,7 @@ YES_RE = re.compile('Voting in the affirmative, (\d+)')
 NO_RE = re.compile('Voting in the negative, (\d+)')
 NOT_VOTING_RE = re.compile(
     '(?:Present|Absent|Excused)?(?: and )?[Nn]ot voting, (\d+)')
+EMPTY_CHECKPOINT = dict(page=None, digest=None, date=None, bill_id=None)
 
 
 class NEVoteScraper(VoteScraper):
@@ -26,10 +30,47 @@ class NEVoteScraper(VoteScraper):
         for url in urls[session]:
             self.scrape_journal(session, url)
 
+    def journal_pages(self, journal, checkpoint):
+        '''The journal's pages after the checkpoint's page, or all of
+        them if there's no checkpoint or that page has changed.
+        '''
+        if checkpoint['page']:
+            pages = iter_text_pages(journal, first_page=checkpoint['page'])
+            for page, text in pages:
+                if hashlib.sha1(text).hexdigest() == checkpoint['digest']:
+                    self.info('resuming journal after page %d', page)
+                    return pages
+                break
+            pages.close()
+            self.warning('journal changed before page %d, starting over',
+                         checkpoint['page'])
+            checkpoint.update(EMPTY_CHECKPOINT)
+            checkpoint['votes'] = []
+        return iter_text_pages(journal)
+
     def scrape_journal(self, session, url):
+        '''The journal is one pdf that grows all session, so where we
+        got to is kept in a checkpoint: the last page that ended between
+        votes, the date and bill at that point, and the votes before it.
+        Later runs resave those votes and start parsing after that page.
+        '''
         journal, resp = self.urlretrieve(url)
-        text = convert_pdf(journal, type='text')
-        lines = text.splitlines()
+        checkpoint_file = 'ne-%s-%s.pickle' % (session, os.path.basename(url))
+        checkpoint_file = os.path.join(settings.BILLY_CACHE_DIR,
+                                       checkpoint_file)
+        try:
+            with open(checkpoint_file, 'rb') as f:
+                checkpoint = pickle.load(f)
+        except (IOError, EOFError, pickle.UnpicklingError):
+            checkpoint = dict(EMPTY_CHECKPOINT, votes=[])
+        pages = self.journal_pages(journal, checkpoint)
+
+        saved = checkpoint['votes']
+        for vote in saved:
+            self.save_vote(vote)
+        checkpoint['votes'] = len(saved)
+        date = checkpoint['date']
+        bill_id = checkpoint['bill_id']
 
         #  state machine:
         #      None - undefined state
@@ -41,91 +82,104 @@ class NEVoteScraper(VoteScraper):
         state = None
         vote = None
 
-        for line_num, line in enumerate(lines):
-            date_match = DATE_RE.findall(line)
-
-            # skip headers
-            if 'LEGISLATIVE JOURNAL' in line:
-                continue
-
-            elif date_match:
-                date = datetime.datetime.strptime(' '.join(date_match[0]),
-                                                  '%B %d %Y')
-                continue
-
-            # keep adding lines to question while quotes are open
-            elif state == 'question_quote':
-                question += ' %s' % line
-
-            elif state in ('pre-yes', 'yes', 'no', 'other'):
-                yes_match = YES_RE.match(line)
-                no_match = NO_RE.match(line)
-                other_match = NOT_VOTING_RE.match(line)
-                if yes_match:
-                    vote['yes_count'] = int(yes_match.group(1))
-                    state = 'yes'
-                elif no_match:
-                    vote['no_count'] = int(no_match.group(1))
-                    state = 'no'
-                elif other_match:
-                    vote['other_count'] += int(other_match.group(1))
-                    state = 'other'
-                elif 'having voted in the affirmative' in line:
-                    vote['passed'] = True
-                    state = None
-                    vote.validate()
-                    self.save_vote(vote)
-                    vote = None
-                elif 'Having failed' in line:
-                    vote['passed'] = False
-                    state = None
-                    vote.validate()
-                    self.save_vote(vote)
-                    vote = None
-                elif line:
-                    people = re.split('\s{3,}', line)
-                    # try:
-                    func = {'yes': vote.yes, 'no': vote.no,
-                            'other': vote.other}[state]
-                    # except KeyError:
-                        # self.warning('line showed up in pre-yes state: %s',
-                        #             line)
-                    for p in people:
-                        if p:
-                            # special case for long name w/ 1 space
-                            if p.startswith(('Lautenbaugh ', 'Langemeier ')):
-                                p1, p2 = p.split(' ', 1)
-                                func(p1)
-                                func(p2)
-                            else:
-                                func(p)
-
-            # check the text against our regexes
-            bill_match = BILL_RE.match(line)
-            veto_match = VETO_BILL_RE.findall(line)
-            question_match = QUESTION_RE.findall(line)
-            if bill_match:
-                bill_type, bill_id = bill_match.groups()
-                if bill_type == 'BILL':
-                    bill_id = 'LB ' + bill_id
-                elif bill_type == 'RESOLUTION':
-                    bill_id = 'LR ' + bill_id
-            elif question_match:
-                question = question_match[0]
-                state = 'question_quote'
-            elif veto_match:
-                bill_id = veto_match[0]
-
-            # line just finished a question
-            if state == 'question_quote' and QUESTION_MATCH_END in question:
-                question = re.sub('\s+', ' ',
-                                  question.replace(QUESTION_MATCH_END, '').strip())
-                # save prior vote
-                vote = Vote(bill_id=bill_id, session=session,
-                            bill_chamber='upper', chamber='upper',
-                            motion=question, type='passage', passed=False,
-                            date=date, yes_count=0, no_count=0, other_count=0)
-                vote.add_source(url)
-                state = 'pre-yes'
-                # reset bill_id and question
-                bill_id = question = None
+        for page, text in pages:
+            for line in text.splitlines():
+                date_match = DATE_RE.findall(line)
+
+                # skip headers
+                if 'LEGISLATIVE JOURNAL' in line:
+                    continue
+
+                elif date_match:
+                    date = datetime.datetime.strptime(' '.join(date_match[0]),
+                                                      '%B %d %Y')
+                    continue
+
+                # keep adding lines to question while quotes are open
+                elif state == 'question_quote':
+                    question += ' %s' % line
+
+                elif state in ('pre-yes', 'yes', 'no', 'other'):
+                    yes_match = YES_RE.match(line)
+                    no_match = NO_RE.match(line)
+                    other_match = NOT_VOTING_RE.match(line)
+                    if yes_match:
+                        vote['yes_count'] = int(yes_match.group(1))
+                        state = 'yes'
+                    elif no_match:
+                        vote['no_count'] = int(no_match.group(1))
+                        state = 'no'
+                    elif other_match:
+                        vote['other_count'] += int(other_match.group(1))
+                        state = 'other'
+                    elif 'having voted in the affirmative' in line:
+                        vote['passed'] = True
+                        state = None
+                        vote.validate()
+                        self.save_vote(vote)
+                        saved.append(vote)
+                        vote = None
+                    elif 'Having failed' in line:
+                        vote['passed'] = False
+                        state = None
+                        vote.validate()
+                        self.save_vote(vote)
+                        saved.append(vote)
+                        vote = None
+                    elif line:
+                        people = re.split('\s{3,}', line)
+                        # try:
+                        func = {'yes': vote.yes, 'no': vote.no,
+                                'other': vote.other}[state]
+                        # except KeyError:
+                            # self.warning('line showed up in pre-yes state: %s',
+                            #             line)
+                        for p in people:
+                            if p:
+                                # special case for long name w/ 1 space
+                                if p.startswith(('Lautenbaugh ', 'Langemeier ')):
+                                    p1, p2 = p.split(' ', 1)
+                                    func(p1)
+                                    func(p2)
+                                else:
+                                    func(p)
+
+                # check the text against our regexes
+                bill_match = BILL_RE.match(line)
+                veto_match = VETO_BILL_RE.findall(line)
+                question_match = QUESTION_RE.findall(line)
+                if bill_match:
+                    bill_type, bill_id = bill_match.groups()
+                    if bill_type == 'BILL':
+                        bill_id = 'LB ' + bill_id
+                    elif bill_type == 'RESOLUTION':
+                        bill_id = 'LR ' + bill_id
+                elif question_match:
+                    question = question_match[0]
+                    state = 'question_quote'
+                elif veto_match:
+                    bill_id = veto_match[0]
+
+                # line just finished a question
+                if state == 'question_quote' and QUESTION_MATCH_END in question:
+                    question = re.sub('\s+', ' ',
+                                      question.replace(QUESTION_MATCH_END, '').strip())
+                    # save prior vote
+                    vote = Vote(bill_id=bill_id, session=session,
+                                bill_chamber='upper', chamber='upper',
+                                motion=question, type='passage', passed=False,
+                                date=date, yes_count=0, no_count=0, other_count=0)
+                    vote.add_source(url)
+                    state = 'pre-yes'
+                    # reset bill_id and question
+                    bill_id = question = None
+
+            # A page that ends between votes is somewhere we can resume.
+            if state is None:
+                checkpoint = dict(page=page, date=date, bill_id=bill_id,
+                                  digest=hashlib.sha1(text).hexdigest(),
+                                  votes=len(saved))
+
+        checkpoint['votes'] = saved[:checkpoint['votes']]
+        with open(checkpoint_file, 'wb') as f:
+            pickle.dump(checkpoint, f, pickle.HIGHEST_PROTOCOL)
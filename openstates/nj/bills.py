@@ -128,7 +128,7 @@ class NJBillScraper(BillScraper, MDBMixin):
     def initialize_committees(self, year_abr):
         chamber = {'A': 'Assembly', 'S': 'Senate', '': ''}
 
-        com_csv = self.access_to_csv('Committee')
+        com_csv = self.mdb.rows('Committee')
 
         self._committees = {}
 
@@ -162,7 +162,7 @@ class NJBillScraper(BillScraper, MDBMixin):
 
     def scrape_bills(self, session, year_abr):
         # Main Bill information
-        main_bill_csv = self.access_to_csv('MainBill')
+        main_bill_csv = self.mdb.rows('MainBill')
 
         # keep a dictionary of bills (mapping bill_id to Bill obj)
         bill_dict = {}
@@ -189,7 +189,7 @@ class NJBillScraper(BillScraper, MDBMixin):
             bill_dict[bill_id] = bill
 
         # Sponsors
-        bill_sponsors_csv = self.access_to_csv('BillSpon')
+        bill_sponsors_csv = self.mdb.rows('BillSpon')
 
         for rec in bill_sponsors_csv:
             bill_type = rec["BillType"].strip()
@@ -205,7 +205,7 @@ class NJBillScraper(BillScraper, MDBMixin):
             bill.add_sponsor(sponsor_type, name)
 
         # Documents
-        bill_document_csv = self.access_to_csv('BillWP')
+        bill_document_csv = self.mdb.rows('BillWP')
 
         for rec in bill_document_csv:
             bill_type = rec["BillType"].strip()
@@ -358,7 +358,7 @@ class NJBillScraper(BillScraper, MDBMixin):
                 bill.add_vote(vote)
 
         # Actions
-        bill_action_csv = self.access_to_csv('BillHist')
+        bill_action_csv = self.mdb.rows('BillHist')
         actor_map = {'A': 'lower', 'G': 'executive', 'S': 'upper'}
 
         for rec in bill_action_csv:
@@ -377,7 +377,7 @@ class NJBillScraper(BillScraper, MDBMixin):
             bill.add_action(actor, action, date, type=atype)
 
         # Subjects
-        subject_csv = self.access_to_csv('BillSubj')
+        subject_csv = self.mdb.rows('BillSubj')
         for rec in subject_csv:
             bill_id = rec['BillType'].strip() + str(int(rec['BillNumber']))
             bill = bill_dict.get(bill_id)
@@ -12,8 +12,9 @@ class NJCommitteeScraper(CommitteeScraper, MDBMixin):
         year_abr = term[0:4]
 
         self._init_mdb(year_abr)
-        members_csv = self.access_to_csv('COMember')
-        info_csv = self.access_to_csv('Committee')
+        # assignment=P means they are active, assignment=R means removed
+        members_csv = self.mdb.rows('COMember', Assignment_to_Committee='P')
+        info_csv = self.mdb.rows('Committee')
 
         comm_dictionary = {}
 
@@ -42,13 +43,11 @@ class NJCommitteeScraper(CommitteeScraper, MDBMixin):
             '': 'member'
         }
         for member_rec in members_csv:
-            # assignment=P means they are active, assignment=R means removed
-            if member_rec['Assignment_to_Committee'] == 'P':
-                abr = member_rec["Code"]
-                comm_name = comm_dictionary[abr]
+            abr = member_rec["Code"]
+            comm_name = comm_dictionary[abr]
 
-                leg = member_rec["Member"]
-                role = POSITIONS[member_rec["Position_on_Committee"]]
-                comm_name.add_member(leg, role=role)
+            leg = member_rec["Member"]
+            role = POSITIONS[member_rec["Position_on_Committee"]]
+            comm_name.add_member(leg, role=role)
 
-                self.save_committee(comm_name)
+            self.save_committee(comm_name)
@@ -13,7 +13,7 @@ class NJEventScraper(EventScraper, MDBMixin):
     def initialize_committees(self, year_abr):
         chamber = {'A': 'Assembly', 'S': 'Senate', '': ''}
 
-        com_csv = self.access_to_csv('Committee')
+        com_csv = self.mdb.rows('Committee')
 
         self._committees = {}
         # There are some IDs that are missing. I'm going to add them
@@ -50,7 +50,7 @@ class NJEventScraper(EventScraper, MDBMixin):
         year_abr = ((int(session) - 209) * 2) + 2000
         self._init_mdb(year_abr)
         self.initialize_committees(year_abr)
-        records = self.access_to_csv("Agendas")
+        records = self.mdb.rows("Agendas")
         for record in records:
             if record['Status'] != "Scheduled":
                 continue
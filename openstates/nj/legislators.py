@@ -17,8 +17,8 @@ class NJLegislatorScraper(LegislatorScraper, MDBMixin):
 
         self._init_mdb(year_abr)
 
-        roster_csv = self.access_to_csv('Roster')
-        bio_csv = self.access_to_csv('LegBio')
+        roster_csv = self.mdb.rows('Roster')
+        bio_csv = self.mdb.rows('LegBio')
 
         photos = {}
         for rec in bio_csv:
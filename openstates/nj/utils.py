@@ -1,8 +1,10 @@
 import os
 import re
-import csv
-import zipfile
-import subprocess
+
+from billy.core import settings
+
+from openstates.utils.mdb import (MDBSnapshot, DownloadManifest,
+                                  ftp_listing_entries)
 
 
 def clean_committee_name(comm_name):
@@ -31,18 +33,29 @@ def chamber_name(chamber):
 class MDBMixin(object):
 
     def _init_mdb(self, year):
-        self.mdbfile = 'DB%s.mdb' % year
-        url = 'ftp://www.njleg.state.nj.us/ag/%sdata/DB%s.zip' % (year, year)
-        fname, resp = self.urlretrieve(url)
-        zf = zipfile.ZipFile(fname)
-        zf.extract(self.mdbfile)
-        os.remove(fname)
-
-    # stolen from nm/bills.py
-    def access_to_csv(self, table):
-        """ using mdbtools, read access tables as CSV """
-        commands = ['mdb-export', self.mdbfile, table]
-        pipe = subprocess.Popen(commands, stdout=subprocess.PIPE,
-                                close_fds=True).stdout
-        csvfile = csv.DictReader(pipe)
-        return csvfile
+        '''Open the snapshot (see openstates.utils.mdb) of this year's
+        database as self.mdb. The zip is only downloaded when its size
+        or timestamp in the ftp listing has changed.
+        '''
+        mdbfile = 'DB%s.mdb' % year
+        ftp_dir = 'ftp://www.njleg.state.nj.us/ag/%sdata/' % year
+        zipname = 'DB%s.zip' % year
+
+        listing = self.urlopen(ftp_dir)
+        for mtime, size, name in ftp_listing_entries(listing):
+            if name == zipname:
+                break
+        else:
+            raise ValueError('%s not found in %s' % (zipname, ftp_dir))
+
+        cache_dir = settings.BILLY_CACHE_DIR
+        manifest = DownloadManifest(os.path.join(cache_dir,
+                                                 'nj-downloads.json'))
+
+        def fetch():
+            return manifest.fetch_mdb(self, ftp_dir + zipname, mdbfile,
+                                      os.path.join(cache_dir, mdbfile),
+                                      mtime, size)
+
+        path = os.path.join(cache_dir, 'nj-DB%s.sqlite' % year)
+        self.mdb = MDBSnapshot(path, '%s %s' % (mtime, size), fetch)
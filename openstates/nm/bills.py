@@ -1,21 +1,24 @@
 import os
 import re
-import csv
-import zipfile
-import subprocess
 from datetime import datetime
 
 import lxml.html
-import scrapelib
 
+from billy.core import settings
 from billy.scrape.bills import BillScraper, Bill
 from billy.scrape.votes import Vote
-from billy.scrape.utils import convert_pdf
 
+from openstates.utils import rollcall
+from openstates.utils.dedupe import DocumentDeduper, get_cache
+from openstates.utils.pdf import convert_pdf
+from openstates.utils.mdb import (MDBSnapshot, DownloadManifest,
+                                  ftp_listing_entries)
 from .actions import Categorizer
 
 # {spaces}{vote indicator (Y/N/E/ )}{name}{lookahead:2 spaces, space-indicator}
 HOUSE_VOTE_RE = re.compile('([YNE ])\s+([A-Z][a-z\'].+?)(?=\s[\sNYE])')
+# the vote indicators as columns of a roll call grid (a blank one is absent)
+HOUSE_VOTE_CODES = ('Y', 'N', 'E')
 
 
 def convert_sv_text(text):
@@ -101,39 +104,37 @@ class NMBillScraper(BillScraper):
         ftp_base = 'ftp://www.nmlegis.gov/other/'
         if session == '2014':
             fname = 'LegInfo14'
-            fname_re = '(\d{2}-\d{2}-\d{2}  \d{2}:\d{2}(?:A|P)M) .* (LegInfo14.*zip)'
+            fname_re = 'LegInfo14.*zip$'
         else:
             raise ValueError('no zip file present for %s' % session)
 
         # use listing to get latest modified LegInfo zip
         listing = self.urlopen(ftp_base)
-        matches = re.findall(fname_re, listing)
         matches = sorted([
-            (datetime.strptime(date, '%m-%d-%y  %H:%M%p'), filename)
-            for date, filename in matches])
+            (datetime.strptime(mtime, '%m-%d-%y  %I:%M%p'), mtime, size, name)
+            for mtime, size, name in ftp_listing_entries(listing)
+            if re.match(fname_re, name)])
         if matches == []:
             raise ValueError("%s contains no matching files." % (ftp_base))
 
-        remote_file = ftp_base + matches[-1][1]
+        date, mtime, size, filename = matches[-1]
+        remote_file = ftp_base + filename
 
         # all of the data is in this Access DB, download & retrieve it
+        # (only if the zip has changed since it was last extracted)
         mdbfile = '%s.mdb' % fname
+        cache_dir = settings.BILLY_CACHE_DIR
+        manifest = DownloadManifest(os.path.join(cache_dir,
+                                                 'nm-downloads.json'))
 
-        # if a new mdbfile or it has changed
-        if getattr(self, 'mdbfile', None) != mdbfile:
-            self.mdbfile = mdbfile
-            fname, resp = self.urlretrieve(remote_file)
-            zf = zipfile.ZipFile(fname)
-            zf.extract(self.mdbfile)
-            os.remove(fname)
-
-    def access_to_csv(self, table):
-        """ using mdbtools, read access tables as CSV """
-        commands = ['mdb-export', self.mdbfile, table]
-        pipe = subprocess.Popen(commands, stdout=subprocess.PIPE,
-                                close_fds=True).stdout
-        csvfile = csv.DictReader(pipe)
-        return csvfile
+        def fetch():
+            return manifest.fetch_mdb(self, remote_file, mdbfile,
+                                      os.path.join(cache_dir, mdbfile),
+                                      mtime, size)
+
+        path = os.path.join(cache_dir, 'nm-%s.sqlite' % fname)
+        self.mdb = MDBSnapshot(path, '%s %s %s' % (filename, mtime, size),
+                               fetch)
 
     def scrape(self, chamber, session):
         chamber_letter = 'S' if chamber == 'upper' else 'H'
@@ -152,16 +153,16 @@ class NMBillScraper(BillScraper):
 
         # read in sponsor & subject mappings
         sponsor_map = {}
-        for sponsor in self.access_to_csv('tblSponsors'):
+        for sponsor in self.mdb.rows('tblSponsors'):
             sponsor_map[sponsor['SponsorCode']] = sponsor['FullName']
 
         subject_map = {}
-        for subject in self.access_to_csv('TblSubjects'):
+        for subject in self.mdb.rows('TblSubjects'):
             subject_map[subject['SubjectCode']] = subject['Subject']
 
         # get all bills into this dict, fill in action/docs before saving
         self.bills = {}
-        for data in self.access_to_csv('Legislation'):
+        for data in self.mdb.rows('Legislation'):
             # use their BillID for the key but build our own for storage
             bill_key = data['BillID'].replace(' ', '')
 
@@ -256,7 +257,7 @@ class NMBillScraper(BillScraper):
         location_map = {'H': 'lower', 'S': 'upper', 'P': 'executive'}
 
         com_location_map = {}
-        for loc in self.access_to_csv('TblLocations'):
+        for loc in self.mdb.rows('TblLocations'):
             com_location_map[loc['LocationCode']] = loc['LocationDesc']
 
         # combination of tblActions and
@@ -341,7 +342,7 @@ class NMBillScraper(BillScraper):
         # these actions need a committee name spliced in
         actions_with_committee = ('SENT', '7650', '7654')
 
-        for action in self.access_to_csv('Actions'):
+        for action in self.mdb.rows('Actions'):
             bill_key = action['BillID'].replace(' ', '')
 
             # if this is from the wrong chamber or an unknown bill skip it
@@ -586,7 +587,37 @@ class NMBillScraper(BillScraper):
                     int(yea), int(nay), int(absent) + int(exc))
         vote.add_source(url)
 
-        # votes
+        for v, name in self.house_vote_names(text, int(yea), int(nay)):
+            if v == 'Y':
+                vote.yes(name)
+            elif v == 'N':
+                vote.no(name)
+            else:   # excused/absent
+                vote.other(name)
+        return vote
+
+    def house_vote_names(self, text, yea, nay):
+        """ (vote, name) pairs from a house vote's text: read as a grid
+        of columns if that agrees with the totals, otherwise by regex """
+        # the votes start after the line with 'Nays' or 'Excused' and end
+        # at CERTIFIED or the ____ signature line
+        vote_lines = []
+        for line in text.splitlines():
+            if vote_lines and ('CERTIFIED' in line or '___' in line):
+                break
+            elif vote_lines or 'Nays' in line or 'Excused' in line:
+                vote_lines.append(line)
+        vote_lines = [line for line in vote_lines[1:] if line.strip()]
+        try:
+            votes = [(v, name) for name, v in
+                     rollcall.parse(vote_lines, HOUSE_VOTE_CODES)]
+        except ValueError:
+            votes = []
+        if votes and (yea, nay) == (sum(v == 'Y' for v, name in votes),
+                                    sum(v == 'N' for v, name in votes)):
+            return votes
+
+        votes = []
         real_votes = False
         for v, name in HOUSE_VOTE_RE.findall(text):
             # our regex is a bit broad, wait until we see 'Nays' to start
@@ -597,26 +628,13 @@ class NMBillScraper(BillScraper):
             elif 'CERTIFIED' in name or '___' in name:
                 break
             elif real_votes and name.strip():
-                if v == 'Y':
-                    vote.yes(name)
-                elif v == 'N':
-                    vote.no(name)
-                else:   # excused/absent
-                    vote.other(name)
-        return vote
+                votes.append((v, name))
+        return votes
 
     def dedupe_docs(self):
-        for bill_id, bill in self.bills.items():
-            documents = bill['documents']
-            if 1 < len(documents):
-                resp_set = set()
-                for doc in documents:
-                    try:
-                        resp = self.urlopen(doc['url'])
-                    except scrapelib.HTTPError:
-                        documents.remove(doc)
-                        continue
-                    if resp in resp_set:
-                        documents.remove(doc)
-                    else:
-                        resp_set.add(resp)
+        deduper = DocumentDeduper(self, get_cache())
+        try:
+            for bill in self.bills.itervalues():
+                bill['documents'] = deduper.dedupe(bill['documents'])
+        finally:
+            deduper.close()
@@ -1,10 +1,13 @@
 '''Note, this needs to scrape both assembly and senate sites. Neither
 house has the other's votes, so you have to scrape both and merge them.
 '''
+import os
 import re
 import datetime
-from collections import defaultdict
+from StringIO import StringIO
+from multiprocessing.pool import ThreadPool
 
+from billy.core import settings
 from billy.utils import term_for_session
 from billy.scrape.bills import BillScraper, Bill
 from billy.scrape.votes import Vote
@@ -13,25 +16,79 @@ import scrapelib
 import lxml.html
 import lxml.etree
 
+from openstates.utils.cache import SqliteCache
+from openstates.utils.prefetch import Prefetcher
+from openstates.utils.ratelimit import HostRateLimiter
 from .models import AssemblyBillPage, SenateBillPage
+from .utils import iter_api_results, group_versions
 from .actions import Categorizer
 
 
+# Pages fetched less than this many seconds ago are served from the
+# response cache; older ones are revalidated with a conditional request.
+RESPONSE_CACHE_TTL = getattr(settings, 'NY_RESPONSE_CACHE_TTL', 60 * 60 * 24)
+
+# The open legislation API results per page and pages fetched at once,
+# and the bill api object keys we'll actually use.
+API_PAGE_SIZE = getattr(settings, 'NY_API_PAGE_SIZE', 100)
+API_PAGE_WORKERS = getattr(settings, 'NY_API_PAGE_WORKERS', 4)
+API_KEYS = frozenset([
+    'coSponsors', 'multiSponsors', 'sponsor', 'actions',
+    'versions', 'votes', 'title', 'sameAs', 'summary'])
+
+# How many bills ahead to fetch assembly pages for, on how many threads,
+# and the most requests per second to send any one host while doing so.
+PREFETCH_LOOKAHEAD = getattr(settings, 'NY_PREFETCH_LOOKAHEAD', 20)
+PREFETCH_WORKERS = getattr(settings, 'NY_PREFETCH_WORKERS', 4)
+PREFETCH_REQUESTS_PER_SECOND = getattr(
+    settings, 'NY_PREFETCH_REQUESTS_PER_SECOND', 4)
+
+
 class NYBillScraper(BillScraper):
 
     jurisdiction = 'ny'
     categorizer = Categorizer()
 
+    def __init__(self, *args, **kwargs):
+        super(NYBillScraper, self).__init__(*args, **kwargs)
+        cache_dir = getattr(settings, 'BILLY_CACHE_DIR', 'cache')
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        self.response_cache = SqliteCache(
+            os.path.join(cache_dir, 'ny-responses.sqlite'),
+            ttl=RESPONSE_CACHE_TTL)
+
     def scrape(self, session, chambers):
         term_id = term_for_session('ny', session)
         for term in self.metadata['terms']:
             if term['name'] == term_id:
                 break
         self.term = term
-        for billset in self.yield_grouped_versions():
-            self.scrape_bill(session, billset)
 
-    def scrape_bill(self, session, bills):
+        rate_limiter = HostRateLimiter(PREFETCH_REQUESTS_PER_SECOND)
+
+        def prefetch(bills):
+            assembly = self.assembly_page(session, bills)
+            return assembly, assembly.prefetch(rate_limiter)
+
+        prefetcher = Prefetcher(prefetch, lookahead=PREFETCH_LOOKAHEAD,
+                                workers=PREFETCH_WORKERS, count_pages=True,
+                                logger=self.logger)
+        billsets = prefetcher.iter(self.yield_grouped_versions())
+        for billset, assembly in billsets:
+            self.scrape_bill(session, billset, assembly)
+
+        self.logger.info('prefetched %d pages in %.1fs of fetching '
+                         '(%.1f pages/sec)' % (
+                             prefetcher.pages, prefetcher.fetch_seconds,
+                             prefetcher.pages_per_second))
+
+    def assembly_page(self, session, bills):
+        billdata, details = bills[0]
+        bill_chamber = details[2]
+        return AssemblyBillPage(self, session, bill_chamber, details)
+
+    def scrape_bill(self, session, bills, assembly=None):
 
         billdata, details = bills[0]
 
@@ -40,7 +97,8 @@ class NYBillScraper(BillScraper):
 
         data = billdata['data']['bill']
 
-        assembly = AssemblyBillPage(self, session, bill_chamber, details)
+        if assembly is None:
+            assembly = self.assembly_page(session, bills)
         assembly.build()
         bill = assembly.bill
         bill.add_source(billdata['url'])
@@ -127,57 +185,53 @@ class NYBillScraper(BillScraper):
         return (senate_url, assembly_url, bill_chamber, bill_type, bill_id,
                 title, (letter, number, is_amd))
 
+    def fetch_api_page(self, year, index):
+        '''Fetch and parse one page of the open legislation search
+        for ``year``. Returns a list of results, empty past the end.
+        '''
+        url = (
+            'http://open.nysenate.gov/legislation/2.0/search.json'
+            '?term=otype:bill AND year:%d&pageSize=%d&pageIdx=%d'
+        )
+        url = url % (year, API_PAGE_SIZE, index)
+        self.logger.info('GET ' + url)
+        # Not stream=True: billy's scraper caches every response, which
+        # reads the whole body anyway (and a cached one has no raw).
+        resp = self.get(url)
+        return list(iter_api_results(StringIO(resp.content), API_KEYS))
+
     def yield_api_bills(self):
-        '''Yield individual versions. The caller can get all versions
-        for a particular ID, process the group, then throw everything
-        away and move onto the next ID.
+        '''Yield individual versions, fetching API_PAGE_WORKERS pages
+        at a time. Results come out in page order.
         '''
-        # The bill api object keys we'll actually use. Throw rest away.
-        keys = set([
-            'coSponsors', 'multiSponsors', 'sponsor', 'actions',
-            'versions', 'votes', 'title', 'sameAs', 'summary'])
-
-        index = 0
-        bills = defaultdict(list)
-
-        billdata = defaultdict(lambda: defaultdict(list))
-        for year in (self.term['start_year'], self.term['end_year']):
-            while True:
-                index += 1
-                url = (
-                    'http://open.nysenate.gov/legislation/2.0/search.json'
-                    '?term=otype:bill AND year:2013&pageSize=20&pageIdx=%d'
-                )
-                url = url % index
-                self.logger.info('GET ' + url)
-                resp = self.get(url)
-
-                data = resp.json()
-                if not data['response']['results']:
-                    break
-
-                for bill in data['response']['results']:
-                    billdata = bill['data']['bill']
-                    for junk in set(billdata) - keys:
-                        del billdata[junk]
-
-                    details = self.bill_id_details(bill)
-                    if details is None:
-                        continue
-                    (senate_url, assembly_url, bill_chamber, bill_type, bill_id,
-                     title, (letter, number, is_amd)) = details
-
-                    key = (letter, number)
-                    yield key, bill, details
+        pool = ThreadPool(API_PAGE_WORKERS)
+        try:
+            for year in (self.term['start_year'], self.term['end_year']):
+                index = 1
+                done = False
+                while not done:
+                    indexes = range(index, index + API_PAGE_WORKERS)
+                    index += API_PAGE_WORKERS
+                    pages = pool.map(
+                        lambda index: self.fetch_api_page(year, index),
+                        indexes)
+                    for results in pages:
+                        if not results:
+                            done = True
+                            break
+
+                        for bill in results:
+                            details = self.bill_id_details(bill)
+                            if details is None:
+                                continue
+                            letter, number, is_amd = details[-1]
+                            yield (letter, number), bill, details
+        finally:
+            pool.close()
 
     def yield_grouped_versions(self):
-        '''Generates a lists of versions grouped by bill id.
+        '''Generates a lists of versions grouped by bill id, across both
+        years of the term, in the order each bill id was first seen.
         '''
-        prev_key = None
-        versions = []
-        for key, bill, details in self.yield_api_bills():
-            if key is not prev_key and versions:
-                yield versions
-                versions = []
-            versions.append((bill, details))
-            prev_key = key
+        for versions in group_versions(self.yield_api_bills()):
+            yield versions
@@ -62,11 +62,46 @@ class AssemblyBillPage(BasePageyThing):
     '''Get the actions, sponsors, sponsors memo and summary
     and assembly floor votes from the assembly page.
     '''
-    @CachedAttr
-    def chunks(self):
+    @property
+    def summary_url(self):
         url = ('http://assembly.state.ny.us/leg/?default_fld=&'
                'bn=%s&Summary=Y&Actions=Y&term=%s')
-        url = url % (self.bill_id, self.term_start_year)
+        return url % (self.bill_id, self.term_start_year)
+
+    @property
+    def votes_url(self):
+        url = ('http://assembly.state.ny.us/leg/?'
+               'default_fld=&bn=%s&term=%s&Votes=Y')
+        return url % (self.bill_id, self.term_start_year)
+
+    @property
+    def page_urls(self):
+        '''The pages build() fetches, by their names in self.urls.'''
+        return {'summary': self.summary_url, 'votes': self.votes_url}
+
+    def prefetch(self, rate_limiter=None):
+        '''Fetch the pages build() will need, so it doesn't block on
+        them. Returns the number of requests that took; pages served
+        straight from the response cache don't count, and aren't held
+        up by ``rate_limiter``.
+        '''
+        self.urls.add(**self.page_urls)
+        cache = self.urls.cache
+        fetched = 0
+        for name in self.page_urls:
+            url_data = getattr(self.urls, name)
+            if 'text' in vars(url_data):
+                continue
+            cached = cache is not None and cache.has_fresh(url_data.url)
+            if rate_limiter is not None and not cached:
+                rate_limiter.wait(url_data.url)
+            if getattr(url_data.text, 'response', None) is not None:
+                fetched += 1
+        return fetched
+
+    @CachedAttr
+    def chunks(self):
+        url = self.page_urls['summary']
         self.urls.add(summary=url)
         self.bill.add_source(url)
         summary, actions = self.urls.summary.xpath('//pre')[:2]
@@ -155,21 +190,20 @@ class AssemblyBillPage(BasePageyThing):
         categorizer = self.scraper.categorizer
         actions_rgx = r'(\d{2}/\d{2}/\d{4})\s+(.+)'
         actions_data = re.findall(actions_rgx, actions)
+        bill_actions = []
         for date, action in actions_data:
             date = datetime.datetime.strptime(date, r'%m/%d/%Y')
             act_chamber = ('upper' if action.isupper() else 'lower')
-            types, attrs = categorizer.categorize(action)
-            self.bill.add_action(
-                act_chamber, action, date, type=types, **attrs)
+            bill_actions.append(
+                dict(actor=act_chamber, action=action, date=date))
             # Bail if the bill has been substituted by another.
             if 'substituted by' in action:
-                return
+                break
+        categorizer.add_actions(self.bill, bill_actions)
 
     def build_lower_votes(self):
 
-        url = ('http://assembly.state.ny.us/leg/?'
-               'default_fld=&bn=%s&term=%s&Votes=Y')
-        url = url % (self.bill_id, self.term_start_year)
+        url = self.page_urls['votes']
         self.urls.add(votes=url)
         self.bill.add_source(url)
         doc = self.urls.votes.doc
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+from nose.tools import *
+import unittest
+from openstates.ny.utils import group_versions
+
+
+def result(letter, number, amd=''):
+    bill = {'oid': '%s%s%s-2013' % (letter, number, amd)}
+    return (letter, number), bill, (letter, number, amd)
+
+
+class TestGroupVersions(object):
+
+    def test_interleaved_versions(self):
+        results = [result('S', '1'), result('A', '2'), result('S', '1', 'A'),
+                   result('A', '2', 'B'), result('S', '1', 'B')]
+        groups = group_versions(results)
+        eq_([['S1-2013', 'S1A-2013', 'S1B-2013'],
+             ['A2-2013', 'A2B-2013']],
+            [[bill['oid'] for bill, details in group] for group in groups])
+
+    def test_empty(self):
+        eq_([], group_versions([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
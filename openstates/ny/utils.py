@@ -1,6 +1,15 @@
+import json
 import collections
 
 import lxml.html
+import lxml.etree
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:
+    ijson = None
+
+from openstates.utils.pdf import get_converter
 
 
 class CachedAttr(object):
@@ -45,7 +54,11 @@ class UrlData(object):
 
     @CachedAttr
     def text(self):
-        text = self.scraper.urlopen(self.url)
+        cache = self.urls_object.cache
+        if cache is None:
+            text = self.scraper.urlopen(self.url)
+        else:
+            text = cache.fetch(self.scraper, self.url)
         self.urls_object.validate(self.name, self.url, text)
         return text
 
@@ -53,6 +66,8 @@ class UrlData(object):
     def resp(self):
         '''Return the decoded html or xml or whatever. sometimes
         necessary for a quick "if 'page not found' in html:..."
+        None if the page was served from the response cache without
+        making a request.
         '''
         return self.text.response
 
@@ -70,8 +85,7 @@ class UrlData(object):
 
     @CachedAttr
     def pdf_to_lxml(self):
-        filename, resp = self.scraper.urlretrieve(self.url)
-        text = convert_pdf(filename, 'html')
+        text = get_converter().convert(self.text.bytes, 'html')
         return lxml.html.fromstring(text)
 
     @CachedAttr
@@ -102,14 +116,21 @@ class UrlsMeta(type):
 class Urls(object):
 
     '''Contains urls we need to fetch during this scrape.
+
+    If a response cache (see openstates.utils.cache) is given, or the
+    scraper has one as its ``response_cache`` attribute, pages are
+    fetched through it. Converted pdfs are cached by openstates.utils.pdf.
     '''
     __metaclass__ = UrlsMeta
 
-    def __init__(self, scraper, urls):
+    def __init__(self, scraper, urls, cache=None):
         '''Sets a UrlData object on the instance for each named url given.
         '''
         self.urls = urls
         self.scraper = scraper
+        if cache is None:
+            cache = getattr(scraper, 'response_cache', None)
+        self.cache = cache
         for name, url in urls.items():
             url = UrlData(name, url, scraper, urls_object=self)
             setattr(self, name, url)
@@ -124,9 +145,15 @@ class Urls(object):
             yield getattr(self, name)
 
     def add(self, **name_to_url_map):
+        '''Add named urls. A name that's already present with the same
+        url keeps its UrlData, along with anything already fetched.
+        '''
         for name, url in name_to_url_map.items():
+            if self.urls.get(name) == url:
+                continue
+            self.urls[name] = url
             url_data = UrlData(name, url, self.scraper, urls_object=self)
-        setattr(self, name, url_data)
+            setattr(self, name, url_data)
 
     @staticmethod
     def validates(name, retry=False):
@@ -156,3 +183,68 @@ class Urls(object):
                     validator(self, url, text)
                 else:
                     raise e
+
+
+def group_versions(results):
+    '''Group (key, bill, details) api results by their bill ``key`` into
+    lists of (bill, details), in the order each key was first seen. The
+    API doesn't return a bill's versions next to each other (not even
+    within one year's pages), so every result is read before any group
+    is returned.
+    '''
+    groups = collections.OrderedDict()
+    for key, bill, details in results:
+        groups.setdefault(key, []).append((bill, details))
+    return groups.values()
+
+
+def iter_api_results(fileobj, keys):
+    '''Yield each result in an open legislation search.json response,
+    keeping only its oid, url and the ``keys`` of its data.bill object.
+
+    With ijson installed the response is parsed as a stream and unwanted
+    keys are never built; otherwise it's loaded whole and pruned.
+    '''
+    if ijson is None:
+        for result in json.load(fileobj)['response']['results']:
+            bill = result['data']['bill']
+            for junk in set(bill) - set(keys):
+                del bill[junk]
+            yield result
+        return
+
+    item = 'response.results.item'
+    bill_prefix = item + '.data.bill.'
+    fields = dict((item + '.' + name, name) for name in ('oid', 'url'))
+
+    result = None
+    key = builder = None
+    depth = 0
+    for prefix, event, value in ijson.parse(fileobj):
+        if builder is not None:
+            # Inside a wanted value; feed it everything until it closes.
+            builder.event(event, value)
+            if event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+            if depth == 0:
+                result['data']['bill'][key] = builder.value
+                builder = None
+        elif prefix == item:
+            if event == 'start_map':
+                result = {'data': {'bill': {}}}
+            elif event == 'end_map':
+                yield result
+        elif prefix in fields:
+            result[fields[prefix]] = value
+        elif prefix.startswith(bill_prefix) and event != 'map_key':
+            key = prefix[len(bill_prefix):]
+            if key not in keys:
+                continue
+            if event in ('start_map', 'start_array'):
+                builder = ObjectBuilder()
+                builder.event(event, value)
+                depth = 1
+            else:
+                result['data']['bill'][key] = value
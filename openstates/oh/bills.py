@@ -1,19 +1,79 @@
 import os
+import pickle
 import urlparse
 import datetime
 
-from billy.scrape import ScrapeError
+from billy.core import settings
+from billy.scrape import ScrapeError, NoDataForPeriod
 from billy.scrape.bills import BillScraper, Bill
 from billy.scrape.votes import Vote
+from openstates.utils.cache import SqliteCache
+from openstates.utils.xlsx import iter_rows
 
 import xlrd
 import scrapelib
 import lxml.html
 
 
+# Bump when scrape_workbook changes, so bills cached from workbooks that
+# haven't changed are scraped again.
+WORKBOOK_PARSER_VERSION = 1
+WORKBOOK_CACHE_TTL = getattr(settings, 'OH_WORKBOOK_CACHE_TTL',
+                             60 * 60 * 24 * 7)
+
+
+def action_columns(header):
+    """
+    (column, action, actor, action types) for each action column of a
+    status workbook, from its header row.
+    """
+    columns = []
+    actor = ""
+
+    # Actions start column after bill title
+    for colnum in range(4, len(header) - 1):
+        action = str(header[colnum])
+
+        if len(action) != 0:
+            if action.split()[0] == 'House':
+                actor = "lower"
+            elif action.split()[0] == 'Senate':
+                actor = "upper"
+            elif action.split()[-1] == 'Governor':
+                actor = "executive"
+            elif action.split()[0] == 'Gov.':
+                actor = "executive"
+            elif action.split()[-1] == 'Gov.':
+                actor = "executive"
+
+        if action in ('House Intro. Date', 'Senate Intro. Date'):
+            atype = ['bill:introduced']
+            action = action.replace('Intro. Date', 'Introduced')
+        elif action == '3rd Consideration':
+            atype = ['bill:reading:3', 'bill:passed']
+        elif action == 'Sent to Gov.':
+            atype = ['governor:received']
+        elif action == 'Signed By Governor':
+            atype = ['governor:signed']
+        else:
+            atype = ['other']
+
+        columns.append((colnum, action, actor, atype))
+    return columns
+
+
 class OHBillScraper(BillScraper):
     jurisdiction = 'oh'
 
+    def __init__(self, *args, **kwargs):
+        super(OHBillScraper, self).__init__(*args, **kwargs)
+        if not os.path.isdir(settings.BILLY_CACHE_DIR):
+            os.makedirs(settings.BILLY_CACHE_DIR)
+        # The bills scraped from each status workbook, by its content.
+        self.workbook_cache = SqliteCache(
+            os.path.join(settings.BILLY_CACHE_DIR, 'oh-workbooks.sqlite'),
+            ttl=WORKBOOK_CACHE_TTL)
+
     def scrape(self, chamber, session):
         if int(session) < 128:
             raise NoDataForPeriod(session)
@@ -37,65 +97,62 @@ class OHBillScraper(BillScraper):
                 # then the excel url for that type will 404
                 continue
 
-            sh = xlrd.open_workbook(fname).sheet_by_index(0)
-
-            # once workbook is open, we can remove tempfile
-            os.remove(fname)
-
-            for rownum in range(1, sh.nrows):
-                bill_id = '%s %s' % (bill_prefix.upper(), rownum)
-                bill_title = str(sh.cell(rownum, 3).value)
-                bill = Bill(session, chamber, bill_id, bill_title,
-                            type=bill_type)
-                bill.add_source(url)
-                bill.add_sponsor('primary', str(sh.cell(rownum, 1).value))
-
-                # add cosponsor
-                if sh.cell(rownum, 2).value:
-                    bill.add_sponsor('cosponsor',
-                                     str(sh.cell(rownum, 2).value))
-
-                actor = ""
-
-                # Actions start column after bill title
-                for colnum in range(4, sh.ncols - 1):
-                    action = str(sh.cell(0, colnum).value)
-                    cell = sh.cell(rownum, colnum)
-                    date = cell.value
-
-                    if len(action) != 0:
-                        if action.split()[0] == 'House':
-                            actor = "lower"
-                        elif action.split()[0] == 'Senate':
-                            actor = "upper"
-                        elif action.split()[-1] == 'Governor':
-                            actor = "executive"
-                        elif action.split()[0] == 'Gov.':
-                            actor = "executive"
-                        elif action.split()[-1] == 'Gov.':
-                            actor = "executive"
-
-                    if action in ('House Intro. Date', 'Senate Intro. Date'):
-                        atype = ['bill:introduced']
-                        action = action.replace('Intro. Date', 'Introduced')
-                    elif action == '3rd Consideration':
-                        atype = ['bill:reading:3', 'bill:passed']
-                    elif action == 'Sent to Gov.':
-                        atype = ['governor:received']
-                    elif action == 'Signed By Governor':
-                        atype = ['governor:signed']
-                    else:
-                        atype = ['other']
-
-                    if type(date) == float:
-                        date = str(xlrd.xldate_as_tuple(date, 0))
-                        date = datetime.datetime.strptime(
-                            date, "(%Y, %m, %d, %H, %M, %S)")
-                        bill.add_action(actor, action, date, type=atype)
-
-                self.scrape_votes(bill, bill_prefix, rownum, session)
-                self.scrape_versions(bill, bill_prefix, rownum, session)
-                self.save_bill(bill)
+            try:
+                with open(fname, 'rb') as f:
+                    data = f.read()
+
+                # A workbook that hasn't changed since the last run has
+                # the same bills.
+                artifact = 'bills:v%s:%s:%s:%s' % (
+                    WORKBOOK_PARSER_VERSION, session, chamber, bill_prefix)
+                cached = self.workbook_cache.get_artifact(artifact, data)
+                if cached is not None:
+                    self.info('%s unchanged, reusing its bills' % url)
+                    for bill in pickle.loads(cached):
+                        self.save_bill(bill)
+                    continue
+
+                bills = []
+                for bill in self.scrape_workbook(fname, url, chamber, session,
+                                                 bill_prefix, bill_type):
+                    self.save_bill(bill)
+                    bills.append(bill)
+                self.workbook_cache.set_artifact(
+                    artifact, data, pickle.dumps(bills,
+                                                 pickle.HIGHEST_PROTOCOL))
+            finally:
+                # once workbook is read, we can remove tempfile
+                os.remove(fname)
+
+    def scrape_workbook(self, fname, url, chamber, session, bill_prefix,
+                        bill_type):
+        rows = iter_rows(fname)
+        columns = action_columns(next(rows))
+
+        for rownum, row in enumerate(rows, 1):
+            bill_id = '%s %s' % (bill_prefix.upper(), rownum)
+            bill_title = str(row[3])
+            bill = Bill(session, chamber, bill_id, bill_title,
+                        type=bill_type)
+            bill.add_source(url)
+            bill.add_sponsor('primary', str(row[1]))
+
+            # add cosponsor
+            if row[2]:
+                bill.add_sponsor('cosponsor', str(row[2]))
+
+            for colnum, action, actor, atype in columns:
+                date = row[colnum]
+
+                if type(date) == float:
+                    date = str(xlrd.xldate_as_tuple(date, 0))
+                    date = datetime.datetime.strptime(
+                        date, "(%Y, %m, %d, %H, %M, %S)")
+                    bill.add_action(actor, action, date, type=list(atype))
+
+            self.scrape_votes(bill, bill_prefix, rownum, session)
+            self.scrape_versions(bill, bill_prefix, rownum, session)
+            yield bill
 
     def scrape_versions(self, bill, prefix, number, session):
         base_url = 'http://www.legislature.state.oh.us'
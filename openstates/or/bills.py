@@ -1,4 +1,4 @@
-from billy.scrape.utils import convert_pdf
+from openstates.utils.pdf import convert_pdf
 from billy.scrape.bills import BillScraper, Bill
 from billy.scrape.votes import Vote
 from .utils import year_from_session
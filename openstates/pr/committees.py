@@ -4,7 +4,7 @@ import lxml.etree
 import os
 from billy.scrape import NoDataForPeriod
 from billy.scrape.committees import CommitteeScraper, Committee
-from billy.scrape.utils import convert_pdf
+from openstates.utils.pdf import convert_pdf
 
 import re
 
@@ -1,15 +1,27 @@
 import os
 import re
 import uuid
+import pickle
 import urlparse
 import datetime
+import collections
+import multiprocessing
 
+from billy.core import settings
 from billy.scrape.votes import VoteScraper, Vote
-from .utils import parse_ftp_listing
+from openstates.utils.mdb import (DownloadManifest, ftp_listing_entries,
+                                  sha256_file)
 
 import lxml.html
 
 
+JOURNAL_WORKERS = getattr(settings, 'TX_JOURNAL_WORKERS',
+                          multiprocessing.cpu_count())
+# Bump when parse_journal changes, so journals that haven't changed since
+# they were last parsed are parsed again.
+JOURNAL_PARSER_VERSION = 1
+
+
 def next_tag(el):
     """
     Return next tag, skipping <br>s.
@@ -21,36 +33,54 @@ def next_tag(el):
 
 
 def clean_journal(root):
+    # Find everything to clean up in one walk of the tree, then clean it
+    # up in the same order as ever, since some steps see the previous ones'
+    # removals.
+    page_breaks = []
+    headers = []
+    empty_paragraphs = []
+    white_fonts = []
+    for el in root.iter('hr', 'p', 'font'):
+        if el.tag == 'hr':
+            if el.get('noshade') is not None and el.get('size') == '1':
+                page_breaks.append(el)
+        elif el.tag == 'font':
+            if el.get('color') == 'White':
+                white_fonts.append(el)
+        elif el.text and el.text.endswith("REGULAR SESSION"):
+            headers.append(el)
+        elif el.text and (("HOUSE JOURNAL" in el.text or
+                           "SENATE JOURNAL" in el.text) and
+                          "Day" in el.text):
+            headers.append(el)
+        elif not el.text and not len(el):
+            empty_paragraphs.append(el)
+
     # Remove page breaks
-    for el in root.xpath('//hr[@noshade and @size=1]'):
+    for el in page_breaks:
         parent = el.getparent()
         previous = el.getprevious()
         if previous:
             parent.remove(previous)
         parent.remove(el)
 
-    # Does lxml not support xpath ends-with?
-    for el in root.xpath("//p[contains(text(), 'REGULAR SESSION')]"):
-        if el.text.endswith("REGULAR SESSION"):
-            parent = el.getparent()
-            parent.remove(el)
-
-    for el in root.xpath("//p[contains(text(), 'JOURNAL')]"):
-        if (("HOUSE JOURNAL" in el.text or "SENATE JOURNAL" in el.text) and
-                "Day" in el.text):
-
-            parent = el.getparent()
-            parent.remove(el)
+    # Remove "REGULAR SESSION" and "HOUSE/SENATE JOURNAL ... Day" headers
+    for el in headers:
+        if el.getparent() is not None:
+            el.getparent().remove(el)
 
     # Remove empty paragraphs
-    for el in root.xpath('//p[not(node())]'):
+    for el in empty_paragraphs:
+        if el.getparent() is None:
+            # Already removed along with a page break.
+            continue
         if el.tail and el.tail != '\r\n' and el.getprevious() is not None:
             el.getprevious().tail = el.tail
         el.getparent().remove(el)
 
     # Journal pages sometimes replace spaces with <font color="White">i</font>
     # (or multiple i's for bigger spaces)
-    for el in root.xpath('//font[@color="White"]'):
+    for el in white_fonts:
         if el.text:
             el.text = ' ' * len(el.text)
 
@@ -98,15 +128,38 @@ def get_type(motion):
         return 'other'
 
 
+RECORD_VOTE_START = u"Yeas \u2014"
+VIVA_VOCE_VOTE_START = u"All Members are deemed"
+
+
+def starts_with(el, prefix):
+    """
+    Whether el's text content starts with prefix, like xpath's
+    starts-with(., prefix), without joining all of its text if it
+    doesn't need to.
+    """
+    text = el.text or ''
+    if len(text) < len(prefix):
+        text = el.text_content()
+    return text.startswith(prefix)
+
+
 def votes(root, session):
-    for vote in record_votes(root, session):
+    record, viva_voce = [], []
+    for el in root.iter('div'):
+        if starts_with(el, RECORD_VOTE_START):
+            record.append(el)
+        elif starts_with(el, VIVA_VOCE_VOTE_START):
+            viva_voce.append(el)
+
+    for vote in record_votes(record, session):
         yield vote
-    for vote in viva_voce_votes(root, session):
+    for vote in viva_voce_votes(viva_voce, session):
         yield vote
 
 
-def record_votes(root, session):
-    for el in root.xpath(u'//div[starts-with(., "Yeas \u2014")]'):
+def record_votes(els, session):
+    for el in els:
         text = ''.join(el.getprevious().getprevious().itertext())
         text.replace('\n', ' ')
         m = re.search(r'(?P<bill_id>\w+\W+\d+)(,?\W+as\W+amended,?)?\W+was\W+'
@@ -162,9 +215,9 @@ def record_votes(root, session):
             pass
 
 
-def viva_voce_votes(root, session):
+def viva_voce_votes(els, session):
     prev_id = None
-    for el in root.xpath(u'//div[starts-with(., "All Members are deemed")]'):
+    for el in els:
         text = ''.join(el.getprevious().getprevious().itertext())
         text.replace('\n', ' ')
         m = re.search(r'(?P<bill_id>\w+\W+\d+)(,\W+as\W+amended,)?\W+was\W+'
@@ -238,6 +291,36 @@ def viva_voce_votes(root, session):
             continue
 
 
+def parse_journal(args):
+    """
+    Return the votes in a journal. Runs in a worker process, so takes
+    and returns only things that pickle.
+    """
+    page, url, chamber, session, year = args
+    root = lxml.html.fromstring(page)
+    clean_journal(root)
+
+    if chamber == 'lower':
+        div = root.xpath("//div[@class = 'textpara']")[0]
+        date_str = div.text.split('---')[1].strip()
+        date = datetime.datetime.strptime(
+            date_str, "%A, %B %d, %Y").date()
+    else:
+        fname = os.path.split(urlparse.urlparse(url).path)[-1]
+        date_str = re.match(r'%sSJ(\d\d-\d\d).*\.htm' % session,
+                            fname).group(1) + " %s" % year
+        date = datetime.datetime.strptime(date_str,
+                                          "%m-%d %Y").date()
+
+    journal_votes = []
+    for vote in votes(root, session):
+        vote['date'] = date
+        vote['chamber'] = chamber
+        vote.add_source(url)
+        journal_votes.append(vote)
+    return journal_votes
+
+
 class TXVoteScraper(VoteScraper):
     jurisdiction = 'tx'
     _ftp_root = 'ftp://ftp.legis.state.tx.us/'
@@ -249,6 +332,7 @@ class TXVoteScraper(VoteScraper):
             self.warning('no journals for session 821')
             return
 
+        year = self.metadata['session_details'][session]['start_date'].year
         if len(session) == 2:
             session = "%sR" % session
 
@@ -263,32 +347,73 @@ class TXVoteScraper(VoteScraper):
             journal_root = urlparse.urljoin(journal_root, "senate/", True)
 
         listing = self.urlopen(journal_root)
-        for name in parse_ftp_listing(listing):
-            if not name.startswith(session):
-                continue
-            url = urlparse.urljoin(journal_root, name)
-            self.scrape_journal(url, chamber, session)
-
-    def scrape_journal(self, url, chamber, session):
-        year = metadata['session_details'][session]['start_date'].year
-        page = self.urlopen(url)
-        root = lxml.html.fromstring(page)
-        clean_journal(root)
+        journals = [(urlparse.urljoin(journal_root, name), mtime, size)
+                    for mtime, size, name in ftp_listing_entries(listing)
+                    if name.startswith(session)]
+        self.scrape_journals(journals, chamber, session, year)
+
+    def scrape_journals(self, journals, chamber, session, year):
+        """
+        Parse each (url, mtime, size) journal on a pool of processes,
+        while the next few are downloaded. The votes of each journal are
+        kept in BILLY_CACHE_DIR, and a journal that's listed with the
+        same mtime and size as last time (and was parsed by the same
+        JOURNAL_PARSER_VERSION) isn't fetched or parsed again. Votes are
+        saved in the order the journals are listed either way.
+        """
+        cache_dir = os.path.join(settings.BILLY_CACHE_DIR, 'tx-journals')
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        manifest = DownloadManifest(os.path.join(settings.BILLY_CACHE_DIR,
+                                                 'tx-journals.json'))
+
+        def votes_path(url):
+            name = os.path.basename(urlparse.urlparse(url).path)
+            return os.path.join(cache_dir, name + '.pickle')
+
+        pool = multiprocessing.Pool(JOURNAL_WORKERS)
+        pending = collections.deque()
+        try:
+            for url, mtime, size in journals:
+                if manifest.is_current(url, votes_path(url), mtime, size,
+                                       version=JOURNAL_PARSER_VERSION):
+                    self.info('reusing votes from %s, unchanged since %s',
+                              url, mtime)
+                    # Queued behind the journals still being parsed.
+                    pending.append((url, mtime, size, None))
+                    continue
+
+                page = self.urlopen(url)
+                args = (unicode(page), url, chamber, session, year)
+                pending.append((url, mtime, size,
+                                pool.apply_async(parse_journal, (args,))))
+                while len(pending) > JOURNAL_WORKERS * 2:
+                    self.save_journal(manifest, votes_path, *pending.popleft())
+            while pending:
+                self.save_journal(manifest, votes_path, *pending.popleft())
+        finally:
+            pool.terminate()
+
+    def save_journal(self, manifest, votes_path, url, mtime, size, result):
+        """
+        Save the votes of a journal, from the pool's ``result``, or, when
+        that's None, from the ones kept from an earlier run.
+        """
+        path = votes_path(url)
+        if result is None:
+            with open(path, 'rb') as f:
+                for vote in pickle.load(f):
+                    self.save_vote(vote)
+            return
 
-        if chamber == 'lower':
-            div = root.xpath("//div[@class = 'textpara']")[0]
-            date_str = div.text.split('---')[1].strip()
-            date = datetime.datetime.strptime(
-                date_str, "%A, %B %d, %Y").date()
-        else:
-            fname = os.path.split(urlparse.urlparse(url).path)[-1]
-            date_str = re.match(r'%sSJ(\d\d-\d\d).*\.htm' % session,
-                                fname).group(1) + " %s" % year
-            date = datetime.datetime.strptime(date_str,
-                                              "%m-%d %Y").date()
-
-        for vote in votes(root, session):
-            vote['date'] = date
-            vote['chamber'] = chamber
-            vote.add_source(url)
+        journal_votes = result.get()
+        for vote in journal_votes:
             self.save_vote(vote)
+
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(journal_votes, f, pickle.HIGHEST_PROTOCOL)
+        os.rename(path + '.tmp', path)
+        manifest.entries[url] = {'mtime': mtime, 'size': size,
+                                 'version': JOURNAL_PARSER_VERSION,
+                                 'sha256': sha256_file(path)}
+        manifest.save()
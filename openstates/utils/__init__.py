@@ -0,0 +1,3 @@
+'''
+Code shared by more than one state's scrapers.
+'''
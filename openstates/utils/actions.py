@@ -0,0 +1,362 @@
+'''
+A shared action categorizer.
+
+States describe their action categories as a sequence of ``Rule``
+objects. The rules are compiled once per rules sequence (not once per
+action, as the per-state copies of BaseCategorizer used to do), and the
+result of matching them against a given action string is memoized,
+since most states repeat the same few hundred action strings
+thousands of times per session.
+
+States built on billy's BaseCategorizer use BillyCategorizer, whose
+RuleSet matches the way billy does (see ``RuleSet``), so moving to it
+doesn't change how any of their actions are categorized.
+'''
+import re
+import copy
+from collections import namedtuple, defaultdict
+from types import MethodType
+
+from billy.scrape.actions import BaseCategorizer as _BillyBaseCategorizer
+
+
+class Rule(namedtuple('Rule', 'regexes types stop attrs')):
+
+    '''If any of ``regexes`` matches the action text, the resulting
+    action's types should include ``types``.
+
+    If stop is true, no other regexes of this rule should be tested
+    after one of them matches (or, for billy's categorizer, no other
+    rules at all).
+
+    The resulting action should contain ``attrs``, which basically
+    enables overwriting certain attributes, like the chamber if
+    the action was listed in the wrong column.
+    '''
+    def __new__(_cls, regexes, types=None, stop=False, **kwargs):
+        'Create new instance of Rule(regex, types, attrs, stop)'
+
+        # Regexes can be a string or a sequence. Keep them in the order
+        # given, which billy's categorizer depends on.
+        if isinstance(regexes, basestring):
+            regexes = [regexes]
+        unique = []
+        for regex in regexes or []:
+            if regex not in unique:
+                unique.append(regex)
+        regexes = tuple(unique)
+
+        # Types can be a string or a sequence.
+        if isinstance(types, basestring):
+            types = set([types])
+        types = set(types or [])
+
+        return tuple.__new__(_cls, (regexes, types, stop, kwargs))
+
+
+def _whitespace(regex, _rgx=re.compile(r'\s{1,4}')):
+    '''Make runs of whitespace in a rule's regex tolerant of
+    the odd extra (or missing) space in the action text.
+    '''
+    return _rgx.sub(lambda m: r'\s{,4}', regex)
+
+
+def _billy_whitespace(regex, _rgx=re.compile(r'\s{1,4}')):
+    '''billy's Rule's version of _whitespace.'''
+    return _rgx.sub(lambda m: r'\s{,10}', regex)
+
+
+class RuleSet(object):
+
+    '''A state's rules, compiled once. ``match`` returns the types
+    and attrs of every rule that matches a piece of text; results
+    for repeated text are served from a bounded memo.
+
+    With ``billy=True``, rules match exactly as billy's BaseCategorizer
+    matches them: whitespace in a regex allows up to ten spaces, there's
+    no fallback to finding the regex as a plain substring, a rule's
+    attrs replace (rather than add to) any attrs of the same name, and
+    a rule with ``stop`` set ends the matching altogether.
+    '''
+    memo_size = 50000
+
+    def __init__(self, rules, billy=False):
+        self.rules = rules
+        self.billy = billy
+        compiled = []
+        for rule in rules:
+            regexes = []
+            if billy:
+                for regex in rule.regexes:
+                    regexes.append((regex,
+                                    re.compile(_billy_whitespace(regex))))
+            else:
+                # Sort so that a rule's regexes are always tried in the
+                # same order, regardless of the order they were given.
+                for regex in sorted(rule.regexes):
+                    regexes.append((regex, re.compile(_whitespace(regex))))
+            compiled.append((regexes, frozenset(rule.types),
+                             rule.stop, tuple(rule.attrs.items())))
+        self._compiled = compiled
+        self._memo = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _match(self, text):
+        types = set()
+        attrs = defaultdict(set)
+        for regexes, rule_types, stop, rule_attrs in self._compiled:
+            for regex, compiled in regexes:
+
+                m = compiled.search(text)
+                if m is None and regex not in text:
+                    continue
+
+                # If so, apply its associated types to this action.
+                types |= rule_types
+
+                # Also add its specified attrs.
+                if m is not None:
+                    for k, v in m.groupdict().items():
+                        attrs[k].add(v)
+
+                for k, v in rule_attrs:
+                    attrs[k].add(v)
+
+                if stop is True:
+                    break
+
+        return (frozenset(types),
+                tuple((k, frozenset(v)) for k, v in attrs.items()))
+
+    def _billy_match(self, text):
+        types = set()
+        attrs = defaultdict(set)
+        for regexes, rule_types, stop, rule_attrs in self._compiled:
+            matched = None
+            for regex, compiled in regexes:
+                m = compiled.search(text)
+                if m is not None:
+                    matched = matched or {}
+                    matched.update(m.groupdict())
+            if matched is None:
+                continue
+
+            types |= rule_types
+            for k, v in matched.items():
+                attrs[k].add(v)
+            attrs.update(rule_attrs)
+
+            if stop:
+                break
+
+        return (frozenset(types),
+                tuple((k, frozenset(v) if isinstance(v, set) else v)
+                      for k, v in attrs.items()))
+
+    def match(self, text):
+        '''Returns a 2-tuple of a set of types and a defaultdict(set)
+        of attrs, both fresh copies the caller is free to mutate. (With
+        ``billy=True``, attrs set by a rule are its values as given.)
+        '''
+        try:
+            types, attrs = self._memo[text]
+            self.hits += 1
+        except KeyError:
+            if self.billy:
+                result = self._billy_match(text)
+            else:
+                result = self._match(text)
+            types, attrs = self._memo[text] = result
+            self.misses += 1
+            if len(self._memo) > self.memo_size:
+                self._memo.clear()
+
+        _attrs = defaultdict(set)
+        for k, v in attrs:
+            _attrs[k] = set(v) if isinstance(v, frozenset) else v
+        return set(types), _attrs
+
+
+_rulesets = {}
+
+
+def compile_rules(rules, billy=False):
+    '''Get the (shared) RuleSet for a rules sequence, compiling it
+    the first time it's seen.
+    '''
+    key = (id(rules), billy)
+    try:
+        ruleset = _rulesets[key]
+    except KeyError:
+        ruleset = None
+    if ruleset is None or ruleset.rules is not rules:
+        ruleset = _rulesets[key] = RuleSet(rules, billy)
+    return ruleset
+
+
+class BatchCategorizerMixin(object):
+
+    '''Categorizing a bill's actions in one go, so that repeated
+    action strings ("Referred to Committee" and friends) only get
+    categorized once per batch.
+    '''
+    def categorize_many(self, texts):
+        '''Like ``categorize``, but for a sequence of texts. Returns
+        a list with one result per text, in order.
+        '''
+        texts = list(texts)
+        results = {}
+        for text in set(texts):
+            results[text] = self.categorize(text)
+
+        # Hand out copies, since callers tend to mutate the result.
+        seen = set()
+        res = []
+        for text in texts:
+            if text in seen:
+                res.append(copy.deepcopy(results[text]))
+            else:
+                res.append(results[text])
+                seen.add(text)
+        return res
+
+    def add_actions(self, bill, actions):
+        '''Categorize all of a bill's actions in one call and add them
+        to the bill. ``actions`` is a sequence of dicts of keyword
+        arguments for ``bill.add_action`` (actor, action, date, ...).
+        '''
+        actions = list(actions)
+        results = self.categorize_many(a['action'] for a in actions)
+        for action, result in zip(actions, results):
+            kwargs = dict(action)
+            kwargs.update(self._action_kwargs(result))
+            bill.add_action(**kwargs)
+
+
+class BaseCategorizer(BatchCategorizerMixin):
+
+    '''A class that exposes a main categorizer function
+    and before and after hooks, in case a state requires specific
+    steps that make use of action or category info. The return
+    value is a 2-tuple of category types and a dictionary of
+    attributes to overwrite on the target action object.
+    '''
+    rules = []
+
+    def __init__(self):
+        before_funcs = []
+        after_funcs = []
+        for name in dir(self):
+            attr = getattr(self, name)
+            if isinstance(attr, MethodType):
+                if getattr(attr, 'before', None):
+                    before_funcs.append(attr)
+                if getattr(attr, 'after', None):
+                    after_funcs.append(attr)
+        self._before_funcs = before_funcs
+        self._after_funcs = after_funcs
+        self.ruleset = compile_rules(self.rules)
+
+    def _action_kwargs(self, result):
+        types, attrs = result
+        kwargs = dict(attrs)
+        kwargs['type'] = types
+        return kwargs
+
+    def categorize(self, text):
+
+        # Run the before hook.
+        text = self.before_categorize(text)
+        for func in self._before_funcs:
+            text = func(text)
+
+        types, attrs = self.ruleset.match(text)
+
+        # Returns types, attrs
+        return_val = (list(types), attrs)
+        return_val = self.after_categorize(return_val)
+        for func in self._after_funcs:
+            return_val = func(*return_val)
+        return self.finalize(return_val)
+
+    def before_categorize(self, text):
+        '''A precategorization hook. Takes/returns text.
+        '''
+        return text
+
+    def after_categorize(self, return_val):
+        '''A post-categorization hook. Takes, returns
+        a tuple like (types, attrs), where types is a sequence
+        of categories (e.g., bill:passed), and attrs is a
+        dictionary of addition attributes that can be used to
+        augment the action (or whatever).
+        '''
+        return return_val
+
+    def finalize(self, return_val):
+        '''Before the types and attrs get passed to the
+        importer they need to be altered by converting lists to
+        sets, etc.
+        '''
+        types, attrs = return_val
+        _attrs = {}
+
+        # Get rid of defaultdict.
+        for k, v in attrs.items():
+
+            # Skip empties.
+            if not v:
+                continue
+            else:
+                v = [x for x in v if x]
+
+            # Some vals should be strings, not seqs.
+            if k == 'actor' and len(v) == 1:
+                v = v.pop()
+
+            _attrs[k] = v
+
+        return types, _attrs
+
+
+class BillyCategorizer(BatchCategorizerMixin, _BillyBaseCategorizer):
+
+    '''billy's BaseCategorizer (categorize returns one dict of attrs,
+    including 'type', with pre_categorize/post_categorize hooks),
+    matching against the shared compiled RuleSet in billy mode, so its
+    results are the same as billy's.
+    '''
+    def __init__(self, *args, **kwargs):
+        super(BillyCategorizer, self).__init__(*args, **kwargs)
+        self.ruleset = compile_rules(self.rules, billy=True)
+
+    def _action_kwargs(self, result):
+        return result
+
+    def categorize(self, text):
+
+        # Run the pre-categorization hook.
+        text = self.pre_categorize(text)
+
+        types, return_val = self.ruleset.match(text)
+
+        return_val['type'] = list(types)
+        return_val = self.post_categorize(return_val)
+        return self.finalize(return_val)
+
+
+def after_categorize(f):
+    '''A decorator to mark a function to be run
+    after categorization has happened.
+    '''
+    f.after = True
+    return f
+
+
+def before_categorize(f):
+    '''A decorator to mark a function to be run
+    before categorization has happened.
+    '''
+    f.before = True
+    return f
@@ -0,0 +1,198 @@
+'''
+Persistent, on-disk caches for http responses (and things derived from
+them, like the html of a converted pdf), so that re-scraping pages that
+haven't changed doesn't cost a round trip.
+
+Responses are stored along with their ETag and Last-Modified headers.
+Within ``ttl`` seconds of being fetched they're served straight from the
+cache; after that they're revalidated with a conditional request, and
+a 304 refreshes the cached copy without transferring the body again.
+'''
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+
+def digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+class CachedResultStr(unicode):
+
+    '''Stands in for scrapelib's ResultStr when a page is served from the
+    cache: the decoded text, plus ``bytes``, ``encoding`` and a
+    ``response`` (None when no request was made at all).
+    '''
+    def __new__(cls, body, encoding, response=None):
+        self = unicode.__new__(cls, body.decode(encoding or 'utf-8',
+                                                'replace'))
+        self.bytes = body
+        self.encoding = encoding
+        self.response = response
+        return self
+
+
+class BaseCache(object):
+
+    '''Subclasses implement ``get(key) -> (meta, body) or None`` and
+    ``set(key, meta, body)``, where meta is a json-serializable dict.
+    A ``ttl`` of None means cached responses never go stale.
+    '''
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def is_fresh(self, meta):
+        if self.ttl is None:
+            return True
+        return time.time() - meta['fetched'] < self.ttl
+
+    def has_fresh(self, url):
+        '''Whether fetch() would serve ``url`` without making a request.'''
+        cached = self.get(url)
+        return cached is not None and self.is_fresh(cached[0])
+
+    def fetch(self, scraper, url, **kwargs):
+        '''GET ``url`` through ``scraper.urlopen``, using the cached copy
+        when it's fresh and a conditional request when it's stale.
+        Returns a ResultStr (or CachedResultStr).
+        '''
+        cached = self.get(url)
+        if cached is not None:
+            meta, body = cached
+            if self.is_fresh(meta):
+                self.hits += 1
+                return CachedResultStr(body, meta['encoding'])
+
+            headers = dict(kwargs.pop('headers', {}))
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+            resp = scraper.urlopen(url, headers=headers, **kwargs)
+            if resp.response.status_code == 304:
+                self.revalidated += 1
+                meta['fetched'] = time.time()
+                self.set(url, meta, body)
+                return CachedResultStr(body, meta['encoding'],
+                                       response=resp.response)
+        else:
+            resp = scraper.urlopen(url, **kwargs)
+
+        self.misses += 1
+        headers = resp.response.headers
+        meta = {
+            'url': url,
+            'encoding': resp.encoding,
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'fetched': time.time(),
+        }
+        self.set(url, meta, resp.bytes)
+        return resp
+
+    def get_artifact(self, name, source):
+        '''Get something derived from the bytes ``source`` (e.g. the
+        html of a converted pdf) under ``name``, or None. Artifacts are
+        keyed on the source's digest, so a changed source is never
+        mistaken for the old one; with a ``ttl`` they're also remade once
+        they're that old, so fixes to whatever made them get picked up.
+        '''
+        cached = self.get('artifact:%s:%s' % (name, digest(source)))
+        if cached is not None and self.is_fresh(cached[0]):
+            return cached[1]
+
+    def set_artifact(self, name, source, data):
+        self.set('artifact:%s:%s' % (name, digest(source)),
+                 {'fetched': time.time()}, data)
+
+
+class DirectoryCache(BaseCache):
+
+    '''Stores each entry as a pair of files named for the digest of
+    its key: <digest>.json for the metadata and <digest> for the body.
+    '''
+    def __init__(self, path, ttl=None):
+        super(DirectoryCache, self).__init__(ttl)
+        self.path = path
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    def _filename(self, key):
+        return os.path.join(self.path, digest(key.encode('utf-8')))
+
+    def get(self, key):
+        filename = self._filename(key)
+        try:
+            with open(filename + '.json') as f:
+                meta = json.load(f)
+            with open(filename, 'rb') as f:
+                body = f.read()
+        except (IOError, ValueError):
+            return None
+        return meta, body
+
+    def set(self, key, meta, body):
+        filename = self._filename(key)
+        # Write the body first so a json file always has a body.
+        with open(filename, 'wb') as f:
+            f.write(body)
+        with open(filename + '.json', 'w') as f:
+            json.dump(meta, f)
+
+
+class SqliteCache(BaseCache):
+
+    '''Stores entries in a single sqlite database.
+    '''
+    def __init__(self, path, ttl=None):
+        super(SqliteCache, self).__init__(ttl)
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS cache ('
+                         'key TEXT PRIMARY KEY, meta TEXT, body BLOB)')
+
+    def _connection(self):
+        # sqlite connections can't be shared across threads.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path)
+            conn.text_factory = str
+        return conn
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT meta, body FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        meta, body = row
+        return json.loads(meta), bytes(body)
+
+    def set(self, key, meta, body):
+        with self._connection() as conn:
+            conn.execute('REPLACE INTO cache (key, meta, body) '
+                         'VALUES (?, ?, ?)',
+                         (key, json.dumps(meta), sqlite3.Binary(body)))
+
+    def prune(self):
+        '''Delete the entries fetched (or made) more than ``ttl`` seconds
+        ago, and return how many there were. Only for caches whose stale
+        entries are worthless: a stale http response can still be
+        revalidated with a conditional request.
+        '''
+        if self.ttl is None:
+            return 0
+        cutoff = time.time() - self.ttl
+        conn = self._connection()
+        stale = [(key,) for key, meta in
+                 conn.execute('SELECT key, meta FROM cache')
+                 if json.loads(meta).get('fetched', 0) < cutoff]
+        with conn:
+            conn.executemany('DELETE FROM cache WHERE key = ?', stale)
+        return len(stale)
@@ -0,0 +1,168 @@
+'''
+Dropping duplicate documents (or versions) of a bill without downloading
+all of them.
+
+A HEAD of each document says whether it exists and gives its length,
+ETag and Last-Modified. Documents of different lengths can't be the same,
+so only the ones of the same (or an unknown) length are downloaded and
+compared by their sha1. Those digests are remembered (see
+openstates.utils.cache) along with the headers, so a later run only
+downloads a document again if the server says it has changed, or, for
+servers that don't say, once DOCUMENT_DIGEST_TTL has passed. An ETag
+only ever vouches for the url it came from: the same ETag at two urls
+doesn't make them the same document.
+'''
+import os
+import time
+import hashlib
+import threading
+from collections import defaultdict
+from multiprocessing.pool import ThreadPool
+
+import scrapelib
+from billy.core import settings
+
+from openstates.utils.cache import SqliteCache
+from openstates.utils.probe import HEAD_NOT_ALLOWED, status_code
+
+
+DOCUMENT_DIGEST_TTL = getattr(settings, 'DOCUMENT_DIGEST_TTL',
+                              60 * 60 * 24 * 30)
+DEDUPE_WORKERS = getattr(settings, 'DEDUPE_WORKERS', 4)
+
+
+class DocumentDeduper(object):
+
+    '''Call ``dedupe(documents)`` with a bill's list of document (or
+    version) dicts. Requests go through ``scraper``, so its throttling
+    and retries still apply.
+    '''
+    def __init__(self, scraper, cache=None, workers=DEDUPE_WORKERS):
+        self.scraper = scraper
+        self.cache = cache
+        self.workers = workers
+        self._pool = None
+        self._lock = threading.Lock()
+        self.downloads = 0
+
+    @property
+    def pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPool(self.workers)
+            return self._pool
+
+    def close(self):
+        '''Stop the worker threads, if any were started.'''
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    def headers(self, url):
+        '''The length, ETag and Last-Modified the server gives for
+        ``url``, any of which may be None. Returns None if the document
+        doesn't exist.
+        '''
+        try:
+            resp = self.scraper.urlopen(url, method='HEAD')
+        except scrapelib.HTTPError as exc:
+            if status_code(exc) not in HEAD_NOT_ALLOWED:
+                return None
+            return {'length': None, 'etag': None, 'last_modified': None}
+        headers = resp.response.headers
+        length = headers.get('content-length')
+        return {'length': int(length) if length else None,
+                'etag': headers.get('etag'),
+                'last_modified': headers.get('last-modified')}
+
+    def _cached_digest(self, url, headers):
+        if self.cache is None:
+            return None
+        cached = self.cache.get('digest:' + url)
+        if cached is None:
+            return None
+        meta = cached[0]
+        if headers['etag'] or headers['last_modified']:
+            fields = ('length', 'etag', 'last_modified')
+            if all(meta[field] == headers[field] for field in fields):
+                return meta['digest']
+        elif self.cache.is_fresh(meta):
+            return meta['digest']
+
+    def digest(self, url, headers):
+        '''The sha1 of ``url``'s content, from the cache if ``headers``
+        say it hasn't changed. Returns None if it can't be downloaded.
+        '''
+        digest = self._cached_digest(url, headers)
+        if digest is not None:
+            return digest
+
+        try:
+            resp = self.scraper.get(url)
+        except scrapelib.HTTPError:
+            return None
+        with self._lock:
+            self.downloads += 1
+
+        digest = hashlib.sha1(resp.content).hexdigest()
+        if self.cache is not None:
+            meta = dict(headers, url=url, digest=digest, fetched=time.time())
+            self.cache.set('digest:' + url, meta, '')
+        return digest
+
+    def dedupe(self, documents, key='url'):
+        '''Returns a new list of ``documents`` without the ones that
+        don't exist or have the same content as an earlier one, keeping
+        the first of each. A list of fewer than two documents is
+        returned as it is, without any requests.
+        '''
+        if len(documents) < 2:
+            return list(documents)
+        urls = [doc[key] for doc in documents]
+        all_headers = self.pool.map(self.headers, urls)
+
+        # Only documents of the same (or an unknown) length might be the
+        # same, so only those need a closer look.
+        by_length = defaultdict(list)
+        for i, headers in enumerate(all_headers):
+            if headers is not None:
+                by_length[headers['length']].append(i)
+        undecided = sorted(i for length, group in by_length.items()
+                           if length is None or len(group) > 1
+                           for i in group)
+        identities = dict(zip(undecided, self.pool.map(
+            lambda i: self.digest(urls[i], all_headers[i]), undecided)))
+
+        deduped = []
+        seen = set()
+        for i, doc in enumerate(documents):
+            headers = all_headers[i]
+            if headers is None:
+                continue
+            if i in identities:
+                if identities[i] is None or identities[i] in seen:
+                    continue
+                seen.add(identities[i])
+            deduped.append(doc)
+        return deduped
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    '''The cache of document digests in BILLY_CACHE_DIR, created on
+    first use and shared by every deduper in the process.
+    '''
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            if not os.path.isdir(settings.BILLY_CACHE_DIR):
+                os.makedirs(settings.BILLY_CACHE_DIR)
+            _cache = SqliteCache(os.path.join(settings.BILLY_CACHE_DIR,
+                                              'document-digests.sqlite'),
+                                 ttl=DOCUMENT_DIGEST_TTL)
+        return _cache
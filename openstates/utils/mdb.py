@@ -0,0 +1,217 @@
+'''
+A sqlite snapshot of the tables in an Access database.
+
+Reading a table straight out of an .mdb means forking ``mdb-export`` and
+re-parsing its csv output every time. A snapshot exports each table the
+first time it's asked for, into a sqlite file that's kept until the
+database's ``version`` (e.g. the timestamp of the zip it came in) changes.
+Later reads, including ones from other scrapers and later runs, are plain
+sqlite queries, and ``rows(table, column=value)`` lookups are indexed.
+
+The .mdb files themselves are kept too, along with a manifest of where
+they came from, so that exporting a table a snapshot doesn't have yet
+doesn't mean downloading a zip that hasn't changed.
+'''
+import os
+import re
+import csv
+import json
+import shutil
+import hashlib
+import sqlite3
+import zipfile
+import subprocess
+from StringIO import StringIO
+
+
+class MDBError(Exception):
+    pass
+
+
+# A line of a DOS style ftp listing: date and time, size (or <DIR>), name.
+_ftp_listing_line = re.compile(
+    r'^(\d{2}-\d{2}-\d{2}\s+\d{2}:\d{2}[AP]M)\s+(\d+|<DIR>)\s+(.+)$')
+
+
+def ftp_listing_entries(text):
+    '''Yield (mtime, size, name) for each file in an ftp listing. mtime
+    is left as the listing's string; size is an int.
+    '''
+    for line in text.splitlines():
+        match = _ftp_listing_line.match(line.strip())
+        if match and match.group(2) != '<DIR>':
+            mtime, size, name = match.groups()
+            yield mtime, int(size), name
+
+
+def sha256_file(filename):
+    sha = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), ''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class DownloadManifest(object):
+
+    '''A json file recording, for each zip url, the size and listing mtime
+    it had when its .mdb was extracted, and the extracted file's sha256.
+    Entries made from a download by code that may change (a parser, say)
+    can also record that code's ``version``.
+    '''
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (IOError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.rename(tmp, self.path)
+
+    def is_current(self, url, dest, mtime, size, version=None):
+        entry = self.entries.get(url)
+        if entry is None or not os.path.exists(dest):
+            return False
+        if (entry['mtime'], entry['size']) != (mtime, size):
+            return False
+        if entry.get('version') != version:
+            return False
+        return entry['sha256'] == sha256_file(dest)
+
+    def fetch_mdb(self, scraper, url, member, dest, mtime, size):
+        '''Extract ``member`` of the zip at ``url`` to ``dest``, unless
+        it's already there from a zip with the same mtime and size. The
+        zip is only ever held in memory. Returns ``dest``.
+        '''
+        if self.is_current(url, dest, mtime, size):
+            scraper.info('reusing %s, %s unchanged since %s', dest, url, mtime)
+            return dest
+
+        zf = zipfile.ZipFile(StringIO(scraper.urlopen(url).bytes))
+        tmp = dest + '.tmp'
+        with open(tmp, 'wb') as f:
+            shutil.copyfileobj(zf.open(member), f, 1 << 20)
+        os.rename(tmp, dest)
+
+        self.entries[url] = {'member': member, 'mtime': mtime, 'size': size,
+                             'sha256': sha256_file(dest)}
+        self.save()
+        return dest
+
+
+def _quote(name):
+    return '"%s"' % name.replace('"', '""')
+
+
+class MDBSnapshot(object):
+
+    '''``fetch`` is called (at most once) to get the path of the .mdb file
+    when a table has to be exported, so a database whose snapshot is
+    current never has to be downloaded.
+    '''
+    def __init__(self, path, version, fetch):
+        self.path = path
+        self.version = str(version)
+        self.fetch = fetch
+        self._mdbfile = None
+        self._indexes = set()
+
+        self.conn = self._open()
+        row = self.conn.execute('SELECT version FROM _snapshot').fetchone()
+        if row is None or row[0] != self.version:
+            # A new database; throw the old snapshot away.
+            self.conn.close()
+            os.remove(self.path)
+            self.conn = self._open()
+            self.conn.execute('INSERT INTO _snapshot (version) VALUES (?)',
+                              (self.version,))
+            self.conn.commit()
+
+    def _open(self):
+        dirname = os.path.dirname(self.path)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        conn = sqlite3.connect(self.path)
+        # Keep returning bytestrings, like csv.DictReader did.
+        conn.text_factory = str
+        conn.execute('CREATE TABLE IF NOT EXISTS _snapshot (version TEXT)')
+        conn.execute('CREATE TABLE IF NOT EXISTS _tables (name TEXT)')
+        return conn
+
+    @property
+    def mdbfile(self):
+        if self._mdbfile is None:
+            self._mdbfile = self.fetch()
+        return self._mdbfile
+
+    def has_table(self, table):
+        row = self.conn.execute('SELECT 1 FROM _tables WHERE name = ?',
+                                (table,)).fetchone()
+        return row is not None
+
+    def export(self, table):
+        '''Copy ``table`` out of the .mdb into the snapshot.
+        '''
+        commands = ['mdb-export', self.mdbfile, table]
+        proc = subprocess.Popen(commands, stdout=subprocess.PIPE,
+                                close_fds=True)
+        reader = csv.reader(proc.stdout)
+        try:
+            columns = next(reader)
+        except StopIteration:
+            proc.wait()
+            raise MDBError('mdb-export %s %s failed' % (self.mdbfile, table))
+
+        sql_table = _quote(table)
+        with self.conn:
+            self.conn.execute('DROP TABLE IF EXISTS %s' % sql_table)
+            self.conn.execute('CREATE TABLE %s (%s)' % (
+                sql_table, ', '.join(_quote(c) for c in columns)))
+            self.conn.executemany('INSERT INTO %s VALUES (%s)' % (
+                sql_table, ', '.join('?' * len(columns))), reader)
+            if proc.wait() != 0:
+                raise MDBError('mdb-export %s %s failed' % (self.mdbfile,
+                                                            table))
+            self.conn.execute('INSERT INTO _tables (name) VALUES (?)',
+                              (table,))
+
+    def _index(self, table, columns):
+        key = (table,) + columns
+        if key in self._indexes:
+            return
+        name = _quote('ix_' + '_'.join(key))
+        with self.conn:
+            self.conn.execute('CREATE INDEX IF NOT EXISTS %s ON %s (%s)' % (
+                name, _quote(table), ', '.join(_quote(c) for c in columns)))
+        self._indexes.add(key)
+
+    def rows(self, table, **where):
+        '''Return an iterator over the rows of ``table`` as dicts, in
+        their original order. Keyword arguments restrict it to rows whose
+        columns equal the given values, using an index on those columns.
+        '''
+        # Export and index now rather than on the first next(), so that no
+        # other table's cursor can be open while this one is being written.
+        if not self.has_table(table):
+            self.export(table)
+        columns = tuple(sorted(where))
+        if columns:
+            self._index(table, columns)
+        return self._rows(table, columns, [where[c] for c in columns])
+
+    def _rows(self, table, columns, values):
+        sql = 'SELECT * FROM %s' % _quote(table)
+        if columns:
+            sql += ' WHERE ' + ' AND '.join('%s = ?' % _quote(c)
+                                            for c in columns)
+        sql += ' ORDER BY rowid'
+
+        cursor = self.conn.execute(sql, values)
+        names = [d[0] for d in cursor.description]
+        for row in cursor:
+            yield dict(zip(names, row))
@@ -0,0 +1,213 @@
+'''
+Drop-in replacements for billy's ``convert_pdf`` and ``pdfdata_to_text``
+that share a bounded pool of conversions and cache what they produce.
+
+Results are cached (see openstates.utils.cache) by the pdf's content and
+the output type, so a journal or bill version that's already been
+converted, in this run or an earlier one, isn't converted again for
+PDF_CACHE_TTL seconds; older conversions are dropped from the cache
+when it's opened, so it doesn't grow without bound. At most
+PDF_CONVERSION_WORKERS pdftotext/pdftohtml processes run at once, however
+many scraper threads are converting, and the latency of the conversions
+that did run is logged when the process exits.
+
+iter_text_pages and iter_xml_pages stream a (long) pdf a page at a time
+instead, for parsers that don't need the whole document at once.
+'''
+import os
+import time
+import atexit
+import logging
+import tempfile
+import threading
+import subprocess
+from multiprocessing.pool import ThreadPool
+
+import lxml.etree
+
+from billy.core import settings
+from billy.scrape.utils import convert_pdf as _convert_pdf
+
+from openstates.utils.cache import SqliteCache
+
+
+PDF_CONVERSION_WORKERS = getattr(settings, 'PDF_CONVERSION_WORKERS', 4)
+PDF_CACHE_TTL = getattr(settings, 'PDF_CACHE_TTL', 60 * 60 * 24 * 30)
+
+logger = logging.getLogger('openstates.pdf')
+
+
+def percentile(values, p):
+    '''The p-th percentile (0-100) of a sorted list, nearest rank.'''
+    if not values:
+        return None
+    index = int(round(p / 100.0 * (len(values) - 1)))
+    return values[index]
+
+
+class PDFConverter(object):
+
+    '''Each conversion is its own pdftotext or pdftohtml process, so the
+    pool's threads only wait on them; its size bounds how many run at once.
+    '''
+    def __init__(self, cache=None, workers=PDF_CONVERSION_WORKERS):
+        self.cache = cache
+        self.workers = workers
+        self._pool = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.latencies = []
+
+    @property
+    def pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPool(self.workers)
+            return self._pool
+
+    def _convert_file(self, filename, type):
+        start = time.time()
+        text = _convert_pdf(filename, type)
+        with self._lock:
+            self.latencies.append(time.time() - start)
+        return text
+
+    def _convert_data(self, data, type):
+        fd, filename = tempfile.mkstemp(suffix='.pdf')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            return self._convert_file(filename, type)
+        finally:
+            os.remove(filename)
+
+    def _cached(self, data, type):
+        if self.cache is None:
+            return None
+        text = self.cache.get_artifact('pdf-' + type, data)
+        if text is not None:
+            with self._lock:
+                self.hits += 1
+        return text
+
+    def _store(self, data, type, text):
+        if self.cache is not None:
+            self.cache.set_artifact('pdf-' + type, data, text)
+
+    def convert(self, data, type='text', filename=None):
+        '''Convert the pdf ``data`` to ``type`` ('text', 'text-nolayout',
+        'xml' or 'html'). ``filename`` saves writing data to a temporary
+        file if it's already on disk.
+        '''
+        text = self._cached(data, type)
+        if text is None:
+            if filename is None:
+                args = (self._convert_data, (data, type))
+            else:
+                args = (self._convert_file, (filename, type))
+            text = self.pool.apply(*args)
+            self._store(data, type, text)
+        return text
+
+    def convert_many(self, datas, type='text'):
+        '''Convert a sequence of pdfs, up to ``workers`` at a time.
+        Returns their conversions in the same order.
+        '''
+        datas = list(datas)
+        texts = [self._cached(data, type) for data in datas]
+        missing = [i for i, text in enumerate(texts) if text is None]
+        converted = self.pool.map(lambda i: self._convert_data(datas[i], type),
+                                  missing)
+        for i, text in zip(missing, converted):
+            self._store(datas[i], type, text)
+            texts[i] = text
+        return texts
+
+    def report(self):
+        if not (self.hits or self.latencies):
+            return
+        latencies = sorted(self.latencies)
+        msg = 'converted %d pdfs, %d from cache' % (
+            len(latencies) + self.hits, self.hits)
+        if latencies:
+            msg += '; latency p50 %.2fs, p90 %.2fs, p99 %.2fs' % tuple(
+                percentile(latencies, p) for p in (50, 90, 99))
+        logger.info(msg)
+
+
+_converter = None
+_converter_lock = threading.Lock()
+
+
+def get_converter():
+    '''The converter convert_pdf and pdfdata_to_text use, created on
+    first use with a cache in BILLY_CACHE_DIR.
+    '''
+    global _converter
+    with _converter_lock:
+        if _converter is None:
+            if not os.path.isdir(settings.BILLY_CACHE_DIR):
+                os.makedirs(settings.BILLY_CACHE_DIR)
+            cache = SqliteCache(os.path.join(settings.BILLY_CACHE_DIR,
+                                             'pdf-conversions.sqlite'),
+                                ttl=PDF_CACHE_TTL)
+            pruned = cache.prune()
+            if pruned:
+                logger.info('dropped %d stale pdf conversions' % pruned)
+            _converter = PDFConverter(cache)
+            atexit.register(_converter.report)
+        return _converter
+
+
+def convert_pdf(filename, type='xml'):
+    with open(filename, 'rb') as f:
+        data = f.read()
+    return get_converter().convert(data, type, filename=filename)
+
+
+def pdfdata_to_text(data):
+    return get_converter().convert(data, 'text')
+
+
+def iter_text_pages(filename, first_page=1):
+    '''Yield (page number, text) for each page of a pdf, starting at
+    ``first_page``, as pdftotext -layout converts them.
+    '''
+    commands = ['pdftotext', '-layout', '-f', str(first_page), filename, '-']
+    proc = subprocess.Popen(commands, stdout=subprocess.PIPE, close_fds=True)
+    page = first_page
+    buff = []
+    try:
+        # pdftotext ends every page with a form feed.
+        for line in proc.stdout:
+            while '\f' in line:
+                end, line = line.split('\f', 1)
+                buff.append(end)
+                yield page, ''.join(buff)
+                page += 1
+                buff = []
+            buff.append(line)
+    finally:
+        proc.stdout.close()
+        proc.wait()
+    if ''.join(buff).strip():
+        yield page, ''.join(buff)
+
+
+def iter_xml_pages(filename):
+    '''Yield the <page> elements of pdftohtml -xml's conversion of a
+    pdf one at a time. Each page is cleared once the next one is asked
+    for, so don't keep references to them. Raises XMLSyntaxError if the
+    conversion turns out not to be valid xml.
+    '''
+    commands = ['pdftohtml', '-xml', '-stdout', filename]
+    proc = subprocess.Popen(commands, stdout=subprocess.PIPE, close_fds=True)
+    try:
+        for event, page in lxml.etree.iterparse(proc.stdout, tag='page'):
+            yield page
+            page.clear()
+            while page.getprevious() is not None:
+                del page.getparent()[0]
+    finally:
+        proc.stdout.close()
+        proc.wait()
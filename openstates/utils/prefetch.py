@@ -0,0 +1,84 @@
+'''
+Warming things up (fetching the pages a bill will need, say) a few
+items ahead of the scraper, on a thread pool, while the scraper itself
+still processes items one at a time and in order.
+'''
+import time
+import logging
+import threading
+from collections import deque
+from multiprocessing.pool import ThreadPool
+
+
+class Prefetcher(object):
+
+    '''Wraps an iterable: ``iter(items)`` yields ``(item, result)`` in the
+    original order, where ``result`` is what ``warm(item)`` returned on
+    one of ``workers`` threads, up to ``lookahead`` items ahead. If
+    ``warm`` raised, ``result`` is None and the exception is logged, so
+    the caller can just do the work itself and hit the error in order.
+
+    ``warm`` may return a (result, pages) tuple if ``count_pages`` is
+    true, so the prefetcher can report pages/sec. ``seconds`` is the
+    time spent iterating, the caller's work included; ``fetch_seconds``
+    only the time at least one ``warm`` was running, which is what
+    pages/sec is measured against.
+    '''
+    def __init__(self, warm, lookahead=10, workers=4, count_pages=False,
+                 logger=None):
+        self.warm = warm
+        self.lookahead = lookahead
+        self.workers = workers
+        self.count_pages = count_pages
+        self.logger = logger or logging.getLogger('openstates.prefetch')
+        self.pages = 0
+        self.seconds = 0.0
+        self.fetch_seconds = 0.0
+        self._lock = threading.Lock()
+        self._running = 0
+        self._busy_since = None
+
+    def _warm(self, item):
+        with self._lock:
+            if self._running == 0:
+                self._busy_since = time.time()
+            self._running += 1
+        try:
+            return self.warm(item)
+        except Exception:
+            self.logger.exception('prefetch failed for %r' % (item,))
+        finally:
+            with self._lock:
+                self._running -= 1
+                if self._running == 0:
+                    self.fetch_seconds += time.time() - self._busy_since
+
+    def iter(self, items):
+        pool = ThreadPool(self.workers)
+        pending = deque()
+        items = iter(items)
+        start = time.time()
+        try:
+            while True:
+                while len(pending) < self.lookahead + 1:
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        break
+                    pending.append(
+                        (item, pool.apply_async(self._warm, (item,))))
+                if not pending:
+                    break
+                item, result = pending.popleft()
+                result = result.get()
+                if self.count_pages:
+                    result, pages = result or (None, 0)
+                    self.pages += pages
+                yield item, result
+        finally:
+            pool.close()
+            self.seconds += time.time() - start
+
+    @property
+    def pages_per_second(self):
+        return self.pages / max(self.fetch_seconds, 1e-9)
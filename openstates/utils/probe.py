@@ -0,0 +1,141 @@
+'''
+Checking that urls exist without downloading them.
+
+A probe is a HEAD request, or, for servers that don't allow HEAD, a GET
+of just the first byte. A url exists if the answer is a 200 (or a 206,
+to the GET). The answer is remembered (see openstates.utils.cache) for
+URL_PROBE_TTL seconds, so a later run doesn't ask again about a document
+it's already seen, or, if the url didn't exist, for just
+URL_PROBE_NEGATIVE_TTL seconds, since documents that aren't there yet
+tend to turn up. Only definite answers are remembered: a 404 is, a 503
+or a dropped connection isn't.
+'''
+import os
+import time
+import threading
+from multiprocessing.pool import ThreadPool
+
+import scrapelib
+from billy.core import settings
+
+from openstates.utils.cache import SqliteCache
+
+
+URL_PROBE_TTL = getattr(settings, 'URL_PROBE_TTL', 60 * 60 * 24 * 7)
+URL_PROBE_NEGATIVE_TTL = getattr(settings, 'URL_PROBE_NEGATIVE_TTL',
+                                 60 * 60 * 6)
+URL_PROBE_WORKERS = getattr(settings, 'URL_PROBE_WORKERS', 4)
+
+# Servers answer these to a HEAD they don't support.
+HEAD_NOT_ALLOWED = (405, 501)
+
+# The answers that say a url exists: to a HEAD, and to a ranged GET.
+EXISTS = (200, 206)
+
+
+def status_code(exc):
+    response = getattr(exc, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+class URLProbe(object):
+
+    '''Asks whether urls exist through ``scraper.urlopen``, so the
+    scraper's throttling, retries and headers still apply.
+    '''
+    def __init__(self, scraper, cache=None, workers=URL_PROBE_WORKERS,
+                 negative_ttl=URL_PROBE_NEGATIVE_TTL):
+        self.scraper = scraper
+        self.cache = cache
+        self.workers = workers
+        self.negative_ttl = negative_ttl
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPool(self.workers)
+            return self._pool
+
+    def close(self):
+        '''Stop the worker threads, if any were started. The probe can
+        still be used afterwards; it starts new ones when it needs them.
+        '''
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    def _request(self, url):
+        '''Returns the status code of a probe of ``url``, or None if it
+        couldn't be fetched at all.
+        '''
+        try:
+            resp = self.scraper.urlopen(url, method='HEAD')
+        except scrapelib.HTTPError as exc:
+            if status_code(exc) not in HEAD_NOT_ALLOWED:
+                return status_code(exc)
+        except Exception:
+            return None
+        else:
+            return resp.response.status_code
+
+        try:
+            resp = self.scraper.urlopen(url, headers={'Range': 'bytes=0-0'})
+        except scrapelib.HTTPError as exc:
+            return status_code(exc)
+        except Exception:
+            return None
+        return resp.response.status_code
+
+    def _is_fresh(self, meta):
+        if not self.cache.is_fresh(meta):
+            return False
+        if meta['status'] in EXISTS:
+            return True
+        return time.time() - meta['fetched'] < self.negative_ttl
+
+    def exists(self, url):
+        key = 'probe:' + url
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None and self._is_fresh(cached[0]):
+                self.cache.hits += 1
+                return cached[0]['status'] in EXISTS
+
+        status = self._request(url)
+        exists = status in EXISTS
+        if self.cache is not None and status is not None and status < 500:
+            self.cache.misses += 1
+            self.cache.set(key, {'url': url, 'status': status,
+                                 'exists': exists, 'fetched': time.time()},
+                           '')
+        return exists
+
+    def exists_many(self, urls):
+        '''Probe ``urls``, up to ``workers`` at a time. Returns whether
+        each exists, in the same order.
+        '''
+        return self.pool.map(self.exists, urls)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    '''The cache of probe results in BILLY_CACHE_DIR, created on first
+    use and shared by every probe in the process.
+    '''
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            if not os.path.isdir(settings.BILLY_CACHE_DIR):
+                os.makedirs(settings.BILLY_CACHE_DIR)
+            _cache = SqliteCache(os.path.join(settings.BILLY_CACHE_DIR,
+                                              'url-probes.sqlite'),
+                                 ttl=URL_PROBE_TTL)
+        return _cache
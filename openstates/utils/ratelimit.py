@@ -0,0 +1,67 @@
+'''
+Thread-safe rate limiting for scrapers that fetch concurrently.
+'''
+import time
+import threading
+from urlparse import urlparse
+
+
+class HostRateLimiter(object):
+
+    '''Spaces out requests to each host so that no host sees more
+    than ``requests_per_second``, however many threads are fetching.
+    Call ``wait(url)`` right before requesting ``url``.
+    '''
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.time()
+            # Reserve the next free slot for this host.
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class TokenBucket(object):
+
+    '''Allows bursts of up to ``capacity`` requests, refilled at ``rate``
+    requests per second, however many threads share it. Call ``take()``
+    right before each request, and ``pause(seconds)`` to hold everyone
+    off, e.g. when a server says to retry after a while.
+    '''
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.time()
+        self._lock = threading.Lock()
+
+    def take(self):
+        while True:
+            with self._lock:
+                now = time.time()
+                if now >= self.updated:
+                    elapsed = now - self.updated
+                    self.tokens = min(self.capacity,
+                                      self.tokens + elapsed * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    delay = (1 - self.tokens) / self.rate
+                else:
+                    # Paused.
+                    delay = self.updated - now
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.tokens = 0
+            self.updated = max(self.updated, time.time() + seconds)
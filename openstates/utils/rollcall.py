@@ -0,0 +1,91 @@
+'''
+Parsing roll calls laid out as a grid of fixed-width columns, each one
+a vote code followed by a name, like
+
+    Y    Althoff     Y    Dillard     N   Lauzen        NV   Righter
+    NV   Bivins      Y    Forby       Y   Lightford     P    Risinger
+
+Fields are found from the character positions that are blank on every
+line. Each line is turned into an integer bitmask (bit i set if position
+i isn't whitespace), so the per-character work happens in C and the
+only Python loop is one pass over the width of the OR of those masks.
+Fields whose cells are all vote codes (or blank) start a column.
+'''
+import re
+
+_occupied = re.compile(r'\S')
+_blank = re.compile(r'\s')
+
+
+def occupancy(lines):
+    '''A bitmask of the positions that aren't whitespace in at least one
+    of ``lines``; bit i is position i.
+    '''
+    mask = 0
+    for line in lines:
+        if line:
+            bits = _blank.sub('0', _occupied.sub('1', line))
+            mask |= int(bits[::-1], 2)
+    return mask
+
+
+def find_fields(lines, min_gap=2):
+    '''Start positions of the runs of text separated by at least
+    ``min_gap`` positions that are blank on every line.
+    '''
+    mask = occupancy(lines)
+    starts = []
+    # The start of the line counts as a gap.
+    gap = min_gap
+    position = 0
+    while mask:
+        if mask & 1:
+            if gap >= min_gap:
+                starts.append(position)
+            gap = 0
+        else:
+            gap += 1
+        mask >>= 1
+        position += 1
+    return starts
+
+
+def find_columns(lines, codes, min_gap=2):
+    '''Start positions of the grid's columns: the fields in which the
+    first word of every non-blank cell is one of ``codes``.
+    '''
+    starts = find_fields(lines, min_gap)
+    ends = starts[1:] + [None]
+    columns = []
+    for start, end in zip(starts, ends):
+        words = [line[start:end].split(None, 1) for line in lines]
+        words = [cell[0] for cell in words if cell]
+        if words and all(word in codes for word in words):
+            columns.append(start)
+    return columns
+
+
+def parse(lines, codes, min_gap=2):
+    '''Return a list of (name, vote code) pairs, reading across each line
+    and then down. A voter with a blank code gets ''. Raises ValueError
+    if no columns of vote codes can be found.
+    '''
+    columns = find_columns(lines, codes, min_gap)
+    if not columns:
+        raise ValueError('no columns of vote codes found')
+    ends = columns[1:] + [None]
+
+    votes = []
+    for line in lines:
+        for start, end in zip(columns, ends):
+            cell = line[start:end].split(None, 1)
+            if not cell:
+                continue
+            if cell[0] in codes:
+                code, name = cell[0], ''.join(cell[1:])
+            else:
+                code, name = '', ' '.join(cell)
+            name = name.strip()
+            if name:
+                votes.append((name, code))
+    return votes
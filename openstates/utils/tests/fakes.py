@@ -0,0 +1,79 @@
+'''
+Stand-ins for scrapelib scrapers and responses, shared by the tests.
+'''
+import json
+
+import scrapelib
+
+
+class FakeResponse(object):
+
+    def __init__(self, url, status_code=200, body='', headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = self.text = body
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeResult(unicode):
+
+    '''What scraper.urlopen returns: the decoded body, plus ``bytes``,
+    ``encoding`` and the ``response``.
+    '''
+    def __new__(cls, response):
+        self = unicode.__new__(cls, response.content.decode('utf-8',
+                                                            'replace'))
+        self.response = response
+        self.bytes = response.content
+        self.encoding = 'utf-8'
+        return self
+
+
+class FakeScraper(object):
+
+    '''Serves canned responses instead of fetching anything.
+
+    ``pages`` maps urls, or (method, url) pairs for just that method, to
+    a status code, a body (served with a 200) or a (status code, body,
+    headers) tuple; None fails to connect, and anything else is a 404.
+    Every request is logged in self.requests as (method, url, headers).
+    '''
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def response(self, method, url):
+        page = self.pages.get((method, url), self.pages.get(url, 404))
+        if page is None:
+            raise IOError('connection reset')
+        if isinstance(page, int):
+            page = (page, '', {})
+        elif isinstance(page, basestring):
+            page = (200, page, {})
+        status, body, headers = page
+        headers = dict(headers, **{'content-length': str(len(body))})
+        resp = FakeResponse(url, status, body, headers)
+        if status >= 400:
+            raise scrapelib.HTTPError(resp)
+        return resp
+
+    def urlopen(self, url, method='GET', headers=None):
+        self.requests.append((method, url, headers))
+        return FakeResult(self.response(method, url))
+
+    def get(self, url, headers=None):
+        self.requests.append(('GET', url, headers))
+        return self.response('GET', url)
+
+    def urls(self, method='GET'):
+        '''The urls requested with ``method``, in order.'''
+        return [url for m, url, headers in self.requests if m == method]
+
+    def info(self, *args):
+        pass
+
+    warning = debug = info
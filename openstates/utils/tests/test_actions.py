@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+from nose.tools import *
+import unittest
+from billy.scrape import actions as billy_actions
+from openstates.utils.actions import (
+    Rule, RuleSet, BaseCategorizer, BillyCategorizer, after_categorize)
+
+
+rules = (
+    Rule(r'(?i)^(RE)?PASSED', 'bill:passed'),
+    Rule(r'(?i)REFERRED TO (?P<committees>.+)', 'committee:referred'),
+    Rule([r'(?i)signed chap.(?P<session_laws>\d+)', r'(?i)^signed'],
+         'governor:signed', actor='governor'),
+)
+
+
+class Categorizer(BaseCategorizer):
+    rules = rules
+
+    @after_categorize
+    def upper_committees(self, types, attrs):
+        attrs['committees'] = set(c.upper() for c in attrs['committees'])
+        return types, attrs
+
+
+class TestCategorizer(object):
+
+    def test_types_and_attrs(self):
+        types, attrs = Categorizer().categorize('Referred to  health')
+        eq_(['committee:referred'], types)
+        eq_(['HEALTH'], attrs['committees'])
+
+    def test_rule_attrs(self):
+        types, attrs = Categorizer().categorize('SIGNED CHAP.55')
+        eq_(['governor:signed'], types)
+        eq_('governor', attrs['actor'])
+        eq_(['55'], attrs['session_laws'])
+
+    def test_no_match(self):
+        eq_(([], {}), Categorizer().categorize('Read first time'))
+
+    def test_categorize_many(self):
+        texts = ['Referred to health', 'PASSED SENATE', 'Referred to health']
+        results = Categorizer().categorize_many(texts)
+        eq_([Categorizer().categorize(text) for text in texts], results)
+        results[0][1]['committees'].append('junk')
+        eq_(['HEALTH'], results[2][1]['committees'])
+
+    def test_memo_returns_copies(self):
+        ruleset = RuleSet(rules)
+        types, attrs = ruleset.match('referred to codes')
+        attrs['committees'].add('junk')
+        types.add('junk')
+        types, attrs = ruleset.match('referred to codes')
+        eq_(set(['committee:referred']), types)
+        eq_(set(['codes']), attrs['committees'])
+        eq_(1, ruleset.hits)
+        eq_(1, ruleset.misses)
+
+
+# Rules written to catch where billy's matching differs from RuleSet's
+# default: wide whitespace, regexes that only match as substrings, two
+# regexes of a rule setting the same group, rule attrs that clash with
+# matched ones, and a stop rule.
+billy_rules = (
+    # (regexes, types, stop, attrs)
+    ('(?i)referred to (?P<committees>.+)', 'committee:referred', False, {}),
+    (['(?i)signed chap. (?P<session_laws>\\d+)', '(?i)^signed'],
+     'governor:signed', False, {'actor': 'governor'}),
+    ('Amendment (A)', 'amendment:introduced', False, {}),
+    (['(?P<version>Amendment \\d+)', '(?P<version>Amendment \\d+) adopted'],
+     'amendment:passed', False, {}),
+    ('(?i)^senate', None, False, {'actor': 'upper'}),
+    ('(?P<actor>House) action', None, False, {'actor': ['lower']}),
+    ('(?i)vetoed', 'governor:vetoed', True, {}),
+    ('(?i)veto', 'governor:vetoed:line-item', False, {}),
+)
+
+billy_texts = [
+    'Referred to  health',
+    'Referred to          health',
+    'SIGNED CHAP.   55',
+    'Signed by governor',
+    'Amendment (A) offered',
+    'Amendment 12 adopted, Amendment 3',
+    'Senate passed',
+    'House action',
+    'Vetoed; line-item veto',
+    'Read first time',
+]
+
+
+def normalize(attrs):
+    return dict((k, sorted(v) if isinstance(v, list) else v)
+                for k, v in attrs.items())
+
+
+class TestBillyCategorizer(object):
+
+    def test_same_as_billy(self):
+        class Ours(BillyCategorizer):
+            rules = [Rule(regexes, types, stop, **attrs)
+                     for regexes, types, stop, attrs in billy_rules]
+
+        class Billys(billy_actions.BaseCategorizer):
+            rules = [billy_actions.Rule(regexes, types, stop, **attrs)
+                     for regexes, types, stop, attrs in billy_rules]
+
+        ours, billys = Ours(), Billys()
+        for text in billy_texts * 2:
+            eq_(normalize(billys.categorize(text)),
+                normalize(ours.categorize(text)))
+
+
+if __name__ == '__main__':
+    unittest.main()
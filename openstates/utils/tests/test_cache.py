@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+import shutil
+import tempfile
+
+from nose.tools import *
+from openstates.utils.cache import DirectoryCache
+from openstates.utils.tests.fakes import FakeScraper
+
+
+class TestDirectoryCache(object):
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+
+    def teardown(self):
+        shutil.rmtree(self.dir)
+
+    def test_fresh_served_without_request(self):
+        scraper = FakeScraper({'a': 'page'})
+        cache = DirectoryCache(self.dir, ttl=60)
+        ok_(not cache.has_fresh('a'))
+        eq_(u'page', cache.fetch(scraper, 'a'))
+        ok_(cache.has_fresh('a'))
+        eq_(None, cache.fetch(scraper, 'a').response)
+        eq_(1, len(scraper.requests))
+
+    def test_stale_not_fresh(self):
+        scraper = FakeScraper({'a': 'page'})
+        cache = DirectoryCache(self.dir, ttl=0)
+        cache.fetch(scraper, 'a')
+        ok_(not cache.has_fresh('a'))
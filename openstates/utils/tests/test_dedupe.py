@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+import shutil
+import tempfile
+
+from nose.tools import *
+from openstates.utils import dedupe
+from openstates.utils.cache import DirectoryCache
+from openstates.utils.tests.fakes import FakeScraper
+
+
+def doc(body, etag=None):
+    return (200, body, {'etag': etag} if etag else {})
+
+
+def docs(*urls):
+    return [{'url': url, 'name': url} for url in urls]
+
+
+class TestDocumentDeduper(object):
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+
+    def teardown(self):
+        shutil.rmtree(self.dir)
+
+    def deduper(self, scraper):
+        return dedupe.DocumentDeduper(scraper, DirectoryCache(self.dir),
+                                      workers=2)
+
+    def test_dedupe(self):
+        scraper = FakeScraper({'a': 'same', 'b': 'other', 'c': 'same',
+                               'd': 'diff'})
+        eq_(docs('a', 'b', 'd'),
+            self.deduper(scraper).dedupe(docs('a', 'b', 'missing', 'c', 'd')))
+        # Only the documents of the same length were downloaded.
+        eq_(['a', 'c', 'd'], sorted(scraper.urls('GET')))
+
+    def test_same_etag_at_different_urls_compared(self):
+        scraper = FakeScraper({'a': doc('same', '"1"'),
+                               'b': doc('diff', '"1"'), 'c': 'same'})
+        eq_(docs('a', 'b'), self.deduper(scraper).dedupe(docs('a', 'b', 'c')))
+        eq_(['a', 'b', 'c'], sorted(scraper.urls('GET')))
+
+    def test_digests_cached_until_changed(self):
+        scraper = FakeScraper({'a': doc('same', '"1"'),
+                               'b': doc('same', '"2"')})
+        self.deduper(scraper).dedupe(docs('a', 'b'))
+        scraper.pages['b'] = doc('diff', '"3"')
+        eq_(docs('a', 'b'), self.deduper(scraper).dedupe(docs('a', 'b')))
+        eq_(['a', 'b', 'b'], sorted(scraper.urls('GET')))
+
+    def test_single_document_untouched(self):
+        scraper = FakeScraper({})
+        eq_(docs('a'), self.deduper(scraper).dedupe(docs('a')))
+        eq_([], scraper.requests)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+import os
+import shutil
+import stat
+import zipfile
+import tempfile
+from StringIO import StringIO
+
+from nose.tools import *
+from openstates.utils.mdb import (MDBSnapshot, DownloadManifest,
+                                  ftp_listing_entries)
+from openstates.utils.tests.fakes import FakeScraper
+
+
+# Stands in for mdb-export: logs each call and prints a small table.
+FAKE_MDB_EXPORT = '''#!/bin/sh
+echo "$2" >> "$(dirname "$0")/calls"
+printf 'BillNumber,Sponsor\\r\\n1,"Smith, J"\\r\\n2,Jones\\r\\n1,Doe\\r\\n'
+'''
+
+
+class TestMDBSnapshot(object):
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+        script = os.path.join(self.dir, 'mdb-export')
+        with open(script, 'w') as f:
+            f.write(FAKE_MDB_EXPORT)
+        os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+        self.path = os.environ['PATH']
+        os.environ['PATH'] = self.dir + os.pathsep + self.path
+        self.fetched = 0
+
+    def teardown(self):
+        os.environ['PATH'] = self.path
+        shutil.rmtree(self.dir)
+
+    def fetch(self):
+        self.fetched += 1
+        return 'DB.mdb'
+
+    def snapshot(self, version):
+        return MDBSnapshot(os.path.join(self.dir, 'snap.sqlite'), version,
+                           self.fetch)
+
+    def calls(self):
+        with open(os.path.join(self.dir, 'calls')) as f:
+            return f.read().split()
+
+    def test_rows(self):
+        rows = list(self.snapshot('v1').rows('BillSpon'))
+        eq_([{'BillNumber': '1', 'Sponsor': 'Smith, J'},
+             {'BillNumber': '2', 'Sponsor': 'Jones'},
+             {'BillNumber': '1', 'Sponsor': 'Doe'}], rows)
+
+    def test_lookup(self):
+        rows = self.snapshot('v1').rows('BillSpon', BillNumber='1')
+        eq_(['Smith, J', 'Doe'], [row['Sponsor'] for row in rows])
+
+    def test_exports_once_per_version(self):
+        list(self.snapshot('v1').rows('BillSpon'))
+        list(self.snapshot('v1').rows('BillSpon'))
+        eq_(['BillSpon'], self.calls())
+        eq_(1, self.fetched)
+
+        list(self.snapshot('v2').rows('BillSpon'))
+        eq_(['BillSpon', 'BillSpon'], self.calls())
+        eq_(2, self.fetched)
+
+
+def test_ftp_listing_entries():
+    listing = ('01-07-14  09:15AM       <DIR>          votes\r\n'
+               '01-08-14  01:05PM             12345 DB2014.zip\r\n')
+    eq_([('01-08-14  01:05PM', 12345, 'DB2014.zip')],
+        list(ftp_listing_entries(listing)))
+
+
+class TestDownloadManifest(object):
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+        zip_data = StringIO()
+        with zipfile.ZipFile(zip_data, 'w') as zf:
+            zf.writestr('DB.mdb', 'not really an mdb')
+        self.scraper = FakeScraper({'ftp://x/DB.zip': zip_data.getvalue()})
+
+    def teardown(self):
+        shutil.rmtree(self.dir)
+
+    def fetch(self, mtime, size):
+        manifest = DownloadManifest(os.path.join(self.dir, 'manifest.json'))
+        dest = manifest.fetch_mdb(self.scraper, 'ftp://x/DB.zip', 'DB.mdb',
+                                  os.path.join(self.dir, 'DB.mdb'),
+                                  mtime, size)
+        with open(dest) as f:
+            eq_('not really an mdb', f.read())
+
+    def test_reuses_unchanged(self):
+        self.fetch('01-08-14  01:05PM', 100)
+        self.fetch('01-08-14  01:05PM', 100)
+        eq_(1, len(self.scraper.requests))
+
+        self.fetch('01-09-14  01:05PM', 100)
+        eq_(2, len(self.scraper.requests))
+
+    def test_refetches_modified_file(self):
+        self.fetch('01-08-14  01:05PM', 100)
+        with open(os.path.join(self.dir, 'DB.mdb'), 'w') as f:
+            f.write('corrupted')
+        self.fetch('01-08-14  01:05PM', 100)
+        eq_(2, len(self.scraper.requests))
+
+    def test_version_must_match(self):
+        self.fetch('01-08-14  01:05PM', 100)
+        manifest = DownloadManifest(os.path.join(self.dir, 'manifest.json'))
+        dest = os.path.join(self.dir, 'DB.mdb')
+        ok_(manifest.is_current('ftp://x/DB.zip', dest,
+                                '01-08-14  01:05PM', 100))
+        ok_(not manifest.is_current('ftp://x/DB.zip', dest,
+                                    '01-08-14  01:05PM', 100, version=2))
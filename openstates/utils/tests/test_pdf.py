@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+import os
+import time
+import shutil
+import tempfile
+
+from nose.tools import *
+from openstates.utils import pdf
+from openstates.utils.cache import DirectoryCache, SqliteCache, digest
+
+
+class TestPDFConverter(object):
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+        self.converted = []
+        self._convert_pdf = pdf._convert_pdf
+        pdf._convert_pdf = self.fake_convert_pdf
+
+    def teardown(self):
+        pdf._convert_pdf = self._convert_pdf
+        shutil.rmtree(self.dir)
+
+    def fake_convert_pdf(self, filename, type):
+        with open(filename, 'rb') as f:
+            data = f.read()
+        self.converted.append(data)
+        return '%s of %s' % (type, data)
+
+    def converter(self):
+        return pdf.PDFConverter(DirectoryCache(self.dir), workers=2)
+
+    def test_cached_across_converters(self):
+        eq_('text of a', self.converter().convert('a'))
+        eq_('text of a', self.converter().convert('a'))
+        eq_('html of a', self.converter().convert('a', 'html'))
+        eq_(['a', 'a'], self.converted)
+
+    def test_convert_many(self):
+        converter = self.converter()
+        converter.convert('b')
+        eq_(['text of a', 'text of b', 'text of c'],
+            converter.convert_many(['a', 'b', 'c']))
+        eq_(['a', 'b', 'c'], sorted(self.converted))
+        eq_(1, converter.hits)
+        eq_(3, len(converter.latencies))
+
+    def test_stale_conversions_pruned(self):
+        cache = SqliteCache(os.path.join(self.dir, 'pdf.sqlite'), ttl=60)
+        converter = pdf.PDFConverter(cache, workers=2)
+        converter.convert('a')
+        converter.convert('b')
+        key = 'artifact:pdf-text:' + digest('a')
+        meta, body = cache.get(key)
+        cache.set(key, dict(meta, fetched=time.time() - 120), body)
+
+        eq_(1, cache.prune())
+        eq_('text of a', converter.convert('a'))
+        eq_('text of b', converter.convert('b'))
+        eq_(['a', 'b', 'a'], self.converted)
+
+
+def test_percentile():
+    values = range(1, 101)
+    eq_(1, pdf.percentile(values, 0))
+    eq_(51, pdf.percentile(values, 50))
+    eq_(100, pdf.percentile(values, 100))
+    eq_(None, pdf.percentile([], 50))
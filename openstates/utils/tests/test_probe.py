@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+import shutil
+import tempfile
+
+from nose.tools import *
+from openstates.utils import probe
+from openstates.utils.cache import DirectoryCache
+from openstates.utils.tests.fakes import FakeScraper
+
+
+class TestURLProbe(object):
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+
+    def teardown(self):
+        shutil.rmtree(self.dir)
+
+    def probe(self, scraper, ttl=None, negative_ttl=60):
+        return probe.URLProbe(scraper, DirectoryCache(self.dir, ttl),
+                              workers=2, negative_ttl=negative_ttl)
+
+    def test_head(self):
+        scraper = FakeScraper({('HEAD', 'a'): 200})
+        eq_([True, False], self.probe(scraper).exists_many(['a', 'b']))
+        eq_([('HEAD', 'a', None), ('HEAD', 'b', None)],
+            sorted(scraper.requests))
+
+    def test_ranged_get_when_head_not_allowed(self):
+        scraper = FakeScraper({('HEAD', 'a'): 405, ('GET', 'a'): 206})
+        ok_(self.probe(scraper).exists('a'))
+        eq_(('GET', 'a', {'Range': 'bytes=0-0'}), scraper.requests[-1])
+
+    def test_cached_across_probes(self):
+        scraper = FakeScraper({('HEAD', 'a'): 200})
+        self.probe(scraper).exists_many(['a', 'b'])
+        scraper.pages = {('HEAD', 'b'): 200}
+        eq_([True, False], self.probe(scraper).exists_many(['a', 'b']))
+        eq_(2, len(scraper.requests))
+
+    def test_only_200_and_206_exist(self):
+        scraper = FakeScraper({('HEAD', 'a'): 200, ('HEAD', 'b'): 204,
+                               ('HEAD', 'c'): 302})
+        eq_([True, False, False],
+            self.probe(scraper).exists_many(['a', 'b', 'c']))
+
+    def test_missing_probed_again_sooner(self):
+        scraper = FakeScraper({('HEAD', 'a'): 200})
+        self.probe(scraper, negative_ttl=0).exists_many(['a', 'b'])
+        scraper.pages = {('HEAD', 'b'): 200}
+        eq_([True, True],
+            self.probe(scraper, negative_ttl=0).exists_many(['a', 'b']))
+        eq_(3, len(scraper.requests))
+
+    def test_close(self):
+        scraper = FakeScraper({('HEAD', 'a'): 200})
+        p = self.probe(scraper)
+        p.exists_many(['a'])
+        p.close()
+        eq_(None, p._pool)
+        eq_([True, False], p.exists_many(['a', 'b']))
+        p.close()
+
+    def test_stale_results_are_probed_again(self):
+        scraper = FakeScraper({('HEAD', 'a'): 200})
+        self.probe(scraper, ttl=0).exists('a')
+        self.probe(scraper, ttl=0).exists('a')
+        eq_(2, len(scraper.requests))
+
+    def test_errors_not_cached(self):
+        scraper = FakeScraper({('HEAD', 'a'): None, ('HEAD', 'b'): 503})
+        eq_([False, False], self.probe(scraper).exists_many(['a', 'b']))
+        scraper.pages = {('HEAD', 'a'): 200, ('HEAD', 'b'): 200}
+        eq_([True, True], self.probe(scraper).exists_many(['a', 'b']))
@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+from nose.tools import *
+from openstates.utils import rollcall
+
+
+LINES = [
+    'Y    Althoff     NV   Dillard     N   Lauzen',
+    'NV   Bivins      Y    Forby, J.   Y   Lightford',
+    '     Bomke       Y    Frerichs',
+]
+
+
+def test_find_fields():
+    eq_([0, 5, 17, 22, 34, 38], rollcall.find_fields(LINES))
+
+
+def test_find_columns():
+    eq_([0, 17, 34], rollcall.find_columns(LINES, ('Y', 'N', 'NV')))
+
+
+def test_parse():
+    eq_([('Althoff', 'Y'), ('Dillard', 'NV'), ('Lauzen', 'N'),
+         ('Bivins', 'NV'), ('Forby, J.', 'Y'), ('Lightford', 'Y'),
+         ('Bomke', ''), ('Frerichs', 'Y')],
+        rollcall.parse(LINES, ('Y', 'N', 'NV')))
+
+
+@raises(ValueError)
+def test_no_columns():
+    rollcall.parse(['Althoff   Dillard'], ('Y', 'N'))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+import os
+import shutil
+import zipfile
+import tempfile
+
+from nose.tools import *
+from openstates.utils import xlsx
+
+
+WORKBOOK = '''<?xml version="1.0" encoding="UTF-8"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+ xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="Status" sheetId="1" r:id="rId7"/></sheets>
+</workbook>'''
+
+RELS = '''<?xml version="1.0" encoding="UTF-8"?>
+<Relationships
+ xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId7" Target="worksheets/status.xml"
+ Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>
+</Relationships>'''
+
+STRINGS = '''<?xml version="1.0" encoding="UTF-8"?>
+<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<si><t>Bill</t></si>
+<si><r><t>Intro. </t></r><r><t>Date</t></r></si>
+<si><t>HB 1</t></si>
+</sst>'''
+
+SHEET = '''<?xml version="1.0" encoding="UTF-8"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<dimension ref="A1:D5"/>
+<sheetData>
+<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c></row>
+<row r="2"><c r="A2" t="s"><v>2</v></c><c r="B2"><v>41275</v></c>
+<c r="D2" t="inlineStr"><is><t>inline</t></is></c></row>
+<row r="4"><c r="C4" t="b"><v>1</v></c></row>
+<row r="5"><c r="A5" s="1"/></row>
+</sheetData>
+</worksheet>'''
+
+
+# A <dimension> narrower than the header, as some writers leave it.
+NARROW_SHEET = '''<?xml version="1.0" encoding="UTF-8"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<dimension ref="A1:B3"/>
+<sheetData>
+<row r="1"><c r="A1" t="s"><v>0</v></c><c r="D1" t="s"><v>1</v></c></row>
+<row r="2"><c r="A2" t="s"><v>2</v></c></row>
+</sheetData>
+</worksheet>'''
+
+
+class TestXLSX(object):
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = self.workbook('status.xlsx', SHEET)
+
+    def workbook(self, name, sheet):
+        filename = os.path.join(self.dir, name)
+        zf = zipfile.ZipFile(filename, 'w')
+        zf.writestr('xl/workbook.xml', WORKBOOK)
+        zf.writestr('xl/_rels/workbook.xml.rels', RELS)
+        zf.writestr('xl/sharedStrings.xml', STRINGS)
+        zf.writestr('xl/worksheets/status.xml', sheet)
+        zf.close()
+        return filename
+
+    def teardown(self):
+        shutil.rmtree(self.dir)
+
+    def test_iter_rows(self):
+        eq_([['Bill', 'Intro. Date', '', ''],
+             ['HB 1', 41275.0, '', 'inline'],
+             ['', '', '', ''],
+             ['', '', 1, '']],
+            list(xlsx.iter_rows(self.filename)))
+
+    def test_rows_padded_to_header(self):
+        filename = self.workbook('narrow.xlsx', NARROW_SHEET)
+        eq_([['Bill', '', '', 'Intro. Date'],
+             ['HB 1', '', '', '']],
+            list(xlsx.iter_rows(filename)))
+
+
+def test_column_index():
+    eq_(0, xlsx.column_index('A1'))
+    eq_(25, xlsx.column_index('Z9'))
+    eq_(26, xlsx.column_index('AA10'))
@@ -0,0 +1,154 @@
+'''
+Reading spreadsheets a row at a time.
+
+xlrd.open_workbook reads a whole workbook into memory, and sh.cell()
+is a method call per cell. iter_rows streams the rows of a sheet of an
+.xlsx instead, straight out of its zip with lxml's iterparse, so only
+one row (and the shared strings table) is in memory at once. Each row
+is a list of values the way xlrd gives them: unicode for text, float
+for numbers (and dates), int for booleans, and '' for empty cells.
+
+Old .xls workbooks aren't xml, so for those iter_rows reads the sheet
+with xlrd, giving the same rows.
+'''
+import re
+import zipfile
+import posixpath
+
+import lxml.etree
+
+
+NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = ('http://schemas.openxmlformats.org/officeDocument/2006/'
+          'relationships')
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+_cell_ref = re.compile(r'([A-Z]+)')
+
+
+def column_index(ref):
+    '''The 0-based column of a cell reference like "C12" (2).'''
+    letters = _cell_ref.match(ref).group(1)
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+
+def _text(el):
+    '''All the text of a string item, which may be split into runs.'''
+    return u''.join(el.itertext('{%s}t' % NS))
+
+
+def shared_strings(zf):
+    try:
+        f = zf.open('xl/sharedStrings.xml')
+    except KeyError:
+        return []
+    strings = []
+    for event, si in lxml.etree.iterparse(f, tag='{%s}si' % NS):
+        strings.append(_text(si))
+        si.clear()
+    return strings
+
+
+def sheet_path(zf, sheet_index):
+    '''The path in the zip of the sheet_index'th sheet of a workbook.'''
+    workbook = lxml.etree.fromstring(zf.read('xl/workbook.xml'))
+    sheets = workbook.findall('{%s}sheets/{%s}sheet' % (NS, NS))
+    rel_id = sheets[sheet_index].get('{%s}id' % REL_NS)
+    rels = lxml.etree.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels.iter('{%s}Relationship' % PKG_REL_NS):
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target')
+            if target.startswith('/'):
+                return target.lstrip('/')
+            return posixpath.normpath(posixpath.join('xl', target))
+    raise KeyError(rel_id)
+
+
+def _value(c, strings):
+    type_ = c.get('t', 'n')
+    if type_ == 'inlineStr':
+        inline = c.find('{%s}is' % NS)
+        return _text(inline) if inline is not None else u''
+    v = c.find('{%s}v' % NS)
+    if v is None or v.text is None:
+        return ''
+    if type_ == 's':
+        return strings[int(v.text)]
+    elif type_ == 'n':
+        return float(v.text)
+    elif type_ == 'b':
+        return int(v.text)
+    # 'str' (a formula's string result) and 'e' (an error).
+    return v.text
+
+
+def iter_xlsx_rows(filename, sheet_index=0):
+    '''Yield each row of a sheet of an .xlsx as a list of values, with
+    rows (and cells) that the sheet leaves out filled in as blank, up to
+    the last row with a value. Rows are at least as wide as the sheet's
+    <dimension> says and as the widest row before them (the header, as
+    a rule), so columns named in the header can always be indexed.
+    '''
+    zf = zipfile.ZipFile(filename)
+    try:
+        strings = shared_strings(zf)
+        f = zf.open(sheet_path(zf, sheet_index))
+        ncols = 0
+        rownum = 0
+        for event, el in lxml.etree.iterparse(f, tag=('{%s}dimension' % NS,
+                                                      '{%s}row' % NS)):
+            if el.tag == '{%s}dimension' % NS:
+                # e.g. "A1:Z100"; pad every row to Z, like xlrd. Not
+                # every writer gets this right, so rows are also padded
+                # to the widest row so far, below.
+                ncols = column_index(el.get('ref').split(':')[-1]) + 1
+                continue
+
+            row = [''] * ncols
+            for position, c in enumerate(el.iterfind('{%s}c' % NS)):
+                ref = c.get('r')
+                col = column_index(ref) if ref else position
+                if col >= len(row):
+                    row.extend([''] * (col + 1 - len(row)))
+                row[col] = _value(c, strings)
+            ncols = max(ncols, len(row))
+
+            # Rows without anything in them needn't be in the sheet, or
+            # may be there only for their formatting. Like xlrd, count
+            # them only if there are rows with values after them.
+            index = int(el.get('r', rownum + 1)) - 1
+            if any(value != '' for value in row):
+                while rownum < index:
+                    yield [''] * ncols
+                    rownum += 1
+                yield row
+                rownum += 1
+
+            el.clear()
+            while el.getprevious() is not None:
+                del el.getparent()[0]
+    finally:
+        zf.close()
+
+
+def iter_xls_rows(filename, sheet_index=0):
+    import xlrd
+    book = xlrd.open_workbook(filename, on_demand=True)
+    try:
+        sh = book.sheet_by_index(sheet_index)
+        for rownum in xrange(sh.nrows):
+            yield sh.row_values(rownum)
+    finally:
+        book.release_resources()
+
+
+def iter_rows(filename, sheet_index=0):
+    '''Yield each row of a sheet of an .xlsx or .xls workbook as a list
+    of values, the first row (often a header) included.
+    '''
+    if zipfile.is_zipfile(filename):
+        return iter_xlsx_rows(filename, sheet_index)
+    return iter_xls_rows(filename, sheet_index)
@@ -1,5 +1,5 @@
 import re
-from billy.scrape.actions import Rule, BaseCategorizer
+from openstates.utils.actions import Rule, BillyCategorizer
 
 
 # http://www.leg.wa.gov/legislature/pages/committeelisting.aspx#
@@ -105,13 +105,13 @@ _categorizer_rules = (
 )
 
 
-class Categorizer(BaseCategorizer):
+class Categorizer(BillyCategorizer):
     rules = _categorizer_rules
 
     def categorize(self, text):
         '''Wrap categorize and add boilerplate committees.
         '''
-        attrs = BaseCategorizer.categorize(self, text)
+        attrs = BillyCategorizer.categorize(self, text)
         if 'committees' in attrs:
             committees = attrs['committees']
             for committee in re.findall(committees_rgx, text, re.I):
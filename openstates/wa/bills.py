@@ -1,57 +1,54 @@
 import re
 import datetime
-import scrapelib
-from collections import defaultdict
+import threading
 
 from .actions import Categorizer, committees_abbrs
-from .utils import xpath
+from .utils import xpath, subject_index, legislation_by_year
+from billy.core import settings
 from billy.scrape.bills import BillScraper, Bill
 from billy.scrape.votes import Vote
+from openstates.utils.prefetch import Prefetcher
+from openstates.utils.probe import URLProbe, get_cache
 
 import lxml.etree
 import lxml.html
-import feedparser
+
+
+# How many bills to fetch the details of at once, and how far ahead of
+# the bill being saved.
+BILL_WORKERS = getattr(settings, 'WA_BILL_WORKERS', 4)
+BILL_LOOKAHEAD = getattr(settings, 'WA_BILL_LOOKAHEAD', 20)
 
 
 class WABillScraper(BillScraper):
     jurisdiction = 'wa'
     _base_url = 'http://wslwebservices.leg.wa.gov/legislationservice.asmx'
     categorizer = Categorizer()
-    _subjects = defaultdict(list)
-
-    def build_subject_mapping(self, year):
-        url = 'http://apps.leg.wa.gov/billsbytopic/Results.aspx?year=%s' % year
-        html = self.urlopen(url)
-        doc = lxml.html.fromstring(html)
-        doc.make_links_absolute('http://apps.leg.wa.gov/billsbytopic/')
-        for link in doc.xpath('//a[contains(@href, "ResultsRss")]/@href'):
-            subject = link.rsplit('=', 1)[-1]
-            link = link.replace(' ', '%20')
-
-            # Strip invalid characters
-            rss = re.sub(r'^[^<]+', '', self.urlopen(link))
-            rss = feedparser.parse(rss)
-            for e in rss['entries']:
-                match = re.match('\w\w \d{4}', e['title'])
-                if match:
-                    self._subjects[match.group()].append(subject)
+
+    def __init__(self, *args, **kwargs):
+        super(WABillScraper, self).__init__(*args, **kwargs)
+        self.probe = URLProbe(self, get_cache())
+        self.requests_made = 0
+        self._requests_lock = threading.Lock()
+
+    def request(self, *args, **kwargs):
+        # Counted, to report requests per bill.
+        with self._requests_lock:
+            self.requests_made += 1
+        return super(WABillScraper, self).request(*args, **kwargs)
 
     def scrape(self, chamber, session):
         bill_id_list = []
         year = int(session[0:4])
+        subjects = subject_index(self, year)
 
         # first go through API response and get bill list
         for y in (year, year + 1):
-            self.build_subject_mapping(y)
-            url = "%s/GetLegislationByYear?year=%s" % (self._base_url, y)
-
-            try:
-                page = self.urlopen(url)
-                page = lxml.etree.fromstring(page.bytes)
-            except scrapelib.HTTPError:
+            legislation = legislation_by_year(self, self._base_url, y)
+            if legislation is None:
                 continue  # future years.
 
-            for leg_info in xpath(page, "//wa:LegislationInfo"):
+            for leg_info in legislation:
                 bill_id = xpath(leg_info, "string(wa:BillId)")
                 bill_num = int(bill_id.split()[1])
 
@@ -78,12 +75,30 @@ class WABillScraper(BillScraper):
 
                 bill_id_list.append(bill_id_norm[0])
 
-        # de-dup bill_id
-        for bill_id in list(set(bill_id_list)):
-            bill = self.scrape_bill(chamber, session, bill_id)
-            bill['subjects'] = self._subjects[bill_id]
-            self.fix_prefiled_action_dates(bill)
+        # de-dup bill_id, and fetch each bill's details, sponsors,
+        # actions and votes BILL_WORKERS bills at a time.
+        def scrape_bill(bill_id):
+            # False for a gubernatorial appointment, so that None only
+            # means fetching the bill failed.
+            return self.scrape_bill(chamber, session, bill_id) or False
+
+        requests_made = self.requests_made
+        saved = 0
+        prefetcher = Prefetcher(scrape_bill, lookahead=BILL_LOOKAHEAD,
+                                workers=BILL_WORKERS, logger=self.logger)
+        for bill_id, bill in prefetcher.iter(sorted(set(bill_id_list))):
+            if bill is None:
+                # Fetching it failed; try again here, to get the error.
+                bill = scrape_bill(bill_id)
+            if bill is False:
+                continue
+            bill['subjects'] = subjects.get(bill_id, [])
             self.save_bill(bill)
+            saved += 1
+
+        self.info('%d requests for %d %s bills (%.1f per bill)' % (
+            self.requests_made - requests_made, saved, chamber,
+            (self.requests_made - requests_made) / float(max(saved, 1))))
 
     def scrape_bill(self, chamber, session, bill_id):
         biennium = "%s-%s" % (session[0:4], session[7:9])
@@ -124,8 +139,7 @@ class WABillScraper(BillScraper):
 
         # Sometimes the measure's version_url isn't guessable. When that happens
         # have to get the url from the source page.
-        version_resp = self.get(version_url)
-        if version_resp.status_code != 200:
+        if not self.probe.exists(version_url):
             webpage = self.get(fake_source).text
             webdoc = lxml.html.fromstring(webpage)
             version_url = webdoc.xpath(
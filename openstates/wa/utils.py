@@ -1,9 +1,149 @@
+import os
+import re
+import json
+import time
+import threading
+from multiprocessing.pool import ThreadPool
+
+import feedparser
+import lxml.etree
+import lxml.html
+import scrapelib
+from billy.core import settings
+
+
 NS = {'wa': "http://WSLWebServices.leg.wa.gov/"}
 
+# How long a biennium's subject index is kept on disk, and how many of
+# its rss feeds are downloaded at once.
+SUBJECTS_TTL = getattr(settings, 'WA_SUBJECTS_TTL', 60 * 60 * 24)
+SUBJECT_WORKERS = getattr(settings, 'WA_SUBJECT_WORKERS', 4)
+
+_subject_indexes = {}
+_subject_lock = threading.Lock()
+_legislation_by_year = {}
+_legislation_lock = threading.Lock()
+# Compiled XPath objects shouldn't be shared between threads.
+_local = threading.local()
+
 
 def xpath(elem, path):
     """
     A helper to run xpath with the proper namespaces for the Washington
-    Legislative API.
+    Legislative API. Each path is compiled once per thread.
+    """
+    compiled = _local.__dict__.setdefault('xpaths', {})
+    try:
+        find = compiled[path]
+    except KeyError:
+        find = compiled[path] = lxml.etree.XPath(path, namespaces=NS)
+    return find(elem)
+
+
+def legislation_by_year(scraper, base_url, year):
+    """
+    The wa:LegislationInfo elements of GetLegislationByYear for a year,
+    fetched once per process for every chamber. None if the year has
+    none yet.
+    """
+    with _legislation_lock:
+        if year not in _legislation_by_year:
+            url = "%s/GetLegislationByYear?year=%s" % (base_url, year)
+            try:
+                page = scraper.urlopen(url)
+            except scrapelib.HTTPError:
+                infos = None  # future years.
+            else:
+                page = lxml.etree.fromstring(page.bytes)
+                infos = xpath(page, "//wa:LegislationInfo")
+            _legislation_by_year[year] = infos
+        return _legislation_by_year[year]
+
+
+def subject_feeds(scraper, year):
+    """
+    The (subject, rss url) of each topic on billsbytopic for a year.
+    """
+    url = 'http://apps.leg.wa.gov/billsbytopic/Results.aspx?year=%s' % year
+    html = scraper.urlopen(url)
+    doc = lxml.html.fromstring(html)
+    doc.make_links_absolute('http://apps.leg.wa.gov/billsbytopic/')
+    feeds = []
+    for link in doc.xpath('//a[contains(@href, "ResultsRss")]/@href'):
+        subject = link.rsplit('=', 1)[-1]
+        feeds.append((subject, link.replace(' ', '%20')))
+    return feeds
+
+
+def subject_bill_ids(scraper, link):
+    """
+    The ids of the bills in a topic's rss feed.
+    """
+    # Strip invalid characters
+    rss = re.sub(r'^[^<]+', '', scraper.urlopen(link))
+    rss = feedparser.parse(rss)
+    bill_ids = []
+    for e in rss['entries']:
+        match = re.match('\w\w \d{4}', e['title'])
+        if match:
+            bill_ids.append(match.group())
+    return bill_ids
+
+
+def build_subject_index(scraper, year):
+    """
+    Map bill ids to their subjects, each listed once, in the order
+    billsbytopic lists them, for the biennium starting in ``year``.
     """
-    return elem.xpath(path, namespaces=NS)
+    feeds = []
+    for y in (year, year + 1):
+        feeds.extend(subject_feeds(scraper, y))
+
+    pool = ThreadPool(SUBJECT_WORKERS)
+    try:
+        bill_ids = pool.map(lambda feed: subject_bill_ids(scraper, feed[1]),
+                            feeds)
+    finally:
+        pool.close()
+
+    index = {}
+    for (subject, link), ids in zip(feeds, bill_ids):
+        for bill_id in ids:
+            subjects = index.setdefault(bill_id, [])
+            if subject not in subjects:
+                subjects.append(subject)
+    return index
+
+
+def subject_index(scraper, year):
+    """
+    build_subject_index's mapping for the biennium starting in ``year``,
+    built once per process and kept in BILLY_CACHE_DIR for SUBJECTS_TTL
+    seconds, so every chamber and scraper (and later runs) share it.
+    """
+    with _subject_lock:
+        if year in _subject_indexes:
+            return _subject_indexes[year]
+
+        path = os.path.join(settings.BILLY_CACHE_DIR,
+                            'wa-subjects-%s.json' % year)
+        try:
+            with open(path) as f:
+                cached = json.load(f)
+        except (IOError, ValueError):
+            cached = None
+
+        fresh = (cached is not None and
+                 time.time() - cached['fetched'] < SUBJECTS_TTL)
+        if fresh:
+            index = cached['subjects']
+        else:
+            index = build_subject_index(scraper, year)
+            if not os.path.isdir(settings.BILLY_CACHE_DIR):
+                os.makedirs(settings.BILLY_CACHE_DIR)
+            with open(path + '.tmp', 'w') as f:
+                json.dump({'fetched': time.time(), 'subjects': index}, f)
+            os.rename(path + '.tmp', path)
+
+        _subject_indexes[year] = index
+        return index
@@ -2,7 +2,7 @@
 
 '''
 import re
-from billy.scrape.actions import Rule, BaseCategorizer
+from openstates.utils.actions import Rule, BillyCategorizer
 
 
 committees = [
@@ -113,13 +113,13 @@ rules = (
 )
 
 
-class Categorizer(BaseCategorizer):
+class Categorizer(BillyCategorizer):
     rules = rules
 
     def categorize(self, text):
         '''Wrap categorize and add boilerplate committees.
         '''
-        attrs = BaseCategorizer.categorize(self, text)
+        attrs = BillyCategorizer.categorize(self, text)
         committees = attrs['committees']
         for committee in re.findall(committees_rgx, text, re.I):
             if committee not in committees:
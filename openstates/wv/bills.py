@@ -8,7 +8,7 @@ from urllib import quote, unquote_plus
 
 import lxml.html
 
-from billy.scrape.utils import convert_pdf
+from openstates.utils.pdf import convert_pdf
 from billy.scrape.bills import BillScraper, Bill
 from billy.scrape.votes import Vote
 import scrapelib
@@ -0,0 +1,74 @@
+'''
+Compare lazily loading each CA bill's relations (and fully parsing each
+version's xml) with openstates.ca.models.iter_bills plus the iterparse
+version field extractor, against a local capublic database.
+
+Usage:
+    python scripts/benchmarks/ca_bills.py 20132014 AB
+    python scripts/benchmarks/ca_bills.py 20132014 AB mysql://user:pw@host/capublic
+'''
+import sys
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from openstates.ca.models import CABill, iter_bills
+
+
+def touch(bill, fields):
+    '''Read what CABillScraper.scrape_bill_type reads.'''
+    for action in bill.actions:
+        action.action
+    for version in bill.versions:
+        version.authors
+        if version.bill_xml:
+            fields(version)
+    for vote in bill.votes:
+        vote.motion, vote.location
+        for record in vote.votes:
+            record.vote_code
+
+
+def old_fields(version):
+    version.xml.xpath("string(//*[local-name() = 'Title'])")
+    version.xml.xpath("string(//*[local-name() = 'Subject'])")
+    version.xml.xpath('//caml:DigestText/xhtml:p',
+                      namespaces=version.xml.nsmap)
+
+
+def new_fields(version):
+    version.title, version.short_title, version.digest
+
+
+def main(session, type_abbr,
+         url='mysql://localhost/capublic?charset=utf8'):
+    engine = create_engine(url)
+    queries = [0]
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def count(*args):
+        queries[0] += 1
+
+    runs = (
+        ('lazy', lambda query: iter(query), old_fields),
+        ('batched', iter_bills, new_fields),
+    )
+    for label, iterate, fields in runs:
+        db = sessionmaker(bind=engine)()
+        query = db.query(CABill).filter_by(
+            session_year=session).filter_by(measure_type=type_abbr)
+        queries[0] = 0
+        start = time.time()
+        n = 0
+        for bill in iterate(query):
+            touch(bill, fields)
+            n += 1
+        secs = time.time() - start
+        print '%s: %d bills in %.2fs (%.1f bills/sec), %d queries' % (
+            label, n, secs, n / max(secs, 1e-9), queries[0])
+        db.close()
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
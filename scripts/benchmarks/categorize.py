@@ -0,0 +1,161 @@
+'''
+Compare the throughput of a state's old categorizer loop with the shared
+compiled categorizer in openstates.utils.actions, and, per session,
+calling ``categorize`` once per action with calling ``categorize_many``
+once per bill.
+
+For states on BillyCategorizer the old loop is billy's BaseCategorizer
+and the new one a RuleSet in billy mode; for the rest it's the loop
+NY's, VT's and bathawk's copies of BaseCategorizer ran.
+
+Usage:
+    python scripts/benchmarks/categorize.py ny
+    python scripts/benchmarks/categorize.py ny actions.txt
+
+Without a corpus file, every action string for the state is pulled
+from the billy database. A corpus file has one action per line and is
+treated as a single session.
+'''
+import re
+import sys
+import time
+import importlib
+from functools import partial
+from collections import defaultdict
+
+from billy.scrape import actions as billy_actions
+from openstates.utils.actions import RuleSet, BillyCategorizer
+
+
+def legacy_match(rules, text):
+    '''The rule-matching loop of the copies of BaseCategorizer NY, VT
+    and bathawk kept before openstates.utils.actions.
+    '''
+    whitespace = partial(re.sub, '\s{1,4}', '\s{,4}')
+    types = set()
+    attrs = defaultdict(set)
+    for rule in rules:
+        for regex in rule.regexes:
+            m = re.search(whitespace(regex), text)
+            if m or (regex in text):
+                types |= rule.types
+                if m is not None:
+                    for k, v in m.groupdict().items():
+                        attrs[k].add(v)
+                for k, v in rule.attrs.items():
+                    attrs[k].add(v)
+                if rule.stop is True:
+                    break
+    return types, attrs
+
+
+def billy_match(rules, text):
+    '''The rule-matching loop of billy's BaseCategorizer, for rules
+    made with billy's Rule.
+    '''
+    types = set()
+    attrs = defaultdict(set)
+    for rule in rules:
+        matched = rule.match(text)
+        if matched is not None:
+            types |= rule.types
+            for k, v in matched.items():
+                attrs[k].add(v)
+            attrs.update(**rule.attrs)
+            if rule.stop:
+                break
+    return types, attrs
+
+
+def get_categorizer(abbr):
+    module = importlib.import_module('openstates.%s.actions' % abbr)
+    for name in dir(module):
+        obj = getattr(module, name)
+        if isinstance(obj, type) and getattr(obj, 'rules', None):
+            return obj
+    raise ValueError('No categorizer rules found for %r' % abbr)
+
+
+def get_sessions(abbr, filename=None):
+    '''Returns a dict of session names to lists of bills, each bill
+    being a list of action strings.
+    '''
+    if filename is not None:
+        with open(filename) as f:
+            actions = [line.rstrip('\n').decode('utf-8') for line in f]
+        return {filename: [actions]}
+    from billy.core import db
+    sessions = defaultdict(list)
+    spec = {'state': abbr}
+    for bill in db.bills.find(spec, fields=['session', 'actions']):
+        actions = [action['action'] for action in bill['actions']]
+        sessions[bill['session']].append(actions)
+    return dict(sessions)
+
+
+def timeit(func, corpus):
+    start = time.time()
+    results = map(func, corpus)
+    return time.time() - start, results
+
+
+def per_action(categorizer, bills):
+    for actions in bills:
+        for action in actions:
+            categorizer.categorize(action)
+
+
+def per_bill(categorizer, bills):
+    for actions in bills:
+        categorizer.categorize_many(actions)
+
+
+def main(abbr, filename=None):
+    categorizer_cls = get_categorizer(abbr)
+    rules = categorizer_cls.rules
+    sessions = get_sessions(abbr, filename)
+    corpus = [action for bills in sessions.values()
+              for actions in bills for action in actions]
+    print '%d actions, %d distinct, %d rules' % (
+        len(corpus), len(set(corpus)), len(rules))
+
+    billy = issubclass(categorizer_cls, BillyCategorizer)
+    if billy:
+        billy_rules = [billy_actions.Rule(list(rule.regexes), rule.types,
+                                          rule.stop, **rule.attrs)
+                       for rule in rules]
+        old_match = partial(billy_match, billy_rules)
+    else:
+        old_match = partial(legacy_match, rules)
+    old_secs, old_results = timeit(old_match, corpus)
+    ruleset = RuleSet(rules, billy)
+    new_secs, new_results = timeit(ruleset.match, corpus)
+
+    mismatches = sum(1 for old, new in zip(old_results, new_results)
+                     if old != new)
+
+    for label, secs in (('old', old_secs), ('new', new_secs)):
+        print '%s: %.2fs, %d actions/sec' % (
+            label, secs, len(corpus) / max(secs, 1e-9))
+    print 'speedup: %.1fx' % (old_secs / max(new_secs, 1e-9))
+    print 'memo hits: %d, misses: %d' % (ruleset.hits, ruleset.misses)
+    print 'mismatched results: %d' % mismatches
+
+    # categorize vs. categorize_many, by session. Each run gets a
+    # freshly compiled ruleset so the memo doesn't carry over.
+    print
+    for session, bills in sorted(sessions.items()):
+        timings = []
+        for func in (per_action, per_bill):
+            categorizer = categorizer_cls()
+            categorizer.ruleset = RuleSet(rules, billy)
+            start = time.time()
+            func(categorizer, bills)
+            timings.append(time.time() - start)
+        one, many = timings
+        print '%s: categorize %.2fs, categorize_many %.2fs (%.1fx)' % (
+            session, one, many, one / max(many, 1e-9))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,98 @@
+'''
+Compare the old character-by-character IL roll call column finder with
+the shared grid parser in openstates.utils.rollcall.
+
+Usage:
+    python scripts/benchmarks/rollcall.py
+    python scripts/benchmarks/rollcall.py rollcalls.txt [repeat]
+
+A corpus file holds saved roll call text (the vote lines IL's
+scrape_vote passes to find_columns_and_parse), one roll call per
+paragraph. Without one, the roll calls from IL's tests are used.
+'''
+import sys
+import time
+
+from openstates.utils import rollcall
+from openstates.il.bills import VOTE_VALUES, VOTE_COLUMN_GAP
+
+
+def legacy_is_potential_column(line, i):
+    for val in VOTE_VALUES:
+        test_val = val + ' '
+        if line[i:i + len(test_val)] == test_val:
+            return True
+    return False
+
+
+def legacy_find_columns(vote_lines):
+    '''IL's find_columns before it used openstates.utils.rollcall.
+    '''
+    potential_columns = []
+    for line in vote_lines:
+        pcols = set()
+        for i, x in enumerate(line):
+            if legacy_is_potential_column(line, i):
+                pcols.add(i)
+        potential_columns.append(pcols)
+
+    starter = potential_columns[0]
+    for pc in potential_columns[1:-1]:
+        starter.intersection_update(pc)
+    return sorted(starter)
+
+
+def legacy_parse(vote_lines):
+    columns = legacy_find_columns(vote_lines)
+    votes = {}
+    for line in vote_lines:
+        for idx in reversed(columns):
+            bit = line[idx:]
+            line = line[:idx]
+            if bit:
+                vote, name = bit.split(' ', 1)
+                votes[name.strip()] = vote
+    return votes
+
+
+def new_parse(vote_lines):
+    return dict(rollcall.parse(vote_lines, VOTE_VALUES, VOTE_COLUMN_GAP))
+
+
+def get_corpus(filename=None):
+    if filename is None:
+        from openstates.il.tests import test_vote_parsing as t
+        return [t.TEST_LINES1, t.TEST_LINES2, t.TEST_LINES3]
+    with open(filename) as f:
+        text = f.read().decode('utf-8')
+    return [block.splitlines() for block in text.split('\n\n')
+            if block.strip()]
+
+
+def timeit(func, corpus, repeat):
+    start = time.time()
+    for i in xrange(repeat):
+        results = map(func, corpus)
+    return time.time() - start, results
+
+
+def main(filename=None, repeat=1000):
+    corpus = get_corpus(filename)
+    repeat = int(repeat)
+    print '%d roll calls, %d lines, x%d' % (
+        len(corpus), sum(map(len, corpus)), repeat)
+
+    old_secs, old_results = timeit(legacy_parse, corpus, repeat)
+    new_secs, new_results = timeit(new_parse, corpus, repeat)
+    mismatches = sum(1 for old, new in zip(old_results, new_results)
+                     if old != new)
+
+    for label, secs in (('old', old_secs), ('new', new_secs)):
+        print '%s: %.2fs, %d roll calls/sec' % (
+            label, secs, len(corpus) * repeat / max(secs, 1e-9))
+    print 'speedup: %.1fx' % (old_secs / max(new_secs, 1e-9))
+    print 'mismatched results: %d' % mismatches
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])